@@ -0,0 +1,96 @@
+"""
+AlertEngine.evaluate() with thousands of rules.
+
+``rules`` threshold rules spread over ``fields`` snapshot fields, some
+with hysteresis and hold times. Each typical snapshot changes a few
+fields; a busy one changes ``busy`` of them by what a 1 Hz poll moves
+(dozens of sensor and derived values drift a little every second); the
+worst case swings all of them. A change costs two bisects per field
+plus the rules it flips and the raised alerts whose message shows it, so
+the worst case is bound by the ~1/6 of rules active at once, not by the
+rule count (1.7-2.6 ms here with ~330 raised, see stormpod/alerts.py).
+
+    python -m benchmarks.bench_alerts [rules]
+"""
+
+import math
+import sys
+import time
+
+from stormpod.alerts import compile_rules, load_engine
+
+
+def _config(rules, fields):
+    specs = []
+    for i in range(rules):
+        field = f"f{i % fields}"
+        # Thresholds from 45 to 95 against values swinging +/-60, so about
+        # one rule in ten is active at any time
+        level = 45 + (i // fields) % 50
+        if i % 3 == 0:
+            spec = {"field": field, "above": level, "clear": level - 2, "clear_for_s": 5}
+        elif i % 3 == 1:
+            spec = {"field": field, "below": -level, "for_s": 2}
+        else:
+            spec = {"any": [{"field": field, "above": level + 5},
+                            {"field": f"f{(i + 1) % fields}", "below": -level - 5}]}
+        spec.update(name=f"rule{i}", priority=i % 7, message=f"{{{field}:.1f}} over {level}")
+        specs.append(spec)
+    return {"rules": specs}
+
+
+def run(rules=2000, fields=100, snapshots=2000, changed=5, busy=30):
+    config = _config(rules, fields)
+    start = time.perf_counter()
+    engine = compile_rules(config)
+    compile_s = time.perf_counter() - start
+
+    data = {f"f{j}": 0.0 for j in range(fields)}
+    engine.evaluate(data, now=0.0)
+    start = time.perf_counter()
+    for i in range(snapshots):
+        for k in range(changed):
+            j = (i * changed + k) % fields
+            data[f"f{j}"] = 60.0 * math.sin(i / 50.0 + j)
+        engine.evaluate(data, now=i * 1.0)
+    typical_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(snapshots):
+        for k in range(busy):
+            j = (i * busy + k) % fields
+            data[f"f{j}"] = 60.0 * math.sin((snapshots + i) / 50.0 + j)
+        engine.evaluate(data, now=(snapshots + i) * 1.0)
+    busy_s = time.perf_counter() - start
+
+    worst = max(1, snapshots // 20)
+    start = time.perf_counter()
+    for i in range(worst):
+        for j in range(fields):
+            data[f"f{j}"] = 60.0 * math.sin(i / 3.0 + j)
+        engine.evaluate(data, now=2 * snapshots + i * 1.0)
+    worst_s = time.perf_counter() - start
+
+    dashboard = load_engine()
+    snapshot = {"temp_C": 21.0, "gust_kph": 30.0, "wind_2min_kph": 20.0, "lightning": None}
+    calls = snapshots * 10
+    start = time.perf_counter()
+    for i in range(calls):
+        snapshot["temp_C"] = 21.0 + (i % 10) * 0.1
+        dashboard.evaluate(snapshot, now=i * 0.2)
+    dashboard_s = time.perf_counter() - start
+
+    return {
+        "compile_ms": compile_s * 1e3,
+        "evaluate_us": typical_s / snapshots * 1e6,
+        "evaluate_busy_us": busy_s / snapshots * 1e6,
+        "evaluate_all_changed_us": worst_s / worst * 1e6,
+        "dashboard_evaluate_us": dashboard_s / calls * 1e6,
+        "active_alerts": len(engine.active),
+    }
+
+
+if __name__ == "__main__":
+    rules = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    for key, value in run(rules).items():
+        print(f"{key:24s} {value:>14,.2f}")
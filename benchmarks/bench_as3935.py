@@ -0,0 +1,74 @@
+"""
+AS3935 event path under sustained IRQ bursts, using the fake SPI/GPIO
+backend. One thread fires interrupts at ``rate`` per second (far above
+what the chip can produce; it needs about 1 ms per IRQ) while the reader
+drains at the acquisition cadence. A second, unpaced run measures the
+raw callback cost.
+
+    python -m benchmarks.bench_as3935 [rate] [seconds]
+"""
+
+import sys
+import threading
+import time
+
+from stormpod.sensors.fakes import FakeGPIO, FakeSPI
+from stormpod.sensors.sensor_as3935 import AS3935, AS3935Sensor, EventRing
+
+IRQ_PIN = 23
+
+
+def _sensor():
+    spi, gpio = FakeSPI(), FakeGPIO()
+    sensor = AS3935Sensor(irq_pin=IRQ_PIN, spi=spi, gpio=gpio)
+    spi.set_event(AS3935.IRQ_LIGHTNING, 12)
+    return sensor, gpio
+
+
+def bench_sustained(rate=2000, seconds=3.0, read_interval=0.05):
+    sensor, gpio = _sensor()
+    events = int(rate * seconds)
+
+    def storm():
+        start = time.perf_counter()
+        for i in range(events):
+            delay = start + i / rate - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            gpio.trigger(IRQ_PIN)
+
+    irq_thread = threading.Thread(target=storm)
+    received = 0
+    irq_thread.start()
+    while irq_thread.is_alive():
+        received += sensor.read().get("strike_count", 0)
+        time.sleep(read_interval)
+    irq_thread.join()
+    received += sensor.read().get("strike_count", 0)
+    return {"events": events, "received": received, "overflows": sensor.as3935.events.overflows}
+
+
+def bench_callback(events=100_000):
+    sensor, gpio = _sensor()
+    sensor.as3935.events = EventRing(events)
+    start = time.perf_counter()
+    for _ in range(events):
+        gpio.trigger(IRQ_PIN)
+    elapsed = time.perf_counter() - start
+    start = time.perf_counter()
+    data = sensor.read()
+    read_s = time.perf_counter() - start
+    return {"callback_us": elapsed / events * 1e6, "read_ms_for_burst": read_s * 1e3,
+            "burst": data["strike_count"]}
+
+
+def run(rate=2000, seconds=3.0):
+    return {"sustained": bench_sustained(rate, seconds), "callback": bench_callback()}
+
+
+if __name__ == "__main__":
+    rate = float(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 3.0
+    for group, results in run(rate, seconds).items():
+        for key, value in results.items():
+            print(f"{group:10s} {key:18s} {value:>12,.2f}")
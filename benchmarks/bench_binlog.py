@@ -0,0 +1,68 @@
+"""
+CSV vs binary log: file size and load time for a multi-day log.
+
+    python -m benchmarks.bench_binlog [rows]
+"""
+
+import csv
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from stormpod.binlog import BinaryLogger, read_binary_log
+from stormpod.logger import BufferedLogger
+
+
+def _samples(rows):
+    rng = np.random.default_rng(0)
+    temps = 18 + rng.normal(0, 2, rows)
+    for i in range(rows):
+        yield {
+            "time_utc": f"{(i // 3600) % 24:02d}{(i // 60) % 60:02d}{i % 60:02d}",
+            "temp_C": round(float(temps[i]), 1), "humidity_%": 65.2, "pressure_hPa": 1013.2,
+            "wind_raw": 412, "wind_volts": 1.329, "speed_kph": 42.3,
+            "fix": True, "lat": 43.6532 + i * 1e-6, "lon": -79.3832, "heading_deg": 225.0,
+        }
+
+
+def run(rows=259200):
+    """Default is three days at 1 Hz."""
+    with tempfile.TemporaryDirectory() as workdir:
+        csv_path = os.path.join(workdir, "log.csv")
+        bin_path = os.path.join(workdir, "log.bin")
+        csv_log = BufferedLogger(csv_path, flush_rows=4096, fsync="none", background=False)
+        bin_log = BinaryLogger(bin_path, flush_rows=4096, fsync="none", background=False)
+        for sample in _samples(rows):
+            csv_log.log(sample)
+            bin_log.log(sample)
+        csv_log.close()
+        bin_log.close()
+
+        start = time.perf_counter()
+        with open(csv_path, newline="") as f:
+            temps = np.array([float(r["temp_C"]) for r in csv.DictReader(f)])
+        csv_load = time.perf_counter() - start
+
+        start = time.perf_counter()
+        records = read_binary_log(bin_path)
+        mean_bin = float(np.nanmean(records["temp_C"]))
+        bin_load = time.perf_counter() - start
+        assert abs(mean_bin - temps.mean()) < 1e-3
+
+        return {
+            "rows": rows,
+            "csv_bytes": os.path.getsize(csv_path),
+            "bin_bytes": os.path.getsize(bin_path),
+            "csv_load_ms": csv_load * 1e3,
+            "bin_load_ms": bin_load * 1e3,
+        }
+
+
+if __name__ == "__main__":
+    r = run(int(sys.argv[1]) if len(sys.argv) > 1 else 259200)
+    print(f"{r['rows']:,} rows")
+    print(f"CSV    {r['csv_bytes'] / 1e6:8.2f} MB  load {r['csv_load_ms']:9.1f} ms")
+    print(f"binary {r['bin_bytes'] / 1e6:8.2f} MB  load {r['bin_load_ms']:9.1f} ms")
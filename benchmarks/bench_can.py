@@ -0,0 +1,71 @@
+"""
+CAN decode cost: FrameRegistry.decode per frame, decode_batch on arrays,
+and CANReceiver end to end over a python-can virtual bus.
+
+    python -m benchmarks.bench_can [frames]
+"""
+
+import sys
+import time
+
+import can
+import numpy as np
+
+from stormpod.can_frames import load_registry
+from stormpod.sensors.sensor_can import CANReceiver
+
+ATMOS = bytes([0x00, 0xB9, 0x02, 0x8C, 0x27, 0x90])
+WIND = bytes([0x08, 0xCA, 0x02, 0x00])
+
+
+def bench_decode(frames):
+    registry = load_registry()
+    start = time.perf_counter()
+    for i in range(frames // 2):
+        registry.decode(0x10, ATMOS)
+        registry.decode(0x11, WIND)
+    elapsed = time.perf_counter() - start
+    return {"us_per_frame": elapsed / frames * 1e6, "frames_per_s": frames / elapsed}
+
+
+def bench_decode_batch(frames):
+    registry = load_registry()
+    ts = np.arange(frames, dtype=float)
+    batch = [(0x11 if i % 2 else 0x10, WIND if i % 2 else ATMOS, ts[i]) for i in range(frames)]
+    start = time.perf_counter()
+    registry.decode_batch(batch)
+    elapsed = time.perf_counter() - start
+    return {"us_per_frame": elapsed / frames * 1e6, "frames_per_s": frames / elapsed}
+
+
+def bench_receiver(frames):
+    channel = f"stormpod-bench-{time.monotonic_ns()}"
+    rx = CANReceiver(channel=channel, interface="virtual")
+    tx = can.Bus(channel=channel, interface="virtual")
+    msgs = [can.Message(arbitration_id=0x10, is_extended_id=False, data=ATMOS),
+            can.Message(arbitration_id=0x11, is_extended_id=False, data=WIND)]
+    try:
+        start = time.perf_counter()
+        for i in range(frames):
+            tx.send(msgs[i % 2])
+        while rx.frames_total < frames:
+            rx.update(timeout=0.5)
+        elapsed = time.perf_counter() - start
+    finally:
+        tx.shutdown()
+        rx.close()
+    return {"us_per_frame": elapsed / frames * 1e6, "frames_per_s": frames / elapsed}
+
+
+def run(frames=100_000):
+    return {
+        "decode": bench_decode(frames),
+        "decode_batch": bench_decode_batch(frames),
+        "receiver": bench_receiver(min(frames, 20_000)),
+    }
+
+
+if __name__ == "__main__":
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    for name, r in run(frames).items():
+        print(f"{name:14s} {r['frames_per_s']:>12,.0f} frames/s   {r['us_per_frame']:8.2f} µs/frame")
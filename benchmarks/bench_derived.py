@@ -0,0 +1,53 @@
+"""
+Derived meteorology: Derived.apply() on a merged snapshot when inputs
+repeat (the usual case: CAN atmos frames arrive at 2 Hz, snapshots are
+merged far more often) and when every input changes, plus
+derive_batch() over NumPy columns.
+
+    python -m benchmarks.bench_derived [calls]
+"""
+
+import sys
+import time
+
+import numpy as np
+
+from stormpod.derived import Derived, derive_batch
+
+SAMPLE = {"temp_C": 18.5, "humidity_%": 65.2, "pressure_hPa": 1012.8, "fix": True,
+          "gps_alt_m": 176.5, "wind_2min_kph": 12.0}
+
+
+def run(calls=100_000, rows=1_000_000):
+    derived = Derived()
+    start = time.perf_counter()
+    for i in range(calls):
+        derived.apply(dict(SAMPLE), t=i * 0.2)
+    cached_s = time.perf_counter() - start
+
+    derived = Derived()
+    samples = [dict(SAMPLE, temp_C=18.5 + (i % 100) * 0.1, pressure_hPa=1012.8 + (i % 37) * 0.1)
+               for i in range(1000)]
+    start = time.perf_counter()
+    for i in range(calls):
+        derived.apply(dict(samples[i % 1000]), t=i * 0.2)
+    changing_s = time.perf_counter() - start
+
+    rng = np.random.default_rng(0)
+    cols = (rng.uniform(-30, 45, rows), rng.uniform(5, 100, rows), rng.uniform(850, 1040, rows),
+            rng.uniform(0, 60, rows), rng.uniform(0, 1500, rows), np.arange(rows, dtype=float))
+    start = time.perf_counter()
+    derive_batch(*cols)
+    batch_s = time.perf_counter() - start
+
+    return {
+        "apply_cached_us": cached_s / calls * 1e6,
+        "apply_changing_us": changing_s / calls * 1e6,
+        "batch_rows_per_s": rows / batch_s,
+    }
+
+
+if __name__ == "__main__":
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    for key, value in run(calls).items():
+        print(f"{key:18s} {value:>14,.2f}")
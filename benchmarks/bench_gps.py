@@ -0,0 +1,72 @@
+"""
+GPS parse rate on synthetic NEO-M9N captures (see tests/data/README.md):
+NMEA (tests/data/neo_m9n_5hz.nmea, RMC+VTG+GGA+GSA per fix) against UBX
+NAV-PVT (tests/data/neo_m9n_navpvt_10hz.ubx, one frame per fix).
+
+    python -m benchmarks.bench_gps [capture.nmea] [repeat]
+"""
+
+import os
+import sys
+import time
+
+from stormpod.sensors.sensor_gps import GPSSensor
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "tests", "data")
+DEFAULT_CAPTURE = os.path.join(DATA_DIR, "neo_m9n_5hz.nmea")
+UBX_CAPTURE = os.path.join(DATA_DIR, "neo_m9n_navpvt_10hz.ubx")
+NMEA_SENTENCES_PER_FIX = 4
+
+
+def _parser(protocol="nmea"):
+    # Any object will do for the port; feed() never touches it
+    return GPSSensor(ser=object(), protocol=protocol)
+
+
+def run_ubx(path=UBX_CAPTURE, repeat=200, chunk=512):
+    with open(path, "rb") as f:
+        raw = f.read() * repeat
+    gps = _parser("ubx")
+    start = time.perf_counter()
+    for i in range(0, len(raw), chunk):
+        gps.feed(raw[i:i + chunk])
+    elapsed = time.perf_counter() - start
+    fixes = gps.counters["sentences"]
+    return {"fixes": fixes, "us_per_fix": elapsed / fixes * 1e6, "fixes_per_s": fixes / elapsed}
+
+
+def run(path=DEFAULT_CAPTURE, repeat=200, chunk=512):
+    with open(path, "rb") as f:
+        raw = f.read() * repeat
+
+    gps = _parser()
+    start = time.perf_counter()
+    for i in range(0, len(raw), chunk):
+        gps.feed(raw[i:i + chunk])
+    stream_s = time.perf_counter() - start
+
+    lines = raw.decode("ascii", errors="ignore").splitlines()
+    gps = _parser()
+    start = time.perf_counter()
+    for line in lines:
+        gps._parse_line(line)
+    line_s = time.perf_counter() - start
+
+    ubx = run_ubx(repeat=repeat, chunk=chunk)
+    return {
+        "sentences": len(lines),
+        "nmea_us_per_fix": stream_s / len(lines) * 1e6 * NMEA_SENTENCES_PER_FIX,
+        "ubx_us_per_fix": ubx["us_per_fix"],
+        "ubx_fixes_per_s": ubx["fixes_per_s"],
+        "stream_sentences_per_s": len(lines) / stream_s,
+        "stream_us_per_sentence": stream_s / len(lines) * 1e6,
+        "parse_line_us_per_sentence": line_s / len(lines) * 1e6,
+        "mb_per_s": len(raw) / stream_s / 1e6,
+    }
+
+
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_CAPTURE
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    for key, value in run(path, repeat).items():
+        print(f"{key:28s} {value:>14,.2f}")
@@ -0,0 +1,142 @@
+"""
+GUI update cost per frame for StormPODGUI and EnhancedStormPODGUI, from
+snapshot to rendered widgets. With a display (or Xvfb) the real GUIs are
+built on replay hardware and each frame ends with update_idletasks().
+Without one, the update functions run against stub labels, so only the
+Python-side formatting and diffing is measured.
+
+    python -m benchmarks.bench_gui [frames]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from stormpod.gui_main import StormPODGUI
+from stormpod.render import DiffRenderer
+
+
+def _samples(frames):
+    # A value changes roughly every fifth frame, like a 5 Hz refresh of 1 Hz data
+    for i in range(frames):
+        tick = i // 5
+        yield {
+            "temp_C": 18.5 + (tick % 3) * 0.1, "humidity_%": 65.2, "pressure_hPa": 1008.4,
+            "speed_kph": 30.0 + tick % 7, "angle_deg": 225.0 + tick % 4, "wind_raw": 412,
+            "fix": True, "lat": 43.6532, "lon": -79.3832, "heading_deg": 90.0 + tick % 2,
+            "lightning": tick % 10 == 0, "distance_km": 14,
+        }
+
+
+class _StubLabel:
+    def config(self, **options):
+        pass
+
+
+class _StubManager:
+    status = {}
+
+    def sensor_state(self, name):
+        return "ready"
+
+
+def _summary(times):
+    times.sort()
+    return {"frame_ms_median": times[len(times) // 2] * 1000, "frame_ms_p95": times[int(len(times) * 0.95)] * 1000}
+
+
+def _stub_basic():
+    gui = StormPODGUI.__new__(StormPODGUI)
+    gui.manager = _StubManager()
+    gui.renderer = DiffRenderer()
+    for name in ("alert", "heading", "wind", "temp", "humid", "press", "angle"):
+        gui.renderer.bind_label(name, _StubLabel())
+
+    def frame(data):
+        gui.renderer.render(gui.format_fields(data))
+    return frame
+
+
+def _stub_enhanced():
+    from gui_enhanced import RENDERED_LABELS, EnhancedStormPODGUI
+    from stormpod.alerts import load_engine
+    gui = EnhancedStormPODGUI.__new__(EnhancedStormPODGUI)
+    gui.manager = _StubManager()
+    gui.alerts = load_engine()
+    gui.renderer = DiffRenderer()
+    for name in RENDERED_LABELS:
+        gui.renderer.bind_label(name, _StubLabel())
+
+    def frame(data):
+        fields = {}
+        gui.update_dashboard(data, fields)
+        gui.check_alerts(data, fields)
+        gui.apply_sensor_states(data, fields)
+        gui.renderer.render(fields)
+    return frame
+
+
+def _real(root, workdir, enhanced):
+    from stormpod.replay import ReplaySensors
+    from stormpod.sensor_manager import SensorManager
+    hw = ReplaySensors()
+    manager = SensorManager(sensors=hw.sensors, store_path=None,
+                            log_path=os.path.join(workdir, "gui.csv"))
+    if enhanced:
+        from gui_enhanced import EnhancedStormPODGUI
+        gui = EnhancedStormPODGUI(root, manager=manager)
+    else:
+        gui = StormPODGUI(root, manager=manager)
+
+    def frame(data):
+        if enhanced:
+            fields = {}
+            gui.update_dashboard(data, fields)
+            gui.check_alerts(data, fields)
+            gui.apply_sensor_states(data, fields)
+            gui.renderer.render(fields)
+        else:
+            gui.renderer.render(gui.format_fields(data))
+        root.update_idletasks()
+    return frame, manager, hw
+
+
+def run(frames=2000):
+    try:
+        import tkinter as tk
+        root = tk.Tk()
+    except Exception:
+        root = None
+
+    results = {"display": root is not None}
+    for name, enhanced in (("basic", False), ("enhanced", True)):
+        cleanup = None
+        if root is None:
+            frame = _stub_enhanced() if enhanced else _stub_basic()
+        else:
+            workdir = tempfile.mkdtemp()
+            frame, manager, hw = _real(tk.Toplevel(root), workdir, enhanced)
+            cleanup = (manager, hw)
+        times = []
+        for data in _samples(frames):
+            start = time.perf_counter()
+            frame(data)
+            times.append(time.perf_counter() - start)
+        results[name] = _summary(times)
+        if cleanup:
+            cleanup[0].stop()
+            cleanup[1].close()
+    if root is not None:
+        root.destroy()
+    return results
+
+
+if __name__ == "__main__":
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    results = run(frames)
+    if not results.pop("display"):
+        print("(no display: stub labels, Python-side cost only)")
+    for name, r in results.items():
+        print(f"{name:10s} median {r['frame_ms_median']:7.3f} ms   p95 {r['frame_ms_p95']:7.3f} ms")
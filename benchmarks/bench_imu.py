@@ -0,0 +1,55 @@
+"""
+IMU heading path: IMUSensor._quat_to_yaw alone, one on-demand
+IMUSensor.read() against a FakeBNO, one HeadingFusion.update_imu, and
+the rate the background sampler actually achieves at 400 Hz.
+
+    python -m benchmarks.bench_imu [calls]
+"""
+
+import sys
+import time
+
+from stormpod.fusion import HeadingFusion
+from stormpod.sensors.fakes import FakeBNO, quat_from_yaw
+from stormpod.sensors.sensor_imu import IMUSensor
+
+
+def run(calls=200_000, sample_s=1.0):
+    bno = FakeBNO()
+    imu = IMUSensor(bno=bno, rate_hz=None)
+    quats = [quat_from_yaw(i % 360) for i in range(360)]
+
+    start = time.perf_counter()
+    for i in range(calls):
+        imu._quat_to_yaw(*quats[i % 360])
+    yaw_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(calls):
+        bno.set_quaternion(*quats[i % 360])
+        imu.read()
+    read_s = time.perf_counter() - start
+
+    fusion = HeadingFusion()
+    start = time.perf_counter()
+    for i in range(calls):
+        fusion.update_imu(i % 360, i * 0.01)
+    fusion_s = time.perf_counter() - start
+
+    sampler = IMUSensor(bno=bno, rate_hz=400)
+    time.sleep(sample_s)
+    sampler.close()
+
+    return {
+        "fusion_update_us": fusion_s / calls * 1e6,
+        "sampled_hz": sampler.samples / sample_s,
+        "quat_to_yaw_us": yaw_s / calls * 1e6,
+        "read_us": read_s / calls * 1e6,
+        "reads_per_s": calls / read_s,
+    }
+
+
+if __name__ == "__main__":
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    for key, value in run(calls).items():
+        print(f"{key:16s} {value:>12,.2f}")
@@ -0,0 +1,45 @@
+"""
+StormTracker.add_strike() in an intense storm, and read().
+
+Strikes arrive every ``interval_s`` from three cells, so the fit windows
+and rate counters stay full the whole run.
+
+    python -m benchmarks.bench_lightning [strikes]
+"""
+
+import sys
+import time
+
+from stormpod.lightning_tracker import StormTracker
+
+
+def run(strikes=100_000, interval_s=2.0):
+    tracker = StormTracker()
+    cells = (40.0, 25.0, 12.0)
+    t0 = 1_700_000_000.0
+    start = time.perf_counter()
+    for i in range(strikes):
+        t = t0 + i * interval_s
+        base = cells[i % 3]
+        # Cells drift in and out by a few km over the run
+        tracker.add_strike(round(base + 3.0 * ((i // 300) % 5 - 2)), t)
+    update_s = time.perf_counter() - start
+
+    reads = max(1, strikes // 100)
+    start = time.perf_counter()
+    for _ in range(reads):
+        tracker.read(now=t)
+    read_s = time.perf_counter() - start
+
+    return {
+        "add_strike_us": update_s / strikes * 1e6,
+        "read_us": read_s / reads * 1e6,
+        "strikes_per_s": strikes / update_s,
+        "fit_window_strikes": sum(len(c) for c in tracker.cells),
+    }
+
+
+if __name__ == "__main__":
+    strikes = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    for key, value in run(strikes).items():
+        print(f"{key:20s} {value:>14,.2f}")
@@ -0,0 +1,60 @@
+"""
+Logger throughput: the original per-row logger.log() against BufferedLogger.
+
+    python -m benchmarks.bench_logger [rows]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from stormpod import logger
+from stormpod.logger import BufferedLogger
+
+SAMPLE = {
+    "time_utc": "153045", "temp_C": 18.5, "humidity_%": 65.2, "pressure_hPa": 1013.2,
+    "wind_raw": 412, "wind_volts": 1.33, "speed_kph": 42.3,
+    "fix": True, "lat": 43.6532, "lon": -79.3832, "heading_deg": 225.0,
+}
+
+
+def bench_log_function(rows, workdir):
+    path = os.path.join(workdir, "legacy.csv")
+    old = logger.LOGFILE
+    logger.LOGFILE = path
+    try:
+        start = time.perf_counter()
+        for _ in range(rows):
+            logger.log(SAMPLE)
+        elapsed = time.perf_counter() - start
+    finally:
+        logger.LOGFILE = old
+    return {"rows_per_s": rows / elapsed, "caller_us_per_row": elapsed / rows * 1e6}
+
+
+def bench_buffered_logger(rows, workdir, fsync="flush"):
+    path = os.path.join(workdir, f"buffered-{fsync}.csv")
+    log = BufferedLogger(path, flush_rows=256, fsync=fsync)
+    start = time.perf_counter()
+    for _ in range(rows):
+        log.log(SAMPLE)
+    caller = time.perf_counter() - start
+    log.close()
+    total = time.perf_counter() - start
+    return {"rows_per_s": rows / total, "caller_us_per_row": caller / rows * 1e6}
+
+
+def run(rows=20000):
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        results["log_function"] = bench_log_function(rows, workdir)
+        for policy in ("none", "flush"):
+            results[f"buffered_fsync_{policy}"] = bench_buffered_logger(rows, workdir, policy)
+    return results
+
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    for name, r in run(rows).items():
+        print(f"{name:24s} {r['rows_per_s']:>12,.0f} rows/s   {r['caller_us_per_row']:8.2f} µs/row in caller")
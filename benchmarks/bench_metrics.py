@@ -0,0 +1,48 @@
+"""
+Cost of recording metrics, and of a scrape of the full registry.
+
+    python -m benchmarks.bench_metrics [ops]
+"""
+
+import sys
+import time
+
+from stormpod import metrics
+from stormpod import logger, sensor_manager  # noqa: F401  (declare the app's metrics)
+from stormpod.sensors import sensor_as3935, sensor_gps, sensor_imu  # noqa: F401
+
+
+def _per_op_ns(fn, ops):
+    start = time.perf_counter()
+    for _ in range(ops):
+        fn()
+    return (time.perf_counter() - start) / ops * 1e9
+
+
+def run(ops=500_000, scrapes=200):
+    reg = metrics.Registry()
+    counter = reg.counter("bench_total", "Counter")
+    child = reg.counter("bench_labelled_total", "Labelled", ["kind"]).labels(kind="a")
+    gauge = reg.gauge("bench_gauge", "Gauge")
+    hist = reg.histogram("bench_seconds", "Histogram")
+
+    empty_ns = _per_op_ns(lambda: None, ops)
+    results = {
+        "counter_inc_ns": _per_op_ns(counter.inc, ops) - empty_ns,
+        "labelled_inc_ns": _per_op_ns(child.inc, ops) - empty_ns,
+        "gauge_set_ns": _per_op_ns(lambda: gauge.set(1.0), ops) - empty_ns,
+        "histogram_observe_ns": _per_op_ns(lambda: hist.observe(0.003), ops) - empty_ns,
+    }
+
+    start = time.perf_counter()
+    for _ in range(scrapes):
+        text = metrics.REGISTRY.expose()
+    results["scrape_us"] = (time.perf_counter() - start) / scrapes * 1e6
+    results["scrape_bytes"] = len(text)
+    return results
+
+
+if __name__ == "__main__":
+    ops = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    for key, value in run(ops).items():
+        print(f"{key:22s} {value:>14,.2f}")
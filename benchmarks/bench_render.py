@@ -0,0 +1,104 @@
+"""
+Dashboard render cost per frame: configuring every label each tick (the
+old update loops) against DiffRenderer, and Labels against a single
+Canvas. Needs a display for the Tk numbers; without one only the Python
+side is measured, against stub widgets.
+
+    python -m benchmarks.bench_render [frames]
+"""
+
+import sys
+import time
+
+from stormpod.render import CanvasDashboard, DiffRenderer
+
+FIELDS = ["alert", "heading", "wind", "temp", "humid", "press", "angle"]
+
+
+def _frame(i):
+    # Values change about once a second at a 5 Hz refresh
+    tick = i // 5
+    return {
+        "alert": "",
+        "heading": f"Heading: {180 + tick % 3:.1f}° S",
+        "wind": f"Wind: {30 + tick % 7:.1f} km/h",
+        "temp": f"Temp: {18.5 + (tick % 2) * 0.1:.1f} °C",
+        "humid": "Humidity: 65.2 %",
+        "press": "Pressure: 1008.4 hPa",
+        "angle": f"Wind Dir: {225 + tick % 4:.1f}° SW",
+    }
+
+
+class _Stub:
+    def config(self, **options):
+        pass
+
+    def create_text(self, *args, **options):
+        return 1
+
+    def itemconfigure(self, item, **options):
+        pass
+
+
+def _time(frames, fn, flush=None):
+    times = []
+    for i in range(frames):
+        start = time.perf_counter()
+        fn(_frame(i))
+        if flush:
+            flush()
+        times.append(time.perf_counter() - start)
+    times.sort()
+    return {"frame_ms_median": times[len(times) // 2] * 1000, "frame_ms_max": times[-1] * 1000}
+
+
+def run(frames=500):
+    try:
+        import tkinter as tk
+        root = tk.Tk()
+    except Exception:
+        root = None
+
+    if root is None:
+        labels = {name: _Stub() for name in FIELDS}
+        canvas = _Stub()
+        flush = None
+    else:
+        root.geometry("1024x600")
+        labels = {}
+        for name in FIELDS:
+            labels[name] = tk.Label(root, text="--", font=("Inconsolata", 22))
+            labels[name].pack()
+        canvas = tk.Canvas(root, width=1024, height=600)
+        flush = root.update
+
+    def config_all(fields):
+        for name, text in fields.items():
+            labels[name].config(text=text)
+
+    renderer = DiffRenderer()
+    for name in FIELDS:
+        renderer.bind_label(name, labels[name])
+
+    dash = CanvasDashboard(canvas)
+    for i, name in enumerate(FIELDS):
+        dash.add_field(name, 10, 20 + 40 * i)
+
+    results = {
+        "display": root is not None,
+        "config_every_label": _time(frames, config_all, flush),
+        "diff_labels": _time(frames, renderer.render, flush),
+        "diff_canvas": _time(frames, dash.render, flush),
+    }
+    if root is not None:
+        root.destroy()
+    return results
+
+
+if __name__ == "__main__":
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    results = run(frames)
+    if not results.pop("display"):
+        print("(no display: stub widgets, Python-side cost only)")
+    for name, r in results.items():
+        print(f"{name:20s} median {r['frame_ms_median']:7.3f} ms   max {r['frame_ms_max']:7.3f} ms")
@@ -0,0 +1,53 @@
+"""
+SQLite store: insert throughput and query latency on a million-row store.
+
+    python -m benchmarks.bench_store [samples]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from stormpod.store import SQLiteStore
+
+SAMPLE = {
+    "temp_C": 18.5, "humidity_%": 65.2, "pressure_hPa": 1013.2,
+    "angle_deg": 225.0, "speed_kph": 42.3, "wind_raw": 412, "wind_volts": 1.33,
+    "fix": True, "lat": 43.6532, "lon": -79.3832, "heading_deg": 225.0,
+}
+
+
+def run(samples=1_000_000, batch=1000):
+    with tempfile.TemporaryDirectory() as workdir:
+        store = SQLiteStore(os.path.join(workdir, "bench.db"), background=False)
+        t0 = 1.7e9
+        start = time.perf_counter()
+        for base in range(0, samples, batch):
+            store.insert_many([(t0 + i, SAMPLE) for i in range(base, min(base + batch, samples))])
+        insert_s = time.perf_counter() - start
+
+        def timed(fn, repeat=20):
+            start = time.perf_counter()
+            for _ in range(repeat):
+                fn()
+            return (time.perf_counter() - start) / repeat * 1e3
+
+        mid = t0 + samples / 2
+        results = {
+            "samples": samples,
+            "rows": store.rows_inserted,
+            "insert_rows_per_s": store.rows_inserted / insert_s,
+            "query_10min_ms": timed(lambda: store.query("atmos", mid, mid + 600)),
+            "query_1h_ms": timed(lambda: store.query("wind", mid, mid + 3600)),
+            "fetch_unsent_5000_ms": timed(lambda: store.fetch_unsent("gps", limit=5000)),
+            "unsent_count_ms": timed(lambda: store.unsent_count("atmos"), repeat=3),
+        }
+        store.close()
+        return results
+
+
+if __name__ == "__main__":
+    r = run(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
+    for key, value in r.items():
+        print(f"{key:22s} {value:>14,.2f}")
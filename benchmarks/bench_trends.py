@@ -0,0 +1,88 @@
+"""
+Trend redraw cost on the Agg backend (what FigureCanvasTkAgg renders with):
+the original clear-and-replot of all three axes against TrendPlot's
+set_data + blit.
+
+    python -m benchmarks.bench_trends [frames] [points]
+"""
+
+import sys
+import time
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import numpy as np
+
+from stormpod.trends import TrendPlot
+
+SERIES = [
+    ("temp_C", "Temperature (°C)", "#ff6b35"),
+    ("pressure_hPa", "Pressure (hPa)", "#66bb6a"),
+    ("speed_kph", "Wind Speed (km/h)", "#ff9800"),
+]
+
+
+def _data(points, step):
+    t = np.arange(points, dtype=float) + step
+    return t, {
+        "temp_C": 18 + np.sin(t / 40.0),
+        "pressure_hPa": 1008 + 0.5 * np.cos(t / 90.0),
+        "speed_kph": 30 + 10 * np.sin(t / 7.0),
+    }
+
+
+def _summary(frame_times):
+    frame_times = sorted(frame_times)
+    return {
+        "frame_ms_median": frame_times[len(frame_times) // 2] * 1000,
+        "frame_ms_p95": frame_times[int(len(frame_times) * 0.95)] * 1000,
+    }
+
+
+def bench_clear_replot(frames, points):
+    fig, axes = plt.subplots(3, 1, figsize=(12, 8), facecolor="#0a0a0a")
+    times = []
+    for step in range(frames):
+        t, cols = _data(points, step)
+        start = time.perf_counter()
+        for ax, (key, label, color) in zip(axes, SERIES):
+            ax.clear()
+            ax.set_facecolor("#0a0a0a")
+            ax.tick_params(colors="white")
+            ax.plot(t, cols[key], color, linewidth=2)
+            ax.set_ylabel(label, color="white")
+            ax.grid(True, alpha=0.3)
+        fig.canvas.draw()
+        times.append(time.perf_counter() - start)
+    plt.close(fig)
+    return _summary(times)
+
+
+def bench_blit(frames, points):
+    fig, axes = plt.subplots(3, 1, figsize=(12, 8), facecolor="#0a0a0a")
+    plot = TrendPlot(fig, axes, SERIES, window_s=points)
+    times = []
+    for step in range(frames):
+        t, cols = _data(points, step)
+        start = time.perf_counter()
+        plot.update(t, cols, now=t[-1])
+        plot.draw()
+        times.append(time.perf_counter() - start)
+    plt.close(fig)
+    return dict(_summary(times), full_redraws=plot.full_redraws)
+
+
+def run(frames=100, points=300):
+    return {
+        "clear_replot": bench_clear_replot(frames, points),
+        "blit": bench_blit(frames, points),
+    }
+
+
+if __name__ == "__main__":
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    points = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+    for name, r in run(frames, points).items():
+        extra = f"   {r['full_redraws']} full redraws" if "full_redraws" in r else ""
+        print(f"{name:14s} median {r['frame_ms_median']:7.2f} ms   p95 {r['frame_ms_p95']:7.2f} ms{extra}")
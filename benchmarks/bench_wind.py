@@ -0,0 +1,57 @@
+"""
+True wind: one wind.true_wind() call (the live path), true_wind_batch()
+over NumPy columns, and wind.reprocess() over a binary log on disk.
+
+    python -m benchmarks.bench_wind [rows]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from stormpod.binlog import BinaryLogger
+from stormpod.wind import reprocess, true_wind, true_wind_batch
+
+
+def run(rows=1_000_000, calls=100_000, log_rows=200_000):
+    rng = np.random.default_rng(0)
+    cols = (rng.uniform(0, 100, rows), rng.uniform(0, 360, rows),
+            rng.uniform(0, 110, rows), rng.uniform(0, 360, rows))
+
+    samples = list(zip(*(c[:1000].tolist() for c in cols)))
+    start = time.perf_counter()
+    for i in range(calls):
+        true_wind(*samples[i % 1000])
+    scalar_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    true_wind_batch(*cols)
+    batch_s = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as workdir:
+        path = os.path.join(workdir, "log.bin")
+        log = BinaryLogger(path, background=False, flush_rows=10_000, fsync="none")
+        for i in range(log_rows):
+            j = i % 1000
+            log.log({"time_utc": 120000, "speed_kph": cols[0][j], "angle_deg": cols[1][j],
+                     "ground_speed_kph": cols[2][j], "heading_deg": cols[3][j], "fix": True})
+        log.close()
+        start = time.perf_counter()
+        reprocess(path)
+        reprocess_s = time.perf_counter() - start
+
+    return {
+        "scalar_us": scalar_s / calls * 1e6,
+        "batch_rows_per_s": rows / batch_s,
+        "reprocess_bin_ms": reprocess_s * 1000,
+        "reprocess_rows_per_s": log_rows / reprocess_s,
+    }
+
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    for key, value in run(rows).items():
+        print(f"{key:22s} {value:>16,.2f}")
@@ -0,0 +1,45 @@
+"""
+WindStats.update() per 5 Hz frame with full 2/10 min windows, and read().
+
+    python -m benchmarks.bench_wind_stats [frames]
+"""
+
+import math
+import sys
+import time
+
+from stormpod.wind_stats import WindStats
+
+
+def run(frames=200_000):
+    stats = WindStats()
+    warm = 3000  # fill the 10 min window first
+    for i in range(warm):
+        stats.update(20.0, 270.0, t=i / 5.0, wall=i / 5.0)
+
+    speeds = [20.0 + 10.0 * math.sin(i / 7.0) for i in range(1000)]
+    dirs = [(270.0 + 30.0 * math.sin(i / 11.0)) % 360 for i in range(1000)]
+    start = time.perf_counter()
+    for i in range(frames):
+        t = (warm + i) / 5.0
+        stats.update(speeds[i % 1000], dirs[i % 1000], t=t, wall=t)
+    update_s = time.perf_counter() - start
+
+    reads = max(1, frames // 100)
+    start = time.perf_counter()
+    for _ in range(reads):
+        stats.read(now=t)
+    read_s = time.perf_counter() - start
+
+    return {
+        "update_us": update_s / frames * 1e6,
+        "read_us": read_s / reads * 1e6,
+        "updates_per_s": frames / update_s,
+        "window_samples": len(stats.long),
+    }
+
+
+if __name__ == "__main__":
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    for key, value in run(frames).items():
+        print(f"{key:16s} {value:>14,.2f}")
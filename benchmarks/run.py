@@ -0,0 +1,173 @@
+"""
+Benchmark suite runner
+----------------------
+Runs the bench_* modules (no hardware needed), flattens their results to
+``bench.case.metric`` numbers and optionally saves them as a JSON
+baseline or compares against one.
+
+    python -m benchmarks.run --quick                      # print only
+    python -m benchmarks.run --save                       # baselines/<commit>.json
+    python -m benchmarks.run --compare baselines/abc1234.json
+    python -m benchmarks.run --only can,gps,poll --compare base.json --threshold 0.2
+
+Metrics ending in ``per_s`` are better when higher; timings (``_us``,
+``_ms``, ``_s``) are better when lower; anything else (counts, sizes) is
+reported but never flagged. --compare exits with status 1 if any metric
+regressed by more than --threshold.
+"""
+
+import argparse
+import importlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import traceback
+
+BASELINE_DIR = os.path.join(os.path.dirname(__file__), "baselines")
+
+# name -> (module, quick kwargs). Hot paths first.
+SUITE = {
+    "can": ("benchmarks.bench_can", {"frames": 20_000}),
+    "gps": ("benchmarks.bench_gps", {"repeat": 20}),
+    "logger": ("benchmarks.bench_logger", {"rows": 5_000}),
+    "imu": ("benchmarks.bench_imu", {"calls": 20_000, "sample_s": 0.3}),
+    "poll": ("benchmarks.bench_poll", {"cycles": 1_000}),
+    "wind_stats": ("benchmarks.bench_wind_stats", {"frames": 20_000}),
+    "lightning": ("benchmarks.bench_lightning", {"strikes": 10_000}),
+    "alerts": ("benchmarks.bench_alerts", {"rules": 2000, "snapshots": 200}),
+    "metrics": ("benchmarks.bench_metrics", {"ops": 50_000, "scrapes": 20}),
+    "derived": ("benchmarks.bench_derived", {"calls": 10_000, "rows": 100_000}),
+    "wind": ("benchmarks.bench_wind", {"rows": 100_000, "calls": 10_000, "log_rows": 20_000}),
+    "gui": ("benchmarks.bench_gui", {"frames": 500}),
+    "render": ("benchmarks.bench_render", {"frames": 200}),
+    "trends": ("benchmarks.bench_trends", {"frames": 20}),
+    "as3935": ("benchmarks.bench_as3935", {"seconds": 0.5}),
+    "store": ("benchmarks.bench_store", {"samples": 50_000}),
+    "binlog": ("benchmarks.bench_binlog", {"rows": 20_000}),
+}
+
+
+def flatten(results, prefix=""):
+    """Nested result dicts -> {"a.b.c": number}; non-numeric values are dropped."""
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}.{key}" if prefix else str(key)
+        if isinstance(value, dict):
+            flat.update(flatten(value, name))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = float(value)
+    return flat
+
+
+def direction(metric):
+    """+1 if higher is better, -1 if lower is better, 0 if informational."""
+    leaf = metric.rsplit(".", 1)[-1]
+    if leaf.endswith("per_s"):
+        return 1
+    if leaf.endswith(("_us", "_ms", "_s")) or "_ms_" in leaf or "_us_" in leaf \
+            or leaf.startswith(("us_", "ms_")):
+        return -1
+    return 0
+
+
+def compare(baseline, current, threshold=0.15):
+    """Rows of (metric, base, now, change, regressed) for metrics in both."""
+    rows = []
+    for metric in sorted(set(baseline) & set(current)):
+        base, now = baseline[metric], current[metric]
+        sign = direction(metric)
+        change = (now - base) / base if base else 0.0
+        regressed = sign != 0 and -sign * change > threshold
+        rows.append((metric, base, now, change, regressed))
+    return rows
+
+
+def run_suite(names, quick=False):
+    results, errors = {}, {}
+    for name in names:
+        module_name, quick_kwargs = SUITE[name]
+        start = time.perf_counter()
+        try:
+            module = importlib.import_module(module_name)
+            results[name] = module.run(**(quick_kwargs if quick else {}))
+        except Exception as e:
+            errors[name] = f"{type(e).__name__}: {e}"
+            traceback.print_exc()
+        print(f"  {name:8s} {time.perf_counter() - start:6.1f} s"
+              f"{'  FAILED' if name in errors else ''}", file=sys.stderr)
+    return results, errors
+
+
+def _git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                             text=True, cwd=os.path.dirname(__file__), timeout=10)
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                               capture_output=True, text=True,
+                               cwd=os.path.dirname(__file__), timeout=10).stdout.strip()
+        return out.stdout.strip() + ("-dirty" if dirty else "") or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="StormPOD benchmark suite")
+    p.add_argument("--only", help="comma-separated subset of: " + ",".join(SUITE))
+    p.add_argument("--quick", action="store_true", help="small inputs (CI / smoke runs)")
+    p.add_argument("--save", nargs="?", const="", metavar="PATH",
+                   help="write a JSON baseline (default baselines/<commit>.json)")
+    p.add_argument("--compare", metavar="BASELINE", help="compare against a saved baseline")
+    p.add_argument("--threshold", type=float, default=0.15,
+                   help="relative change counted as a regression (default 0.15)")
+    args = p.parse_args(argv)
+
+    names = args.only.split(",") if args.only else list(SUITE)
+    unknown = [n for n in names if n not in SUITE]
+    if unknown:
+        p.error(f"unknown benchmark(s): {', '.join(unknown)}")
+
+    results, errors = run_suite(names, args.quick)
+    flat = flatten(results)
+    report = {
+        "commit": _git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "machine": f"{platform.system()} {platform.machine()}",
+        "quick": args.quick,
+        "errors": errors,
+        "metrics": flat,
+    }
+
+    if args.save is not None:
+        path = args.save or os.path.join(BASELINE_DIR, f"{report['commit'] or 'baseline'}.json")
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print(f"saved {len(flat)} metrics to {path}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline.get("quick") != args.quick:
+            print("⚠️ baseline and this run use different input sizes (--quick)")
+        rows = compare(baseline["metrics"], flat, args.threshold)
+        print(f"{'metric':48s} {'baseline':>14s} {'now':>14s} {'change':>8s}")
+        for metric, base, now, change, regressed in rows:
+            flag = "  REGRESSED" if regressed else ""
+            print(f"{metric:48s} {base:14,.3f} {now:14,.3f} {change:+8.1%}{flag}")
+        regressions = [r for r in rows if r[4]]
+        print(f"{len(regressions)} regression(s) over {args.threshold:.0%} "
+              f"against {baseline.get('commit')}")
+        return 1 if regressions or errors else 0
+
+    if args.save is None:
+        for metric, value in flat.items():
+            print(f"{metric:48s} {value:14,.3f}")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,41 +5,68 @@ Enhanced StormPOD GUI
 Improved interface with data trends, alerts, and better visualization.
 """
 
+import sys
+import time
 import tkinter as tk
 from tkinter import ttk
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from matplotlib.animation import FuncAnimation
-import numpy as np
 from datetime import datetime, timedelta
-from collections import deque
-import sys
-import os
+from stormpod import metrics
+from stormpod.alerts import load_engine
+from stormpod.gui_main import FRAME_SECONDS, panel_state
+from stormpod.sensor_manager import (FAILED, INITIALIZING, READY, RECONNECTING, STALE,
+                                     SensorManager)
+from stormpod.render import DiffRenderer
+from stormpod.trends import TrendPlot
 
-# Add the stormpod package to Python path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'stormpod'))
-from sensor_manager import SensorManager
+UPDATE_INTERVAL_MS = 200
+# Dashboard labels driven through the DiffRenderer (attribute <name>_label)
+RENDERED_LABELS = ("temp", "humid", "press", "wind_speed", "wind_dir", "gps",
+                   "heading", "lightning", "alert", "status")
+# Dashboard label -> sensor feeding it, for the initializing/unavailable states
+# ("heading" is the fused heading, see gui_main.panel_state)
+PANEL_SENSORS = {"temp": "can", "humid": "can", "press": "can", "wind_speed": "can",
+                 "wind_dir": "can", "gps": "gps", "heading": "heading", "lightning": "lightning"}
+STATE_TEXT = {"initializing": ("initializing…", "#888888"), "failed": ("unavailable", "#f44336"),
+              "stale": ("no data", "#ff9800"), "reconnecting": ("reconnecting…", "#ff9800")}
+# Alert banner shows at most this many active alerts
+ALERT_LINES = 2
+TREND_REDRAW_MS = 2000
+DIAGNOSTICS_REFRESH_MS = 1000
+METRICS_PORT = 9108
+FRAME_SECONDS_ENHANCED = FRAME_SECONDS.labels(gui="enhanced")
+TREND_MAX_POINTS = 600
+TREND_WINDOWS = [("5 min", 300), ("1 h", 3600), ("6 h", 6 * 3600), ("24 h", 24 * 3600)]
+TREND_SERIES = [
+    ("temp_C", "Temperature (°C)", "#ff6b35"),
+    ("pressure_hPa", "Pressure (hPa)", "#66bb6a"),
+    ("true_wind_kph", "True Wind (km/h)", "#ff9800"),
+]
 
 class EnhancedStormPODGUI:
-    def __init__(self, root):
-        self.manager = SensorManager()
+    def __init__(self, root, manager=None, diagnostics=False):
+        """``diagnostics`` adds a tab with the app's own metrics (rates and latencies)."""
+        self.manager = manager or SensorManager()
+        self.manager.start()
         self.root = root
         self.root.title("StormPOD - Live Atmospheric Monitoring")
         self.root.geometry("1024x600")
         self.root.configure(bg="#0a0a0a")
         
-        # Data storage for trends
-        self.max_points = 300  # 5 minutes at 1Hz
-        self.timestamps = deque(maxlen=self.max_points)
-        self.temperature_data = deque(maxlen=self.max_points)
-        self.pressure_data = deque(maxlen=self.max_points)
-        self.wind_speed_data = deque(maxlen=self.max_points)
+        # Trend data lives in the manager's multi-resolution history
+        self.history = self.manager.history
+        self.trend_window_s = TREND_WINDOWS[0][1]
+        self._trends_version = None
         
-        # Alert system
+        # Alert system (rules from stormpod/alerts.yaml)
+        self.alerts = load_engine()
         self.alert_active = False
         self.alert_flash_count = 0
         
+        self.diagnostics = diagnostics
         self.setup_ui()
+        self.renderer = DiffRenderer()
+        for name in RENDERED_LABELS:
+            self.renderer.bind_label(name, getattr(self, f"{name}_label"))
         self.update_loop()
         
     def setup_ui(self):
@@ -72,11 +99,25 @@ class EnhancedStormPODGUI:
         self.trends_frame = tk.Frame(self.notebook, bg="#0a0a0a")
         self.notebook.add(self.trends_frame, text="📈 Trends")
         
+        # Diagnostics tab (optional): metrics.REGISTRY as text
+        if self.diagnostics:
+            self.diagnostics_frame = tk.Frame(self.notebook, bg="#0a0a0a")
+            self.notebook.add(self.diagnostics_frame, text="🩺 Diagnostics")
+            self.diagnostics_label = tk.Label(
+                self.diagnostics_frame, text="", font=("Courier", 10), fg="#cccccc",
+                bg="#0a0a0a", justify="left", anchor="nw"
+            )
+            self.diagnostics_label.pack(fill="both", expand=True, padx=5, pady=5)
+            self.digest = metrics.Digest()
+            self.diagnostics_loop()
+        
         # Setup dashboard
         self.setup_dashboard()
         
-        # Setup trends
-        self.setup_trends()
+        # Trends (and matplotlib) are built on first visit to the tab
+        self.trend_plot = None
+        self.trends_unavailable = False
+        self.notebook.bind("<<NotebookTabChanged>>", self._on_tab_changed)
         
     def setup_dashboard(self):
         # Left column - Environmental data
@@ -176,165 +217,237 @@ class EnhancedStormPODGUI:
         return value_label
         
     def setup_trends(self):
+        # Imported here so matplotlib stays off the start-up path
+        import matplotlib.pyplot as plt
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        
         # Create matplotlib figure
         self.fig, (self.ax1, self.ax2, self.ax3) = plt.subplots(
             3, 1, figsize=(12, 8), facecolor='#0a0a0a'
         )
         
-        # Style the plots
-        for ax in [self.ax1, self.ax2, self.ax3]:
-            ax.set_facecolor('#0a0a0a')
-            ax.tick_params(colors='white')
-            ax.spines['bottom'].set_color('white')
-            ax.spines['top'].set_color('white') 
-            ax.spines['right'].set_color('white')
-            ax.spines['left'].set_color('white')
-            
-        self.ax1.set_ylabel('Temperature (°C)', color='white')
-        self.ax2.set_ylabel('Pressure (hPa)', color='white')
-        self.ax3.set_ylabel('Wind Speed (km/h)', color='white')
-        self.ax3.set_xlabel('Time', color='white')
+        # Time window selector
+        window_bar = tk.Frame(self.trends_frame, bg="#0a0a0a")
+        window_bar.pack(fill="x")
+        self.trend_window_var = tk.IntVar(value=self.trend_window_s)
+        for text, seconds in TREND_WINDOWS:
+            tk.Radiobutton(
+                window_bar, text=text, value=seconds,
+                variable=self.trend_window_var, command=self._on_window_changed,
+                font=("Arial", 10), fg="#ffffff", bg="#0a0a0a",
+                selectcolor="#333333", indicatoron=False, padx=8
+            ).pack(side="left", padx=2, pady=2)
         
         # Create canvas
         self.canvas = FigureCanvasTkAgg(self.fig, self.trends_frame)
-        self.canvas.draw()
+        self.trend_plot = TrendPlot(
+            self.fig, [self.ax1, self.ax2, self.ax3], TREND_SERIES,
+            window_s=self.trend_window_s
+        )
         self.canvas.get_tk_widget().pack(fill="both", expand=True)
+        self.trend_loop()
+        
+    def show_trends_unavailable(self, error):
+        print(f"⚠️ Trends unavailable: {error}")
+        self.trends_unavailable = True
+        tk.Label(
+            self.trends_frame, text=f"📈 Trends unavailable\n{error}",
+            font=("Arial", 14), fg="#ff9800", bg="#0a0a0a"
+        ).pack(expand=True)
+        
+    def _on_window_changed(self):
+        self.trend_window_s = self.trend_window_var.get()
+        self.trend_plot.set_window(self.trend_window_s)
+        self._trends_version = None
+        self.update_trends()
+        
+    def trends_visible(self):
+        return self.notebook.select() == str(self.trends_frame)
+        
+    def _on_tab_changed(self, event=None):
+        if self.trends_visible() and not self.trends_unavailable:
+            if self.trend_plot is None:
+                try:
+                    self.setup_trends()
+                except ImportError as e:
+                    # matplotlib is only imported here, after the start-up fallback
+                    self.show_trends_unavailable(e)
+                    return
+            self.trend_plot.invalidate()
+            self._trends_version = None
+            self.update_trends()
         
     def update_trends(self):
-        current_time = datetime.now()
-        self.timestamps.append(current_time)
-        
-        # Get latest data
-        data = self.manager.get_latest()
-        
-        self.temperature_data.append(data.get("temp_C", 0))
-        self.pressure_data.append(data.get("pressure_hPa", 1000))
-        self.wind_speed_data.append(data.get("speed_kph", 0))
-        
-        if len(self.timestamps) > 1:
-            # Clear and replot
-            for ax in [self.ax1, self.ax2, self.ax3]:
-                ax.clear()
-                ax.set_facecolor('#0a0a0a')
-                ax.tick_params(colors='white')
-                
-            # Temperature plot
-            self.ax1.plot(self.timestamps, self.temperature_data, '#ff6b35', linewidth=2)
-            self.ax1.set_ylabel('Temperature (°C)', color='white')
-            self.ax1.grid(True, alpha=0.3)
-            
-            # Pressure plot
-            self.ax2.plot(self.timestamps, self.pressure_data, '#66bb6a', linewidth=2)
-            self.ax2.set_ylabel('Pressure (hPa)', color='white')
-            self.ax2.grid(True, alpha=0.3)
-            
-            # Wind speed plot
-            self.ax3.plot(self.timestamps, self.wind_speed_data, '#ff9800', linewidth=2)
-            self.ax3.set_ylabel('Wind Speed (km/h)', color='white')
-            self.ax3.set_xlabel('Time', color='white')
-            self.ax3.grid(True, alpha=0.3)
-            
-            self.canvas.draw()
+        # Nothing to do while the tab is hidden or no new sample arrived
+        version = self.history.version
+        if version == self._trends_version or not self.trends_visible():
+            return
+        self._trends_version = version
+        times, columns = self.history.columns(
+            [key for key, _, _ in TREND_SERIES], self.trend_window_s, TREND_MAX_POINTS
+        )
+        self.trend_plot.update(times, columns)
+        self.trend_plot.draw()
+        
+    def trend_loop(self):
+        try:
+            self.update_trends()
+        except Exception as e:
+            print(f"Trend update error: {e}")
+        self.root.after(TREND_REDRAW_MS, self.trend_loop)
+        
+    def diagnostics_loop(self):
+        # Only refreshed while the tab is on screen
+        if self.notebook.select() == str(self.diagnostics_frame):
+            try:
+                self.diagnostics_label.config(text="\n".join(self.digest.lines()))
+            except Exception as e:
+                print(f"Diagnostics error: {e}")
+        self.root.after(DIAGNOSTICS_REFRESH_MS, self.diagnostics_loop)
         
     def update_loop(self):
+        start = time.perf_counter()
+        fields = {}
         try:
-            # Poll sensors
-            self.manager.poll_all()
+            # Read the acquisition snapshot (no sensor I/O here)
             data = self.manager.get_latest()
             
             # Update dashboard
-            self.update_dashboard(data)
-            
-            # Update trends
-            self.update_trends()
+            self.update_dashboard(data, fields)
             
             # Check for alerts
-            self.check_alerts(data)
+            self.check_alerts(data, fields)
+            
+            # Panels whose sensor is starting, stale or down say so
+            self.apply_sensor_states(data, fields)
             
             # Update status
-            self.status_label.config(text=f"🔄 Last update: {datetime.now().strftime('%H:%M:%S')}")
+            fields["status"] = self.status_text(self.manager.status)
             
         except Exception as e:
             print(f"Update error: {e}")
-            self.status_label.config(text=f"⚠️ Error: {e}")
+            fields["status"] = f"⚠️ Error: {e}"
+            
+        # Only widgets whose text or colour changed are touched
+        self.renderer.render(fields)
+        FRAME_SECONDS_ENHANCED.observe(time.perf_counter() - start)
             
         # Schedule next update
-        self.root.after(1000, self.update_loop)
-        
-    def update_dashboard(self, data):
+        self.root.after(UPDATE_INTERVAL_MS, self.update_loop)
+        
+    def status_text(self, status):
+        starting = [n for n, s in status.items() if s["state"] == INITIALIZING]
+        if starting:
+            return f"🔄 Starting sensors: {', '.join(starting)}"
+        down = []
+        for name, s in status.items():
+            if s["state"] == FAILED and s["retry_in_s"] is not None:
+                down.append(f"{name} (retry in {s['retry_in_s']:.0f} s)")
+            elif s["state"] in (FAILED, RECONNECTING, STALE):
+                down.append(f"{name} ({s['state']})")
+        if down:
+            return f"⚠️ Sensors down: {', '.join(down)}"
+        return f"🔄 Last update: {datetime.now().strftime('%H:%M:%S')}"
+            
+    def apply_sensor_states(self, data, fields):
+        for name, sensor in PANEL_SENSORS.items():
+            state = panel_state(self.manager, sensor, data)
+            if state != READY:
+                fields[name] = STATE_TEXT[state]
+            
+    def update_dashboard(self, data, fields):
         # Environmental data
         temp = data.get("temp_C")
+        feels = data.get("heat_index_C")
+        if feels is None:
+            feels = data.get("wind_chill_C")
         if temp is not None:
-            self.temp_label.config(text=f"{temp:.1f}°C")
+            fields["temp"] = f"{temp:.1f}°C" + (f" (feels {feels:.0f})" if feels is not None else "")
         
         humidity = data.get("humidity_%")
+        dew_point = data.get("dew_point_C")
         if humidity is not None:
-            self.humid_label.config(text=f"{humidity:.1f}%")
+            fields["humid"] = f"{humidity:.1f}%" + (f" (Td {dew_point:.1f}°C)" if dew_point is not None else "")
             
         pressure = data.get("pressure_hPa") 
         if pressure is not None:
-            self.press_label.config(text=f"{pressure:.1f} hPa")
+            fields["press"] = f"{pressure:.1f} hPa{self._tendency_text(data)}"
             
-        # Wind data
+        # Wind data: true wind once GPS/heading allow it, else apparent
         wind_speed = data.get("speed_kph")
-        if wind_speed is not None:
-            self.wind_speed_label.config(text=f"{wind_speed:.1f} km/h")
+        true_speed = data.get("true_wind_kph")
+        gust = data.get("gust_kph")
+        gust_text = f", G {gust:.0f}" if gust is not None else ""
+        if true_speed is not None:
+            fields["wind_speed"] = f"{true_speed:.1f} km/h (app {wind_speed:.0f}{gust_text})"
+        elif wind_speed is not None:
+            fields["wind_speed"] = f"{wind_speed:.1f} km/h (app{gust_text})"
             
+        true_dir = data.get("true_wind_dir_deg")
         wind_dir = data.get("angle_deg")
-        if wind_dir is not None:
+        if true_dir is not None:
+            fields["wind_dir"] = f"{true_dir:.0f}° {self._deg_to_cardinal(true_dir)}"
+        elif wind_dir is not None:
             cardinal = self._deg_to_cardinal(wind_dir)
-            self.wind_dir_label.config(text=f"{wind_dir:.0f}° {cardinal}")
+            fields["wind_dir"] = f"{wind_dir:.0f}° {cardinal} (rel)"
             
         # GPS data
         if data.get("fix"):
             lat = data.get("lat", 0)
             lon = data.get("lon", 0)
-            self.gps_label.config(text=f"{lat:.4f}, {lon:.4f}", fg="#66bb6a")
+            fields["gps"] = (f"{lat:.4f}, {lon:.4f}", "#66bb6a")
         else:
-            self.gps_label.config(text="No Fix", fg="#f44336")
+            fields["gps"] = ("No Fix", "#f44336")
             
         heading = data.get("heading_deg")
         if heading is not None:
             cardinal = self._deg_to_cardinal(heading)
-            self.heading_label.config(text=f"{heading:.0f}° {cardinal}")
+            fields["heading"] = f"{heading:.0f}° {cardinal}"
+            if data.get("heading_source") == "gps":
+                fields["heading"] += " (GPS)"
             
-    def check_alerts(self, data):
-        # Reset alert state
-        alert_text = ""
-        alert_color = "#ff0000"
-        
-        # Lightning alerts
+    def _tendency_text(self, data):
+        change = data.get("pressure_tendency_3h_hPa")
+        if change is None:
+            return ""
+        arrow = "↑" if change >= 1.0 else "↓" if change <= -1.0 else "→"
+        return f" {arrow}{change:+.1f}/3h"
+
+    def _storm_text(self, data):
+        trend = data.get("storm_trend")
+        if trend == "approaching":
+            text = f" approaching {data['storm_closing_kph']:.0f} km/h"
+            eta = data.get("storm_eta_min")
+            return text + (f", ETA {eta:.0f} min" if eta else ", within 10 km")
+        return f" {trend}" if trend else ""
+        
+    def check_alerts(self, data, fields):
+        # Lightning panel
         if data.get("lightning"):
             distance = data.get("distance_km", "?")
-            alert_text = f"⚡ LIGHTNING DETECTED - {distance} km"
-            self.lightning_label.config(text=f"⚡ {distance} km", fg="#ff0000")
-            self.alert_active = True
+            fields["lightning"] = (f"⚡ {distance} km", "#ff0000")
         elif data.get("noise"):
-            alert_text = "🔊 ELECTROMAGNETIC NOISE DETECTED"
-            self.lightning_label.config(text="🔊 Noise", fg="#ff9800")
+            fields["lightning"] = ("🔊 Noise", "#ff9800")
         elif data.get("disturber"):
-            alert_text = "⚠️ ELECTRICAL INTERFERENCE"  
-            self.lightning_label.config(text="⚠️ Interference", fg="#ff9800")
+            fields["lightning"] = ("⚠️ Interference", "#ff9800")
+        elif data.get("storm_distance_km") is not None:
+            # Between strikes: the tracked cell and strike rate
+            rate = data.get("strike_rate_5min") or 0
+            fields["lightning"] = (f"~{data['storm_distance_km']:.0f} km{self._storm_text(data)}, "
+                                   f"{rate:.1f}/min", "#ff9800")
         else:
-            self.lightning_label.config(text="Monitoring", fg="#ffeb3b")
-            
-        # Severe weather conditions
-        temp = data.get("temp_C", 0)
-        wind_speed = data.get("speed_kph", 0)
-        
-        if temp < -20:
-            alert_text = f"🥶 EXTREME COLD WARNING - {temp:.1f}°C"
-        elif temp > 40:
-            alert_text = f"🔥 EXTREME HEAT WARNING - {temp:.1f}°C"
-        elif wind_speed > 60:
-            alert_text = f"💨 HIGH WIND WARNING - {wind_speed:.1f} km/h"
-            
-        # Display alert
-        if alert_text:
-            self.alert_label.config(text=alert_text, fg=alert_color)
+            fields["lightning"] = ("Monitoring", "#ffeb3b")
+
+        # Alert banner: every active rule (alerts.yaml), most urgent first
+        active = self.alerts.evaluate(data)
+        if active:
+            lines = [a["message"] for a in active[:ALERT_LINES]]
+            if len(active) > ALERT_LINES:
+                lines[-1] += f"  (+{len(active) - ALERT_LINES} more)"
+            fields["alert"] = ("\n".join(lines), active[0]["color"])
             self.alert_active = True
         else:
-            self.alert_label.config(text="")
+            fields["alert"] = ""
             self.alert_active = False
             
     def _deg_to_cardinal(self, deg):
@@ -344,15 +457,19 @@ class EnhancedStormPODGUI:
 
 if __name__ == "__main__":
     root = tk.Tk()
+    manager = SensorManager(metrics_port=METRICS_PORT)
     
-    # Try enhanced GUI first, fallback to basic
+    # Try enhanced GUI first, fallback to basic (same manager, already started)
     try:
-        app = EnhancedStormPODGUI(root)
+        app = EnhancedStormPODGUI(root, manager=manager, diagnostics="--diagnostics" in sys.argv)
         print("✅ Enhanced StormPOD GUI loaded")
     except ImportError as e:
         print(f"⚠️ Enhanced GUI failed, using basic: {e}")
+        # Clear whatever the enhanced GUI built before it failed
+        for child in root.winfo_children():
+            child.destroy()
         from stormpod.gui_main import StormPODGUI
-        app = StormPODGUI(root)
+        app = StormPODGUI(root, manager=manager)
         
     try:
         root.mainloop()
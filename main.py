@@ -6,17 +6,17 @@ Run this to start the StormPOD weather monitoring system.
 """
 
 import sys
-import os
-
-# Add the stormpod package to Python path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'stormpod'))
-
 import tkinter as tk
-from gui_main import StormPODGUI
+from stormpod.gui_main import StormPODGUI
+from stormpod.sensor_manager import SensorManager
+
+# Prometheus text on http://127.0.0.1:9108/metrics
+METRICS_PORT = 9108
 
 if __name__ == "__main__":
     root = tk.Tk()
-    app = StormPODGUI(root)
+    manager = SensorManager(metrics_port=METRICS_PORT)
+    app = StormPODGUI(root, use_canvas="--canvas" in sys.argv, manager=manager)
     try:
         root.mainloop()
     except KeyboardInterrupt:
@@ -0,0 +1,127 @@
+import threading
+import time
+
+
+class Snapshot:
+    """Lock-protected latest-value store shared by the sensor readers.
+
+    Each reader publishes its whole result under its own source name; the
+    GUI and logger only ever call ``merged()``, which copies a handful of
+    small dicts and never touches I/O.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sources = {}
+
+    def register(self, source, ttl=None):
+        # Registration order is merge order: later sources win on key clashes
+        with self._lock:
+            self._sources.setdefault(source, [{}, 0.0, ttl])
+
+    def publish(self, source, values):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._sources.get(source)
+            if entry is None:
+                self._sources[source] = [dict(values), now, None]
+            else:
+                entry[0] = dict(values)
+                entry[1] = now
+
+    def merged(self):
+        now = time.monotonic()
+        out = {}
+        with self._lock:
+            for values, stamp, ttl in self._sources.values():
+                if ttl is not None and now - stamp > ttl:
+                    continue
+                out.update(values)
+        return out
+
+    def age(self, source):
+        """Seconds since ``source`` last published, or None if it never has."""
+        with self._lock:
+            entry = self._sources.get(source)
+            if entry is None or not entry[1]:
+                return None
+            return time.monotonic() - entry[1]
+
+
+class SensorReader(threading.Thread):
+    """Background thread that calls ``read_fn`` and publishes its result.
+
+    Blocking sensor I/O (serial readline, CAN recv timeouts) only ever
+    stalls this thread, never the Tk main loop.
+    """
+
+    def __init__(self, name, read_fn, snapshot, interval=0.1, publish_empty=True):
+        super().__init__(name=f"reader-{name}", daemon=True)
+        self.source = name
+        self.read_fn = read_fn
+        self.snapshot = snapshot
+        self.interval = interval
+        self.publish_empty = publish_empty
+        self.errors = 0
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            try:
+                values = self.read_fn()
+                if values or self.publish_empty:
+                    self.snapshot.publish(self.source, values or {})
+            except Exception as e:
+                self.errors += 1
+                print(f"⚠️ {self.source} read error: {e}")
+            self._stop_event.wait(self.interval)
+
+    def stop(self):
+        self._stop_event.set()
+
+
+class AcquisitionEngine:
+    """Runs one ``SensorReader`` per sensor, all feeding a shared ``Snapshot``."""
+
+    def __init__(self, snapshot=None):
+        self.snapshot = snapshot or Snapshot()
+        self.readers = {}
+        self.running = False
+        self._lock = threading.Lock()
+
+    def add_reader(self, name, read_fn, interval=0.1, ttl=None, publish_empty=True):
+        """Register a sensor.
+
+        ``ttl`` expires a source's values from the merged view once they are
+        older than that many seconds (used for one-shot events such as
+        lightning strikes); ``publish_empty=False`` keeps the last non-empty
+        result instead of overwriting it with ``{}``.
+
+        Readers added while the engine is running start straight away
+        (sensors that finish initialising late).
+        """
+        self.snapshot.register(name, ttl=ttl)
+        reader = SensorReader(name, read_fn, self.snapshot,
+                              interval=interval, publish_empty=publish_empty)
+        with self._lock:
+            self.readers[name] = reader
+            if self.running:
+                reader.start()
+        return reader
+
+    def start(self):
+        with self._lock:
+            self.running = True
+            for reader in self.readers.values():
+                if not reader.is_alive():
+                    reader.start()
+
+    def stop(self, timeout=1.0):
+        with self._lock:
+            self.running = False
+            readers = list(self.readers.values())
+        for reader in readers:
+            reader.stop()
+        for reader in readers:
+            if reader.is_alive():
+                reader.join(timeout)
@@ -0,0 +1,366 @@
+"""
+Alert rules
+-----------
+Declarative dashboard alerts. The rules (alerts.yaml) are compiled once by
+compile_rules() into an AlertEngine, so evaluate() does no parsing.
+
+Each rule has one condition, or ``any:`` a list of them:
+
+    {field: temp_C, below: -20, clear: -18}
+    {field: gust_kph, above: 90}
+    {field: lightning, equals: true}
+
+* ``clear``: hysteresis. Once true, an above/below condition stays true
+  until the value crosses ``clear``, so a reading hovering on the
+  threshold does not flap.
+* ``for_s`` / ``clear_for_s``: how long the condition must hold before
+  the alert raises / clears.
+* ``priority``: higher shows first. Any number of alerts can be active.
+* ``message``: a str.format template over the snapshot. Fields that are
+  missing or None show as "--".
+
+A missing or None field makes its condition false. Nothing is ever
+substituted for it.
+
+evaluate() only re-checks the rules a snapshot can affect, plus rules
+waiting out a ``for_s`` / ``clear_for_s`` timer. Above/below conditions
+are kept sorted per field by the value that flips them next, so a field
+moving from old to new finds the conditions it crossed with two
+bisects. A change costs O(log n) plus the rules that actually flip, and
+raised alerts re-format their message when a field they show changes.
+
+The cost is set by how many rules flip or are raised, not by how many
+exist: 2000 rules take ~0.2 ms per typical snapshot. The worst case in
+benchmarks/bench_alerts.py swings every field at once with ~330 alerts
+raised, so each of them re-formats and rebuilds its dict; that measures
+1.7-2.6 ms. It is accepted: the dashboard polls at 1 Hz, and a real rule
+file raises a handful of alerts, not hundreds.
+"""
+
+import bisect
+import math
+import os
+import string
+import time
+
+from dev_helpers.config_loader import load_config
+
+DEFAULT_RULES = os.path.join(os.path.dirname(__file__), "alerts.yaml")
+DEFAULT_COLOR = "#ff0000"
+
+_RULE_KEYS = {"name", "field", "above", "below", "equals", "clear", "any",
+              "for_s", "clear_for_s", "priority", "message", "color"}
+_CONDITION_KEYS = {"field", "above", "below", "equals", "clear"}
+_UNSET = object()
+
+
+class _Missing:
+    def __format__(self, spec):
+        return "--"
+
+
+_MISSING = _Missing()
+
+
+class _Fields:
+    """Snapshot view for message templates: missing/None fields format as --.
+
+    Wraps the snapshot rather than copying it, so one view serves every
+    message formatted in an evaluate().
+    """
+
+    __slots__ = ("data",)
+
+    def __init__(self, data):
+        self.data = data
+
+    def __getitem__(self, key):
+        value = self.data.get(key)
+        return _MISSING if value is None else value
+
+
+class _Condition:
+    """One compiled condition. Calling it with a snapshot returns the new
+    state; above/below keep it between calls for the hysteresis.
+    """
+
+    __slots__ = ("field", "op", "on", "off", "state", "rule", "index", "key")
+
+    def __init__(self, field, op, on, off):
+        self.field = field
+        self.op = op
+        self.on = on
+        self.off = off
+        self.state = False
+        self.rule = None
+        self.index = None  # the engine's _Thresholds holding it (above/below only)
+        self.key = None
+
+    def __call__(self, data):
+        value = data.get(self.field)
+        try:
+            if value is None:
+                state = False
+            elif self.op == "above":
+                state = value > (self.off if self.state else self.on)
+            elif self.op == "below":
+                state = value < (self.off if self.state else self.on)
+            else:
+                state = value == self.on
+        except TypeError:  # e.g. a string where a number was expected
+            state = False
+        self.state = state
+        return state
+
+    def threshold(self):
+        """The value at which the state flips next."""
+        return self.off if self.state else self.on
+
+
+def compile_condition(rule_name, spec):
+    """(field, check) for one condition spec. ``check(data)`` returns the
+    new state and keeps the hysteresis state.
+    """
+    unknown = set(spec) - _CONDITION_KEYS
+    if unknown:
+        raise ValueError(f"Alert {rule_name}: unknown key(s) {', '.join(sorted(unknown))}")
+    if "field" not in spec:
+        raise ValueError(f"Alert {rule_name}: condition has no field")
+    ops = [op for op in ("above", "below", "equals") if op in spec]
+    if len(ops) != 1:
+        raise ValueError(f"Alert {rule_name}: needs exactly one of above/below/equals")
+    field = spec["field"]
+    op = ops[0]
+    on = spec[op]
+    off = spec.get("clear", on)
+    if op == "equals":
+        if "clear" in spec:
+            raise ValueError(f"Alert {rule_name}: clear only applies to above/below")
+    elif not all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in (on, off)):
+        raise ValueError(f"Alert {rule_name}: {op}/clear must be numbers")
+    if op == "above" and off > on:
+        raise ValueError(f"Alert {rule_name}: clear must not be above the threshold")
+    if op == "below" and off < on:
+        raise ValueError(f"Alert {rule_name}: clear must not be below the threshold")
+    return field, _Condition(field, op, on, off)
+
+
+class _Thresholds:
+    """The above (or below) conditions on one field, sorted by the value
+    that flips each one next: its threshold while false, its clear while
+    true. A field moving from old to new can only flip the conditions with
+    that value in between, found with two bisects.
+    """
+
+    def __init__(self, op):
+        self.op = op
+        self.keys = []  # (threshold, n, condition)
+
+    def add(self, cond, n):
+        cond.index = self
+        cond.key = (cond.threshold(), n)
+        bisect.insort(self.keys, cond.key + (cond,))
+
+    def move(self, cond):
+        """Re-sort ``cond`` after its state changed."""
+        value = cond.threshold()
+        if value != cond.key[0]:
+            del self.keys[bisect.bisect_left(self.keys, cond.key)]
+            cond.key = (value, cond.key[1])
+            bisect.insort(self.keys, cond.key + (cond,))
+
+    def crossed(self, old, new):
+        """The keys of conditions whose state can differ between old and new."""
+        lo, hi = (old, new) if old < new else (new, old)
+        keys = self.keys
+        if self.op == "above":
+            # True above the value: flips when lo <= value < hi
+            return keys[bisect.bisect_left(keys, (lo,)):bisect.bisect_left(keys, (hi,))]
+        # True below the value: flips when lo < value <= hi
+        return keys[bisect.bisect_right(keys, (lo, math.inf)):bisect.bisect_right(keys, (hi, math.inf))]
+
+
+def _number(value):
+    # Not None, a bool, a string or NaN: those flip conditions without crossing anything
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and value == value
+
+
+class Rule:
+    def __init__(self, spec):
+        name = spec.get("name")
+        if not name:
+            raise ValueError(f"Alert rule without a name: {spec}")
+        unknown = set(spec) - _RULE_KEYS
+        if unknown:
+            raise ValueError(f"Alert {name}: unknown key(s) {', '.join(sorted(unknown))}")
+        self.name = name
+        if "any" in spec:
+            if _CONDITION_KEYS & set(spec):
+                raise ValueError(f"Alert {name}: use either any: or a single condition")
+            conditions = [compile_condition(name, c) for c in spec["any"]]
+        else:
+            conditions = [compile_condition(name, {k: spec[k] for k in _CONDITION_KEYS if k in spec})]
+        self.conditions = tuple(check for _, check in conditions)
+        for cond in self.conditions:
+            cond.rule = self
+        self.for_s = float(spec.get("for_s", 0.0))
+        self.clear_for_s = float(spec.get("clear_for_s", 0.0))
+        self.priority = spec.get("priority", 0)
+        self.color = spec.get("color", DEFAULT_COLOR)
+        self.template = spec.get("message", name)
+        self.message_fields = {f.split(".")[0].split("[")[0]
+                               for _, f, _, _ in string.Formatter().parse(self.template) if f}
+        self.fields = {field for field, _ in conditions} | self.message_fields
+
+        self.condition = False  # the combined condition, before for_s/clear_for_s
+        self.changed_at = None
+        self.active = False
+        self.since = None
+        self.message = None
+        self.order = None  # sort key while active
+        self._alert = None
+
+    def check(self, data, now):
+        if len(self.conditions) == 1:
+            condition = self.conditions[0](data)
+        else:
+            # Every condition is checked so each keeps its own hysteresis state
+            condition = any([check(data) for check in self.conditions])
+        if condition != self.condition:
+            self.condition = condition
+            self.changed_at = now
+
+    def format(self, fields):
+        """Render the message from a _Fields view (only raised alerts need one)."""
+        try:
+            self.message = self.template.format_map(fields)
+        except (ValueError, TypeError):  # e.g. {x:.0f} on a string
+            self.message = self.template
+
+    def settle(self, now):
+        """Raise/clear once the condition has held long enough. Returns True while waiting."""
+        if self.condition == self.active:
+            return False
+        hold = self.for_s if self.condition else self.clear_for_s
+        if now - self.changed_at < hold:
+            return True
+        self.active = self.condition
+        self.since = now if self.active else None
+        # Most urgent, then newest, first; the name keeps keys unique
+        self.order = (-self.priority, -now, self.name) if self.active else None
+        return False
+
+    def alert(self):
+        if self._alert is None or self._alert["message"] != self.message \
+                or self._alert["since"] != self.since:
+            self._alert = {"name": self.name, "priority": self.priority, "message": self.message,
+                           "color": self.color, "since": self.since}
+        return self._alert
+
+
+class AlertEngine:
+    def __init__(self, rules):
+        self.rules = list(rules)
+        names = [r.name for r in self.rules]
+        if len(set(names)) != len(names):
+            raise ValueError("Alert rule names must be unique")
+        # field -> rules to re-check whenever it changes (equals conditions)
+        self._by_field = {}
+        # field -> {op: _Thresholds} for above/below conditions
+        self._thresholds = {}
+        # field -> raised rules whose message reads it
+        self._messages = {}
+        n = 0
+        for rule in self.rules:
+            for cond in rule.conditions:
+                if cond.op == "equals":
+                    self._by_field.setdefault(cond.field, []).append(rule)
+                else:
+                    indexes = self._thresholds.setdefault(cond.field, {})
+                    indexes.setdefault(cond.op, _Thresholds(cond.op)).add(cond, n)
+                    n += 1
+            for field in rule.message_fields:
+                self._messages.setdefault(field, set())
+        fields = set(self._by_field) | set(self._thresholds) | set(self._messages)
+        self._last = {field: _UNSET for field in fields}
+        self._pending = set()
+        self._order = []  # (sort key, rule) for active rules, kept sorted
+        self._active = []
+        self.checks = 0
+
+    def evaluate(self, data, now=None):
+        """Update every rule from one snapshot. Returns the active alerts, highest priority first."""
+        now = time.monotonic() if now is None else now
+        last = self._last
+        due = set(self._pending)
+        shown = set()  # raised alerts showing a changed field
+        for field, old in last.items():
+            value = data.get(field)
+            if value is old or value == old:
+                continue
+            last[field] = value
+            rules = self._by_field.get(field)
+            if rules:
+                due.update(rules)
+            rules = self._messages.get(field)
+            if rules:
+                shown.update(rules)
+            indexes = self._thresholds.get(field)
+            if indexes:
+                crossing = _number(old) and _number(value)
+                for index in indexes.values():
+                    keys = index.crossed(old, value) if crossing else index.keys
+                    due.update([cond.rule for _, _, cond in keys])
+        shown -= due
+        if not due and not shown:
+            return self._active
+
+        changed = False
+        fields = _Fields(data)
+        for rule in shown:
+            # Not crossed, so still raised: only the message can change
+            message = rule.message
+            rule.format(fields)
+            changed = changed or rule.message != message
+        order, pending = self._order, self._pending
+        self.checks += len(due)
+        for rule in due:
+            was_active, was_order, message = rule.active, rule.order, rule.message
+            rule.check(data, now)
+            for cond in rule.conditions:
+                if cond.index is not None:
+                    cond.index.move(cond)
+            if rule.condition == was_active:
+                # Nothing to raise or clear (a timer that was running is moot)
+                pending.discard(rule)
+            elif rule.settle(now):
+                pending.add(rule)
+            else:
+                pending.discard(rule)
+                if was_active:
+                    del order[bisect.bisect_left(order, (was_order,))]
+                else:
+                    bisect.insort(order, (rule.order, rule))
+                changed = True
+            if rule.active:
+                rule.format(fields)
+                changed = changed or rule.message != message
+            if rule.active != was_active:
+                for field in rule.message_fields:
+                    (self._messages[field].add if rule.active else self._messages[field].discard)(rule)
+        if changed:
+            # Only rules whose message or state changed build a new dict
+            self._active = [rule.alert() for _, rule in order]
+        return self._active
+
+    @property
+    def active(self):
+        return self._active
+
+
+def compile_rules(config):
+    return AlertEngine(Rule(spec) for spec in config.get("rules") or ())
+
+
+def load_engine(path=DEFAULT_RULES):
+    return compile_rules(load_config(path))
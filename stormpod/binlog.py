@@ -0,0 +1,317 @@
+"""
+Binary sensor log
+-----------------
+Fixed-width little-endian records for the logger.HEADERS fields, written
+by BinaryLogger and read back with read_binary_log(), which memory-maps
+the file. ``log["temp_C"]`` is one column; there is no per-row parsing.
+
+File layout::
+
+    b"SPODLOG1"  u32 header length  JSON schema (space padded to 8 bytes)
+    record * N
+
+Fixed-precision readings are stored as scaled integers: a schema entry
+``[name, "i2", 2]`` holds round(value * 100), so temp_C takes 2 bytes
+instead of a 4-byte float. Those columns read back as float64 divided by
+10**decimals, with MISSING_SCALED (the type's minimum) as NaN. Columns
+without a scale are views into the map: floats use NaN for missing
+values, the plain integer columns (time_utc HHMMSS, wind_raw, fix,
+lightning) use MISSING_INT.
+
+A value that does not convert (a string, or out of the column's range)
+is stored as missing and counted in BinaryLogger.bad_values instead of
+losing the row.
+"""
+
+import csv
+import json
+import math
+import mmap
+import struct
+
+import numpy as np
+
+from . import metrics
+from .logger import BufferedLogger, HEADERS
+
+MAGIC = b"SPODLOG1"
+MISSING_INT = -1
+BINLOG_FILE = "stormpod_log.bin"
+
+BAD_VALUES = metrics.counter("stormpod_log_bad_values_total",
+                             "Binary log values stored as missing because they did not convert")
+
+# Column types: kind, or (kind, decimals) for a scaled integer. Anything
+# not listed is float32. lat/lon keep 1e-7 degrees (~1 cm).
+FIELD_TYPES = {
+    "time_utc": "i4",
+    "temp_C": ("i2", 2),
+    "humidity_%": ("i2", 2),
+    "pressure_hPa": ("i4", 2),
+    "altitude_m": ("i4", 2),
+    "wind_raw": "i2",
+    "wind_volts": ("i2", 3),
+    "speed_kph": ("i2", 2),
+    "fix": "i1",
+    "lat": ("i4", 7),
+    "lon": ("i4", 7),
+    "heading_deg": ("i2", 1),
+    "lightning": "i1",
+    "distance_km": ("i2", 1),
+    "angle_deg": ("i2", 1),
+    "ground_speed_kph": ("i2", 2),
+    "true_wind_kph": ("i2", 2),
+    "true_wind_dir_deg": ("i2", 1),
+    "gps_alt_m": ("i4", 2),
+}
+
+_STRUCT_CODES = {"i1": "b", "i2": "h", "i4": "i", "f4": "f", "f8": "d"}
+_INT_RANGES = {"i1": (-2**7, 2**7 - 1), "i2": (-2**15, 2**15 - 1), "i4": (-2**31, 2**31 - 1)}
+MISSING_SCALED = {kind: low for kind, (low, _) in _INT_RANGES.items()}
+
+
+def schema_for(fields=HEADERS):
+    schema = []
+    for name in fields:
+        kind = FIELD_TYPES.get(name, "f4")
+        schema.append([name, *kind] if isinstance(kind, tuple) else [name, kind])
+    return schema
+
+
+def _dtype(schema):
+    return np.dtype([(entry[0], "<" + entry[1]) for entry in schema])
+
+
+def _header(schema):
+    body = json.dumps({"version": 2, "fields": schema}).encode()
+    pad = (-(len(MAGIC) + 4 + len(body))) % 8
+    body += b" " * pad
+    return MAGIC + struct.pack("<I", len(body)) + body
+
+
+def _to_int(value):
+    if value is None or value == "":
+        return None
+    if isinstance(value, str):
+        if value in ("True", "False"):
+            return int(value == "True")
+        return int(float(value))
+    return int(value)
+
+
+def _to_float(value):
+    if value is None or value == "":
+        return math.nan
+    return float(value)
+
+
+def _converter(kind, decimals=None):
+    """(convert, missing) for one column. ``convert`` raises ValueError,
+    TypeError or OverflowError for a value the column cannot hold.
+    """
+    if kind[0] == "f":
+        return _to_float, math.nan
+    low, high = _INT_RANGES[kind]
+    if decimals is None:
+        def convert(value):
+            value = _to_int(value)
+            if value is None:
+                return MISSING_INT
+            if not low <= value <= high:
+                raise OverflowError(value)
+            return value
+        return convert, MISSING_INT
+
+    scale = 10 ** decimals
+    missing = MISSING_SCALED[kind]
+
+    def convert(value):
+        value = _to_float(value)
+        if value != value:
+            return missing
+        value = round(value * scale)
+        if not low < value <= high:  # low itself means missing
+            raise OverflowError(value)
+        return value
+    return convert, missing
+
+
+class BinaryLogger(BufferedLogger):
+    """BufferedLogger that writes binary records instead of CSV rows."""
+
+    mode = "ab"
+
+    def __init__(self, path=BINLOG_FILE, headers=HEADERS, **kwargs):
+        self.schema = schema_for(headers)
+        self._struct = struct.Struct("<" + "".join(_STRUCT_CODES[entry[1]] for entry in self.schema))
+        self._converters = [(entry[0], *_converter(*entry[1:])) for entry in self.schema]
+        self.bad_values = 0
+        super().__init__(path, headers, **kwargs)
+
+    def _encode(self, data):
+        values = []
+        for name, convert, missing in self._converters:
+            try:
+                values.append(convert(data.get(name)))
+            except (ValueError, TypeError, OverflowError):
+                values.append(missing)
+                self.bad_values += 1
+                BAD_VALUES.inc()
+        return self._struct.pack(*values)
+
+    def _open_file(self):
+        return open(self.path, self.mode)
+
+    def _write_header(self):
+        self._file.write(_header(self.schema))
+
+    def _header_matches(self):
+        header = _header(self.schema)
+        with open(self.path, "rb") as f:
+            return f.read(len(header)) == header
+
+    def _write_rows(self, rows):
+        self._file.write(b"".join(rows))
+
+
+class BinaryLog:
+    """The records of one binary log.
+
+    ``log[name]`` is a column: a view into the map for float and plain
+    integer columns, float64 with NaN for missing values for scaled ones.
+    ``records`` is the raw structured array.
+    """
+
+    def __init__(self, records, schema):
+        self.records = records
+        self.names = records.dtype.names
+        self.decimals = {entry[0]: entry[2] for entry in schema if len(entry) > 2}
+
+    def __len__(self):
+        return len(self.records)
+
+    def __getitem__(self, name):
+        raw = self.records[name]
+        decimals = self.decimals.get(name)
+        if decimals is None:
+            return raw
+        column = raw / float(10 ** decimals)
+        column[raw == MISSING_SCALED[raw.dtype.str[1:]]] = np.nan
+        return column
+
+    def kind(self, name):
+        """Column kind: "i" for a plain integer column, else "f" (scaled ones read as floats)."""
+        return "f" if name in self.decimals else self.records.dtype[name].kind
+
+
+def read_binary_log(path):
+    """Memory-map a binary log and return it as a BinaryLog.
+
+    A partially written trailing record (power cut mid-write) is ignored.
+    """
+    with open(path, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if mm[:len(MAGIC)] != MAGIC:
+        mm.close()
+        raise ValueError(f"{path} is not a StormPOD binary log")
+    (hlen,) = struct.unpack_from("<I", mm, len(MAGIC))
+    offset = len(MAGIC) + 4 + hlen
+    schema = json.loads(mm[len(MAGIC) + 4:offset])["fields"]
+    dtype = _dtype(schema)
+    count = (len(mm) - offset) // dtype.itemsize
+    return BinaryLog(np.frombuffer(mm, dtype=dtype, count=count, offset=offset), schema)
+
+
+def load_columns(path, keys):
+    """Float columns from a CSV or binary log; NaN where blank or missing,
+    1/0 for True/False.
+
+    A key the log does not have maps to None.
+    """
+    with open(path, "rb") as f:
+        binary = f.read(len(MAGIC)) == MAGIC
+    if binary:
+        log = read_binary_log(path)
+        out = {}
+        for key in keys:
+            if key not in log.names:
+                out[key] = None
+                continue
+            column = log[key].astype(np.float64)
+            if log.kind(key) == "i":
+                column[log[key] == MISSING_INT] = np.nan
+            out[key] = column
+        return out
+
+    with open(path, newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        index = {key: header.index(key) for key in keys if key in header}
+        raw = {key: [] for key in index}
+        for row in reader:
+            for key, i in index.items():
+                raw[key].append(row[i] if i < len(row) else "")
+    out = {}
+    for key in keys:
+        if key not in raw:
+            out[key] = None
+            continue
+        column = np.array(raw[key], dtype=object)
+        column[column == ""] = "nan"
+        # fix/lightning are logged as True/False
+        column[column == "True"] = "1"
+        column[column == "False"] = "0"
+        out[key] = column.astype(np.float64)
+    return out
+
+
+def csv_to_binary(csv_path, bin_path):
+    """Convert a CSV log written by logger.py. Returns the record count."""
+    with open(csv_path, newline="") as f:
+        reader = csv.DictReader(f)
+        out = BinaryLogger(bin_path, headers=reader.fieldnames, background=False,
+                           flush_rows=4096, fsync="close")
+        try:
+            for row in reader:
+                out.log(row)
+        finally:
+            out.close()
+    return out.rows_written
+
+
+def binary_to_csv(bin_path, csv_path):
+    """Write a binary log back out as CSV. Returns the record count."""
+    log = read_binary_log(bin_path)
+    names = log.names
+    columns = [log[name].tolist() for name in names]
+    formats = []
+    for name in names:
+        if name in log.decimals:
+            formats.append(f".{log.decimals[name]}f")
+        else:
+            formats.append(log.records.dtype[name].kind + str(log.records.dtype[name].itemsize))
+    bools = {"fix", "lightning"}
+    with open(csv_path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(names)
+        for values in zip(*columns):
+            row = []
+            for name, kind, value in zip(names, formats, values):
+                if kind[0] == "i":
+                    if value == MISSING_INT:
+                        row.append("")
+                    elif name in bools:
+                        row.append(str(bool(value)))
+                    elif name == "time_utc":
+                        row.append(f"{value:06d}")
+                    else:
+                        row.append(value)
+                elif math.isnan(value):
+                    row.append("")
+                elif kind[0] == ".":
+                    row.append(format(value, kind))
+                else:
+                    # float32 columns only carry ~7 significant digits
+                    row.append(repr(value) if kind == "f8" else f"{value:.7g}")
+            writer.writerow(row)
+    return len(log)
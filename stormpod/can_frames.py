@@ -0,0 +1,232 @@
+"""
+CAN frame decoder registry
+--------------------------
+Table-driven decoding for roof pod frames. The schema (can_frames.yaml)
+maps arbitration IDs to struct layouts, scale factors and derived values;
+compile_schema() turns it into one FrameDecoder per ID at startup so the
+receive loop only does a dict lookup and a struct unpack per frame.
+"""
+
+import os
+import struct
+
+import numpy as np
+
+from dev_helpers.config_loader import load_config
+
+DEFAULT_SCHEMA = os.path.join(os.path.dirname(__file__), "can_frames.yaml")
+
+# struct format code -> numpy dtype kind/size, for the batch path
+_NP_CODES = {
+    "b": "i1", "B": "u1", "h": "i2", "H": "u2",
+    "i": "i4", "I": "u4", "l": "i4", "L": "u4",
+    "q": "i8", "Q": "u8", "e": "f2", "f": "f4", "d": "f8",
+}
+
+
+# ---------- Derived-value functions ----------
+# Each factory is called once with the schema params and returns a
+# (scalar_fn, array_fn) pair, so constants are folded at compile time.
+
+def adc_volts(vref=3.3, full_scale=1023, clamp=None):
+    k = vref / full_scale
+    top = float("inf") if clamp is None else clamp
+
+    def scalar(raw):
+        return min(raw * k, top)
+
+    def array(raw):
+        return np.minimum(raw * k, top)
+
+    return scalar, array
+
+
+def anemometer_kph(vref=3.3, full_scale=1023, clamp=None, zero_v=0.4, max_v=2.0, max_kph=116.6):
+    to_volts, to_volts_array = adc_volts(vref, full_scale, clamp)
+    scale = max_kph / (max_v - zero_v)
+
+    def scalar(raw):
+        volts = to_volts(raw)
+        if volts <= zero_v:
+            return 0.0
+        return (volts - zero_v) * scale
+
+    def array(raw):
+        return np.maximum(to_volts_array(raw) - zero_v, 0.0) * scale
+
+    return scalar, array
+
+
+DERIVED = {
+    "adc_volts": adc_volts,
+    "anemometer_kph": anemometer_kph,
+}
+
+
+def _numpy_dtype(fmt):
+    """Structured dtype matching a struct format such as '>HHH'."""
+    order = ">" if fmt[0] in ">!" else "<"
+    body = fmt[1:] if fmt[0] in "<>!=@" else fmt
+    fields = []
+    count = ""
+    for ch in body:
+        if ch.isdigit():
+            count += ch
+            continue
+        if ch == "x":
+            fields.append((f"_pad{len(fields)}", "V" + (count or "1")))
+        elif ch in _NP_CODES:
+            for _ in range(int(count or 1)):
+                fields.append((f"f{len(fields)}", order + _NP_CODES[ch]))
+        else:
+            raise ValueError(f"Unsupported struct code {ch!r} in {fmt!r}")
+        count = ""
+    return np.dtype(fields)
+
+
+def _scaler(scale, offset):
+    # Divide by an integral reciprocal (0.1 -> /10.0) so decoded values
+    # match the firmware's fixed-point encoding exactly.
+    inv = 1.0 / scale
+    if abs(inv - round(inv)) < 1e-9 and round(inv) != 1:
+        inv = float(round(inv))
+        if offset:
+            return lambda raw: raw / inv + offset
+        return lambda raw: raw / inv
+    if scale == 1 and not offset:
+        return None
+    return lambda raw: raw * scale + offset
+
+
+class FrameDecoder:
+    """Compiled decoder for one arbitration ID."""
+
+    def __init__(self, arbitration_id, name, fmt, signals, derived=()):
+        self.arbitration_id = arbitration_id
+        self.name = name
+        self._struct = struct.Struct(fmt)
+        self.size = self._struct.size
+        self.dtype = _numpy_dtype(fmt)
+        if self.dtype.itemsize != self.size:
+            raise ValueError(f"Frame {name}: struct and dtype sizes disagree")
+
+        self._signals = []
+        raw_fields = [n for n in self.dtype.names if not n.startswith("_pad")]
+        if len(signals) != len(raw_fields):
+            raise ValueError(f"Frame {name}: {len(signals)} signals for {len(raw_fields)} fields")
+        for field, sig in zip(raw_fields, signals):
+            if isinstance(sig, str):
+                sig = {"name": sig}
+            conv = _scaler(sig.get("scale", 1), sig.get("offset", 0))
+            self._signals.append((sig["name"], field, conv))
+
+        self._raw_index = {name: i for i, (name, _, _) in enumerate(self._signals)}
+        self._derived = []
+        for d in derived:
+            scalar, array = DERIVED[d["func"]](**d.get("params", {}))
+            src = d["source"]
+            if src not in self._raw_index:
+                raise ValueError(f"Frame {name}: derived {d['name']} uses unknown signal {src}")
+            self._derived.append((d["name"], self._raw_index[src], scalar, array, d.get("round")))
+
+        self.keys = [s[0] for s in self._signals] + [d[0] for d in self._derived]
+
+    def decode(self, data):
+        """Decode one payload into a dict, or None if the length is wrong."""
+        if len(data) != self.size:
+            return None
+        raw = self._struct.unpack(data)
+        out = {}
+        for (name, _, conv), value in zip(self._signals, raw):
+            out[name] = conv(value) if conv else value
+        for name, idx, scalar, _, ndigits in self._derived:
+            value = scalar(raw[idx])
+            out[name] = round(value, ndigits) if ndigits is not None else value
+        return out
+
+    def decode_array(self, payload, count):
+        """Decode ``count`` concatenated payloads into column arrays.
+
+        Derived values are left unrounded here; the ``round`` setting only
+        applies to the per-frame path that feeds the display and logs.
+        """
+        rows = np.frombuffer(payload, dtype=self.dtype, count=count)
+        out = {}
+        raw_cols = []
+        for name, field, conv in self._signals:
+            col = rows[field].astype(np.float64)
+            raw_cols.append(col)
+            out[name] = conv(col) if conv else col
+        for name, idx, _, array, _ in self._derived:
+            out[name] = array(raw_cols[idx])
+        return out
+
+
+class FrameRegistry:
+    def __init__(self, decoders):
+        self.decoders = {d.arbitration_id: d for d in decoders}
+
+    @property
+    def can_ids(self):
+        return tuple(sorted(self.decoders))
+
+    def keys(self):
+        """Every value name any frame can produce, in schema order."""
+        out = []
+        for d in self.decoders.values():
+            out.extend(k for k in d.keys if k not in out)
+        return out
+
+    def decode(self, arbitration_id, data):
+        decoder = self.decoders.get(arbitration_id)
+        if decoder is None:
+            return None
+        return decoder.decode(data)
+
+    def decode_batch(self, frames):
+        """Decode many frames at once.
+
+        ``frames`` is an iterable of can.Message objects or
+        ``(arbitration_id, data[, timestamp])`` tuples. Returns
+        ``{frame_name: {signal: ndarray, "timestamp": ndarray}}``; frames
+        with unknown IDs or the wrong length are skipped.
+        """
+        grouped = {}
+        for frame in frames:
+            if isinstance(frame, tuple):
+                arb_id, data = frame[0], frame[1]
+                ts = frame[2] if len(frame) > 2 else np.nan
+            else:
+                arb_id, data, ts = frame.arbitration_id, frame.data, frame.timestamp
+            decoder = self.decoders.get(arb_id)
+            if decoder is None or len(data) != decoder.size:
+                continue
+            payloads, stamps = grouped.setdefault(arb_id, ([], []))
+            payloads.append(bytes(data))
+            stamps.append(ts)
+
+        out = {}
+        for arb_id, (payloads, stamps) in grouped.items():
+            decoder = self.decoders[arb_id]
+            cols = decoder.decode_array(b"".join(payloads), len(payloads))
+            cols["timestamp"] = np.asarray(stamps, dtype=np.float64)
+            out[decoder.name] = cols
+        return out
+
+
+def compile_schema(schema):
+    decoders = []
+    for arb_id, frame in schema["frames"].items():
+        arb_id = int(arb_id, 0) if isinstance(arb_id, str) else int(arb_id)
+        decoders.append(FrameDecoder(
+            arb_id,
+            frame.get("name", f"0x{arb_id:X}"),
+            frame["format"],
+            frame["signals"],
+            frame.get("derived", ()),
+        ))
+    return FrameRegistry(decoders)
+
+
+def load_registry(path=DEFAULT_SCHEMA):
+    return compile_schema(load_config(path))
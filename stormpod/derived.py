@@ -0,0 +1,328 @@
+"""
+Derived meteorology
+-------------------
+Values a chaser watches that the sensors don't measure directly:
+
+* ``dew_point_C``: Magnus formula (Alduchov & Eskridge constants)
+* ``heat_index_C``: NWS Rothfusz regression with its adjustments; only
+  from 26.7 °C (80 °F) up
+* ``wind_chill_C``: Environment Canada / NWS formula; only at or below
+  10 °C with wind above 4.8 km/h (uses the 2 min mean wind)
+* ``altitude_m``: pressure altitude in the standard atmosphere (what the
+  BME280 library calls altitude)
+* ``sea_level_pressure_hPa``: station pressure reduced with the GPS
+  altitude
+* ``pressure_tendency_1h_hPa`` / ``_3h_hPa``: change over the last 1 and
+  3 hours. This uses sea-level pressure when there is a GPS altitude, so
+  driving uphill does not look like a falling barometer.
+
+Derived.apply is a SensorManager pipeline stage. Each quantity is
+recomputed only when its inputs change. Tendency keeps one mean per
+minute in a fixed ring, so adding a sample and looking up 1 h or 3 h ago
+are both O(1). derive_batch() computes the same over NumPy columns for
+backfilling logs (sea-level pressure from the logged gps_alt_m where the
+row had a fix):
+
+    python -m stormpod.derived stormpod_log.bin --out derived.csv
+"""
+
+import argparse
+import csv
+import math
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+from .binlog import load_columns
+
+MAGNUS_A, MAGNUS_B = 17.625, 243.04
+TENDENCY_WINDOWS = (("pressure_tendency_1h_hPa", 3600), ("pressure_tendency_3h_hPa", 3 * 3600))
+# A tendency needs a reading within this many minutes of the exact lag
+TENDENCY_SLACK_MIN = 5
+
+
+# ---------- Formulas (scalar) ----------
+
+def dew_point(temp_c, rh):
+    if temp_c is None or rh is None or rh <= 0:
+        return None
+    gamma = math.log(min(rh, 100.0) / 100.0) + MAGNUS_A * temp_c / (MAGNUS_B + temp_c)
+    return MAGNUS_B * gamma / (MAGNUS_A - gamma)
+
+
+def heat_index(temp_c, rh):
+    if temp_c is None or rh is None or temp_c < 26.7:
+        return None
+    t = temp_c * 9 / 5 + 32
+    hi = 0.5 * (t + 61.0 + (t - 68.0) * 1.2 + rh * 0.094)
+    if (hi + t) / 2 >= 80:
+        hi = (-42.379 + 2.04901523 * t + 10.14333127 * rh - 0.22475541 * t * rh
+              - 6.83783e-3 * t * t - 5.481717e-2 * rh * rh + 1.22874e-3 * t * t * rh
+              + 8.5282e-4 * t * rh * rh - 1.99e-6 * t * t * rh * rh)
+        if rh < 13 and 80 <= t <= 112:
+            hi -= (13 - rh) / 4 * math.sqrt((17 - abs(t - 95)) / 17)
+        elif rh > 85 and 80 <= t <= 87:
+            hi += (rh - 85) / 10 * (87 - t) / 5
+    return (hi - 32) * 5 / 9
+
+
+def wind_chill(temp_c, wind_kph):
+    if temp_c is None or wind_kph is None or temp_c > 10.0 or wind_kph <= 4.8:
+        return None
+    v = wind_kph ** 0.16
+    return 13.12 + 0.6215 * temp_c - 11.37 * v + 0.3965 * temp_c * v
+
+
+def pressure_altitude(pressure_hpa, sea_level_hpa=1013.25):
+    if pressure_hpa is None or pressure_hpa <= 0:
+        return None
+    return 44330.77 * (1.0 - (pressure_hpa / sea_level_hpa) ** 0.190263)
+
+
+def sea_level_pressure(pressure_hpa, altitude_m, temp_c):
+    if pressure_hpa is None or altitude_m is None or temp_c is None:
+        return None
+    lapse = 0.0065 * altitude_m
+    return pressure_hpa * (1.0 - lapse / (temp_c + lapse + 273.15)) ** -5.257
+
+
+# ---------- Live stage ----------
+
+class _Cached:
+    """Calls ``fn`` only when its arguments differ from the last call."""
+
+    def __init__(self, fn, digits=1):
+        self.fn = fn
+        self.digits = digits
+        self._args = None
+        self._value = None
+        self.misses = 0
+
+    def __call__(self, *args):
+        if args != self._args:
+            value = self.fn(*args)
+            self._value = None if value is None else round(value, self.digits)
+            self._args = args
+            self.misses += 1
+        return self._value
+
+
+class PressureTendency:
+    """Per-minute mean pressure in a ring; lag lookups are one index away."""
+
+    def __init__(self, max_lag_s=3 * 3600):
+        self.size = max_lag_s // 60 + TENDENCY_SLACK_MIN + 2
+        self._minute = [None] * self.size  # minute number held in each slot
+        self._sum = [0.0] * self.size
+        self._count = [0] * self.size
+
+    def add(self, pressure_hpa, t):
+        minute = int(t // 60)
+        i = minute % self.size
+        if self._minute[i] != minute:
+            self._minute[i], self._sum[i], self._count[i] = minute, 0.0, 0
+        self._sum[i] += pressure_hpa
+        self._count[i] += 1
+
+    def _mean(self, minute):
+        i = minute % self.size
+        if self._minute[i] == minute and self._count[i]:
+            return self._sum[i] / self._count[i]
+        return None
+
+    def change(self, lag_s, t):
+        """Pressure now minus ``lag_s`` ago, or None without data that old."""
+        minute = int(t // 60)
+        now = self._mean(minute)
+        if now is None:
+            return None
+        lag = lag_s // 60
+        for offset in range(TENDENCY_SLACK_MIN + 1):
+            for then_minute in (minute - lag - offset, minute - lag + offset):
+                then = self._mean(then_minute)
+                if then is not None:
+                    return now - then
+        return None
+
+
+class Derived:
+    def __init__(self):
+        self.dew_point = _Cached(dew_point)
+        self.heat_index = _Cached(heat_index)
+        self.wind_chill = _Cached(wind_chill)
+        self.altitude = _Cached(pressure_altitude, digits=0)
+        self.sea_level = _Cached(sea_level_pressure)
+        # Station and sea-level pressure kept apart so losing the GPS fix
+        # doesn't splice two different baselines together
+        self.tendency = PressureTendency()
+        self.tendency_slp = PressureTendency()
+        self._lock = threading.Lock()
+
+    def apply(self, data, t=None):
+        """Pipeline stage: add derived values to a merged snapshot in place.
+
+        Runs on both the GUI and logging threads, so the caches are locked.
+        """
+        t = time.monotonic() if t is None else t
+        temp, rh, p = data.get("temp_C"), data.get("humidity_%"), data.get("pressure_hPa")
+        wind = data.get("wind_2min_kph")
+        if wind is None:
+            wind = data.get("true_wind_kph")
+        gps_alt = data.get("gps_alt_m") if data.get("fix") else None
+        with self._lock:
+            data["dew_point_C"] = self.dew_point(temp, rh)
+            data["heat_index_C"] = self.heat_index(temp, rh)
+            data["wind_chill_C"] = self.wind_chill(temp, wind)
+            data["altitude_m"] = self.altitude(p)
+            slp = self.sea_level(p, gps_alt, temp)
+            data["sea_level_pressure_hPa"] = slp
+            if p is not None:
+                self.tendency.add(p, t)
+            if slp is not None:
+                self.tendency_slp.add(slp, t)
+            for key, lag in TENDENCY_WINDOWS:
+                change = self.tendency_slp.change(lag, t) if slp is not None else None
+                if change is None and p is not None:
+                    change = self.tendency.change(lag, t)
+                data[key] = None if change is None else round(change, 1)
+        return data
+
+
+# ---------- Batch ----------
+
+def _nan(value):
+    return np.asarray(np.nan if value is None else value, dtype=np.float64)
+
+
+def utc_seconds(time_utc):
+    """HHMMSS column -> seconds, unwrapped across midnight (rows in order)."""
+    hhmmss = np.asarray(time_utc, dtype=np.float64)
+    seconds = (hhmmss // 10000) * 3600 + (hhmmss // 100 % 100) * 60 + hhmmss % 100
+    valid = ~np.isnan(seconds)
+    steps = np.zeros_like(seconds)
+    steps[valid] = np.concatenate(([0.0], np.diff(seconds[valid]) < -43200)) * 86400
+    seconds[valid] += np.cumsum(steps[valid])
+    return seconds
+
+
+def tendency_batch(t_s, pressure, lag_s, slack_s=TENDENCY_SLACK_MIN * 60):
+    """Pressure change over ``lag_s`` for time-ordered columns (NaN when unknown)."""
+    t = np.asarray(t_s, dtype=np.float64)
+    p = np.asarray(pressure, dtype=np.float64)
+    ok = ~np.isnan(t) & ~np.isnan(p)
+    out = np.full(t.shape, np.nan)
+    if not ok.any():
+        return out
+    tv, pv = t[ok], p[ok]
+    idx = np.searchsorted(tv, tv - lag_s)
+    idx = np.clip(idx, 0, len(tv) - 1)
+    found = np.abs((tv - tv[idx]) - lag_s) <= slack_s
+    out[np.flatnonzero(ok)[found]] = (pv - pv[idx])[found]
+    return out
+
+
+def derive_batch(temp_c, rh, pressure_hpa, wind_kph=None, gps_alt_m=None, t_s=None):
+    """Vectorised Derived over NumPy columns (NaN for missing). Returns {key: array}.
+
+    Tendencies need ``t_s`` (seconds, ascending). Logs have no 2 min mean,
+    so backfill() passes the per-row true wind for wind chill.
+    """
+    temp = _nan(temp_c)
+    rh = _nan(rh)
+    p = _nan(pressure_hpa)
+    wind = _nan(wind_kph) * np.ones_like(temp)
+    alt = _nan(gps_alt_m) * np.ones_like(temp)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        gamma = np.log(np.minimum(rh, 100.0) / 100.0) + MAGNUS_A * temp / (MAGNUS_B + temp)
+        dew = np.where(rh > 0, MAGNUS_B * gamma / (MAGNUS_A - gamma), np.nan)
+
+        t = temp * 9 / 5 + 32
+        simple = 0.5 * (t + 61.0 + (t - 68.0) * 1.2 + rh * 0.094)
+        full = (-42.379 + 2.04901523 * t + 10.14333127 * rh - 0.22475541 * t * rh
+                - 6.83783e-3 * t * t - 5.481717e-2 * rh * rh + 1.22874e-3 * t * t * rh
+                + 8.5282e-4 * t * rh * rh - 1.99e-6 * t * t * rh * rh)
+        dry = (rh < 13) & (t >= 80) & (t <= 112)
+        full = np.where(dry, full - (13 - rh) / 4 * np.sqrt(np.abs(17 - np.abs(t - 95)) / 17), full)
+        humid = (rh > 85) & (t >= 80) & (t <= 87)
+        full = np.where(humid, full + (rh - 85) / 10 * (87 - t) / 5, full)
+        hi = np.where((simple + t) / 2 >= 80, full, simple)
+        hi = np.where(temp >= 26.7, (hi - 32) * 5 / 9, np.nan)
+
+        v = wind ** 0.16
+        chill = np.where((temp <= 10.0) & (wind > 4.8),
+                         13.12 + 0.6215 * temp - 11.37 * v + 0.3965 * temp * v, np.nan)
+
+        altitude = np.where(p > 0, 44330.77 * (1.0 - (p / 1013.25) ** 0.190263), np.nan)
+        lapse = 0.0065 * alt
+        slp = p * (1.0 - lapse / (temp + lapse + 273.15)) ** -5.257
+
+    out = {
+        "dew_point_C": np.round(dew, 1),
+        "heat_index_C": np.round(hi, 1),
+        "wind_chill_C": np.round(chill, 1),
+        "altitude_m": np.round(altitude, 0),
+        "sea_level_pressure_hPa": np.round(slp, 1),
+    }
+    if t_s is not None:
+        for key, lag in TENDENCY_WINDOWS:
+            station = tendency_batch(t_s, p, lag)
+            sea_level = tendency_batch(t_s, slp, lag)
+            out[key] = np.round(np.where(np.isnan(sea_level), station, sea_level), 1)
+    return out
+
+
+def backfill(path, out_path=None):
+    """Derived values for every row of a CSV or binary log. Returns {key: array}."""
+    keys = ("time_utc", "temp_C", "humidity_%", "pressure_hPa", "true_wind_kph", "gps_alt_m", "fix")
+    cols = load_columns(path, keys)
+    if cols["temp_C"] is None or cols["pressure_hPa"] is None:
+        raise ValueError(f"{path} has no temp_C/pressure_hPa columns")
+    alt = cols["gps_alt_m"]
+    if alt is not None and cols["fix"] is not None:
+        alt = np.where(cols["fix"] == 1, alt, np.nan)
+    t_s = utc_seconds(cols["time_utc"]) if cols["time_utc"] is not None else None
+    out = derive_batch(cols["temp_C"], cols["humidity_%"], cols["pressure_hPa"],
+                       cols["true_wind_kph"], alt, t_s)
+    result = dict(time_utc=cols["time_utc"], **out)
+    if out_path:
+        _write_csv(out_path, result)
+    return result
+
+
+def _write_csv(path, result):
+    keys = [k for k in result if k != "time_utc"]
+    times = result["time_utc"]
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["time_utc"] + keys)
+        for i in range(len(result[keys[0]])):
+            t = "" if times is None or np.isnan(times[i]) else f"{int(times[i]):06d}"
+            writer.writerow([t] + ["" if np.isnan(result[k][i]) else f"{result[k][i]:g}" for k in keys])
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Backfill derived meteorology over a StormPOD log")
+    p.add_argument("log", help="CSV or binary log")
+    p.add_argument("--out", help="write time_utc + derived columns as CSV")
+    args = p.parse_args(argv)
+
+    start = time.perf_counter()
+    try:
+        result = backfill(args.log, args.out)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    rows = len(result["dew_point_C"])
+    print(f"{rows:,} rows from {os.path.basename(args.log)} in {time.perf_counter() - start:.2f} s")
+    for key, column in result.items():
+        if key != "time_utc" and not np.isnan(column).all():
+            print(f"  {key:26s} {np.nanmin(column):8.1f} .. {np.nanmax(column):8.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,162 @@
+"""
+Heading fusion
+--------------
+Blends the BNO08x yaw with GPS course over ground.
+
+The IMU yaw is smooth and immediate but carries a slowly varying offset
+(magnetic disturbance from the truck, mounting error, declination). GPS
+course has no offset but is noisy, lags in turns and means nothing when
+the vehicle is slow or stopped. HeadingFusion therefore keeps a lightly
+smoothed IMU yaw and a scalar Kalman estimate of its bias:
+
+    heading = imu_yaw + bias
+
+The bias is only corrected from GPS when the vehicle is moving faster
+than ``min_speed_kph`` and not turning hard. Measurement noise shrinks as
+speed grows. Without IMU samples the fused heading falls back to the GPS
+course (when moving), and otherwise there is no estimate.
+
+``update_imu`` runs on the IMU sampling thread, ``update_gps`` on the GPS
+reader and ``read`` on the acquisition thread; a lock keeps them apart.
+"""
+
+import math
+import threading
+import time
+
+
+def wrap180(deg):
+    """Angle folded into [-180, 180)."""
+    return (deg + 180.0) % 360.0 - 180.0
+
+
+class HeadingFusion:
+    def __init__(self, min_speed_kph=8.0, course_sigma_deg=4.0, ref_speed_kph=30.0,
+                 bias_drift_deg_s=0.05, smooth_s=0.1, max_turn_rate_dps=8.0,
+                 imu_timeout_s=1.0, gps_timeout_s=2.0, max_outliers=10):
+        """``course_sigma_deg`` is the GPS course noise at ``ref_speed_kph``;
+        it scales with 1/speed. ``bias_drift_deg_s`` is how fast the IMU
+        offset may wander (Kalman process noise). ``smooth_s`` is the time
+        constant of the IMU yaw smoothing.
+        """
+        self.min_speed_kph = min_speed_kph
+        self.course_sigma_deg = course_sigma_deg
+        self.ref_speed_kph = ref_speed_kph
+        self.bias_drift_deg_s = bias_drift_deg_s
+        self.smooth_s = smooth_s
+        self.max_turn_rate_dps = max_turn_rate_dps
+        self.imu_timeout_s = imu_timeout_s
+        self.gps_timeout_s = gps_timeout_s
+        self.max_outliers = max_outliers
+
+        self.bias = 0.0
+        self.bias_var = None  # None until the first GPS correction
+        self.yaw = None       # smoothed IMU yaw, degrees
+        self.rate_dps = 0.0
+        self.imu_samples = 0
+        self.gps_used = 0
+        self.gps_rejected = 0
+        self._sin = self._cos = 0.0
+        self._imu_t = None
+        self._bias_t = None
+        self._course = None
+        self._gps_t = None
+        self._outliers = 0
+        self._lock = threading.Lock()
+
+    def update_imu(self, yaw_deg, t=None):
+        """One IMU yaw sample (degrees). Call at the sensor's report rate."""
+        if yaw_deg is None:
+            return
+        t = time.monotonic() if t is None else t
+        rad = math.radians(yaw_deg)
+        with self._lock:
+            if self._imu_t is None or t - self._imu_t > self.imu_timeout_s:
+                self._sin, self._cos = math.sin(rad), math.cos(rad)
+                self.rate_dps = 0.0
+                prev = None
+            else:
+                dt = t - self._imu_t
+                a = dt / (self.smooth_s + dt) if dt > 0 else 0.0
+                # Smooth on the unit circle so 359° -> 1° does not swing through 180°
+                self._sin += a * (math.sin(rad) - self._sin)
+                self._cos += a * (math.cos(rad) - self._cos)
+                prev = self.yaw
+            self.yaw = math.degrees(math.atan2(self._sin, self._cos)) % 360.0
+            if prev is not None and t > self._imu_t:
+                rate = wrap180(self.yaw - prev) / (t - self._imu_t)
+                self.rate_dps += 0.2 * (rate - self.rate_dps)
+            self._imu_t = t
+            self.imu_samples += 1
+
+    def update_gps(self, course_deg, speed_kph, t=None):
+        """One GPS course/speed fix. Returns True if it corrected the bias."""
+        if course_deg is None or speed_kph is None or speed_kph < self.min_speed_kph:
+            return False
+        t = time.monotonic() if t is None else t
+        with self._lock:
+            self._course, self._gps_t = course_deg % 360.0, t
+            if self.yaw is None or t - self._imu_t > self.imu_timeout_s:
+                return False
+            if abs(self.rate_dps) > self.max_turn_rate_dps:
+                self.gps_rejected += 1  # course lags the truck in turns
+                return False
+
+            sigma = self.course_sigma_deg * self.ref_speed_kph / speed_kph
+            r = sigma * sigma
+            innovation = wrap180(self._course - self.yaw - self.bias)
+            if self.bias_var is None:
+                self.bias = wrap180(self._course - self.yaw)
+                self.bias_var = r
+            else:
+                self.bias_var += self.bias_drift_deg_s ** 2 * max(0.0, t - self._bias_t)
+                if innovation * innovation > 9.0 * (self.bias_var + r):
+                    # 3-sigma outlier (multipath, reversing). A run of them means
+                    # the IMU offset really moved: start the estimate again.
+                    self.gps_rejected += 1
+                    self._outliers += 1
+                    self._bias_t = t
+                    if self._outliers >= self.max_outliers:
+                        self.bias_var = None
+                        self._outliers = 0
+                    return False
+                gain = self.bias_var / (self.bias_var + r)
+                self.bias = wrap180(self.bias + gain * innovation)
+                self.bias_var *= 1.0 - gain
+                self._outliers = 0
+            self._bias_t = t
+            self.gps_used += 1
+            return True
+
+    def heading(self, t=None):
+        """(heading_deg, source) right now; source is "fused", "imu", "gps" or None."""
+        t = time.monotonic() if t is None else t
+        with self._lock:
+            if self.yaw is not None and t - self._imu_t <= self.imu_timeout_s:
+                if self.bias_var is None:
+                    return round(self.yaw, 1), "imu"
+                return round((self.yaw + self.bias) % 360.0, 1), "fused"
+            if self._course is not None and t - self._gps_t <= self.gps_timeout_s:
+                return round(self._course, 1), "gps"
+        return None, None
+
+    def read(self):
+        """Snapshot values; {} when there is no estimate (raw sources show through)."""
+        heading, source = self.heading()
+        if heading is None:
+            return {}
+        return {
+            "heading_deg": heading,
+            "heading_source": source,
+            "heading_bias_deg": None if self.bias_var is None else round(self.bias, 2),
+        }
+
+    def stats(self):
+        return {
+            "imu_samples": self.imu_samples,
+            "gps_used": self.gps_used,
+            "gps_rejected": self.gps_rejected,
+            "bias_deg": round(self.bias, 2),
+            "bias_sigma_deg": None if self.bias_var is None else round(math.sqrt(self.bias_var), 2),
+            "rate_dps": round(self.rate_dps, 2),
+        }
@@ -1,11 +1,51 @@
+import time
 import tkinter as tk
-from .sensor_manager import SensorManager
+from . import metrics
+from .render import CanvasDashboard, DiffRenderer
+from .sensor_manager import READY, SensorManager
+
+# Rendering is diffed, so refreshing at 5 Hz only costs work when a value changes
+UPDATE_INTERVAL_MS = 200
+
+FRAME_SECONDS = metrics.histogram("stormpod_gui_frame_seconds", "GUI update loop time", ["gui"])
+BASIC_FRAME_SECONDS = FRAME_SECONDS.labels(gui="basic")
+
+# (field, caption, sensor feeding it) in display order; "heading" is the
+# fused heading reader, see panel_state()
+FIELDS = [
+    ("heading", "Heading", "heading"),
+    ("wind", "Wind", "can"),
+    ("temp", "Temp", "can"),
+    ("humid", "Humidity", "can"),
+    ("press", "Pressure", "can"),
+    ("angle", "Wind Dir", "can"),
+]
+# Shown instead of a value while the sensor is not ready
+STATE_TEXT = {"initializing": "initializing…", "failed": "unavailable", "stale": "no data",
+              "reconnecting": "reconnecting…"}
+# The fused heading falls back to IMU-only or GPS course, so it is only
+# down when neither of these is ready
+HEADING_SENSORS = ("imu", "gps")
+
+
+def panel_state(manager, sensor, data):
+    """State shown for a panel fed by ``sensor``. The heading panel is ready
+    whenever the snapshot has a heading_deg, whichever source it came from.
+    """
+    if sensor != "heading":
+        return manager.sensor_state(sensor)
+    if data.get("heading_deg") is not None:
+        return READY
+    states = [manager.sensor_state(name) for name in HEADING_SENSORS]
+    return READY if READY in states else states[0]
 
-UPDATE_INTERVAL_MS = 2000
 
 class StormPODGUI:
-    def __init__(self, root):
-        self.manager = SensorManager()
+    def __init__(self, root, use_canvas=False, manager=None):
+        self._started = time.perf_counter()
+        self.first_frame_s = None
+        self.manager = manager or SensorManager()
+        self.manager.start()
         self.root = root
         self.root.title("StormPOD - Live Atmospheric Dashboard")
         self.root.geometry("1024x600")
@@ -15,81 +55,111 @@ class StormPODGUI:
         self.font = ("Inconsolata", 22)
         self.font_large = ("Inconsolata", 32)
 
-        # Lightning Alerts
-        self.alert_label = tk.Label(root, text="", font=self.font_large, fg="red", bg="black")
-        self.alert_label.pack(pady=10)
-
-        # Heading
-        self.heading_label = tk.Label(root, text="Heading: --", font=self.font, fg="white", bg="black")
-        self.heading_label.pack(pady=5)
-
-        # Wind
-        self.wind_label = tk.Label(root, text="Wind: --", font=self.font, fg="white", bg="black")
-        self.wind_label.pack(pady=5)
-
-        # Atmos
-        self.temp_label = tk.Label(root, text="Temp: --", font=self.font, fg="white", bg="black")
-        self.temp_label.pack(pady=5)
-
-        self.humid_label = tk.Label(root, text="Humidity: --", font=self.font, fg="white", bg="black")
-        self.humid_label.pack(pady=5)
-
-        self.press_label = tk.Label(root, text="Pressure: --", font=self.font, fg="white", bg="black")
-        self.press_label.pack(pady=5)
-
-        # Wind Dir (Angle)
-        self.angle_label = tk.Label(root, text="Wind Dir: --", font=self.font, fg="white", bg="black")
-        self.angle_label.pack(pady=5)
+        self.renderer = DiffRenderer()
+        if use_canvas:
+            self._build_canvas()
+        else:
+            self._build_labels()
 
         self.update_loop()
 
+    def _build_labels(self):
+        # Lightning Alerts
+        self.alert_label = tk.Label(self.root, text="", font=self.font_large, fg="red", bg="black")
+        self.alert_label.pack(pady=10)
+        self.renderer.bind_label("alert", self.alert_label)
+
+        for name, caption, _ in FIELDS:
+            label = tk.Label(self.root, text=f"{caption}: --", font=self.font, fg="white", bg="black")
+            label.pack(pady=5)
+            setattr(self, f"{name}_label", label)
+            self.renderer.bind_label(name, label)
+
+    def _build_canvas(self):
+        # Whole dashboard on one Canvas; fields are text items
+        self.canvas = tk.Canvas(self.root, bg="black", highlightthickness=0)
+        self.canvas.pack(fill="both", expand=True)
+        self.dashboard = CanvasDashboard(self.canvas, self.renderer, font=self.font)
+        self.dashboard.add_field("alert", 512, 40, value="", color="red",
+                                 font=self.font_large, anchor="center")
+        for i, (name, caption, _) in enumerate(FIELDS):
+            self.dashboard.add_field(name, 512, 110 + i * 60, value=f"{caption}: --", anchor="center")
+
     def update_loop(self):
-        self.manager.poll_all()
+        # Sensors are read in the background; this only copies the snapshot
+        start = time.perf_counter()
         data = self.manager.get_latest()
+        self.renderer.render(self.format_fields(data))
+        BASIC_FRAME_SECONDS.observe(time.perf_counter() - start)
+        if self.first_frame_s is None:
+            self.first_frame_s = time.perf_counter() - self._started
+            print(f"🖥️ First frame after {self.first_frame_s * 1000:.0f} ms")
+        self.root.after(UPDATE_INTERVAL_MS, self.update_loop)
+
+    def format_fields(self, data):
+        """Text for every dashboard field; the renderer skips unchanged ones."""
+        fields = {}
 
         # Lightning
         if data.get("lightning"):
             km = data.get("distance_km", "?")
-            self.alert_label.config(text=f"⚡ Lightning ~{km} km")
+            fields["alert"] = f"⚡ Lightning ~{km} km"
+            if data.get("storm_trend") == "approaching" and data.get("storm_eta_min") is not None:
+                fields["alert"] += f", ETA {data['storm_eta_min']:.0f} min"
         elif data.get("noise"):
-            self.alert_label.config(text="🔊 Noise Spike")
+            fields["alert"] = "🔊 Noise Spike"
         elif data.get("disturber"):
-            self.alert_label.config(text="⚠️ Disturber Rejected")
+            fields["alert"] = "⚠️ Disturber Rejected"
         else:
-            self.alert_label.config(text="")
+            fields["alert"] = ""
 
         # Heading
         heading = data.get("heading_deg")
         if heading is not None:
-            self.heading_label.config(text=f"Heading: {heading:.1f}° {self._deg_to_cardinal(heading)}")
+            fields["heading"] = f"Heading: {heading:.1f}° {self._deg_to_cardinal(heading)}"
+            if data.get("heading_source") == "gps":
+                fields["heading"] += " (GPS course)"
         else:
-            self.heading_label.config(text="Heading: --")
+            fields["heading"] = "Heading: --"
 
         # Wind Speed + Raw
         wind_raw = data.get("wind_raw")
         if wind_raw is not None:
             volts = (wind_raw / 1023.0) * 3.3
             speed_kph = round((volts / 1.0) * 32.4, 1)  # Adafruit 1733 approx
-            self.wind_label.config(text=f"Wind: {speed_kph} km/h ({volts:.2f} V)")
+            gust = data.get("gust_kph")
+            gust_text = f", gust {gust:.0f}" if gust is not None else ""
+            fields["wind"] = f"Wind: {speed_kph} km/h ({volts:.2f} V{gust_text})"
         else:
-            self.wind_label.config(text="Wind: --")
+            fields["wind"] = "Wind: --"
 
         # Atmos
         t = data.get("temp_C")
         h = data.get("humidity_%")
         p = data.get("pressure_hPa")
-        self.temp_label.config(text=f"Temp: {t:.1f} °C" if t is not None else "Temp: --")
-        self.humid_label.config(text=f"Humidity: {h:.1f} %" if h is not None else "Humidity: --")
-        self.press_label.config(text=f"Pressure: {p:.1f} hPa" if p is not None else "Pressure: --")
+        fields["temp"] = f"Temp: {t:.1f} °C" if t is not None else "Temp: --"
+        td = data.get("dew_point_C")
+        tendency = data.get("pressure_tendency_3h_hPa")
+        fields["humid"] = f"Humidity: {h:.1f} %" if h is not None else "Humidity: --"
+        if h is not None and td is not None:
+            fields["humid"] += f" (dew point {td:.1f} °C)"
+        fields["press"] = f"Pressure: {p:.1f} hPa" if p is not None else "Pressure: --"
+        if p is not None and tendency is not None:
+            fields["press"] += f" ({tendency:+.1f} hPa/3h)"
 
         # Wind Direction (AS5600)
         angle = data.get("angle_deg")
         if angle is not None:
-            self.angle_label.config(text=f"Wind Dir: {angle:.1f}° {self._deg_to_cardinal(angle)}")
+            fields["angle"] = f"Wind Dir: {angle:.1f}° {self._deg_to_cardinal(angle)}"
         else:
-            self.angle_label.config(text="Wind Dir: --")
-
-        self.root.after(UPDATE_INTERVAL_MS, self.update_loop)
+            fields["angle"] = "Wind Dir: --"
+
+        # Panels whose sensor is starting, stale or down say so
+        for name, caption, sensor in FIELDS:
+            state = panel_state(self.manager, sensor, data)
+            if state != READY:
+                fields[name] = f"{caption}: {STATE_TEXT[state]}"
+        return fields
 
     def _deg_to_cardinal(self, deg):
         dirs = ["N", "NE", "E", "SE", "S", "SW", "W", "NW"]
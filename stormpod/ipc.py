@@ -0,0 +1,366 @@
+"""
+Event fan-out over a Unix domain socket
+---------------------------------------
+EventPublisher (run by tools/irq_listener.py) pushes each event as one
+JSON line with a sequence number to every connected subscriber. The last
+``history`` events are kept so a subscriber that reconnects can ask for
+everything after the last sequence number it saw and lose nothing.
+
+Handshake: the subscriber sends ``SINCE <seq> [<epoch>]\\n`` (-1 = only
+new events); the publisher answers with ``{"hello": <epoch>, "seq":
+<latest>}``, replays what it still has, then streams live events.
+``epoch`` changes whenever the publisher restarts so subscribers know the
+numbering restarted too: a subscriber resuming from another epoch gets
+everything the new one still has.
+
+This module has no package-relative imports so the listener service can
+import it as a top-level module.
+"""
+
+import collections
+import json
+import os
+import selectors
+import socket
+import threading
+import time
+
+SOCKET_PATH = os.environ.get("STORMPOD_IRQ_SOCKET", "/run/stormpod/lightning.sock")
+STATUS_FILE = "/tmp/lightning_status.json"
+
+
+class _Client:
+    """One subscriber connection. ``queued`` is filled by publish() under the
+    lock; everything else belongs to the publisher thread.
+    """
+
+    def __init__(self, sock):
+        self.sock = sock
+        self.request = b""  # handshake received so far
+        self.queued = bytearray()
+        self.sending = bytearray()
+        self.writing = False  # registered for EVENT_WRITE
+
+
+class EventPublisher:
+    """Publishes events to subscribers from its own thread.
+
+    publish() only appends the line to each subscriber's queue under the
+    lock and wakes the publisher thread, which does all socket I/O
+    (accept, handshake, replay, non-blocking sends). A slow or stuck
+    subscriber therefore never delays the caller, typically the GPIO IRQ
+    callback. One that falls more than ``max_backlog`` bytes behind is
+    dropped; it can reconnect and resume from its last seq.
+    """
+
+    MAX_REQUEST = 128
+
+    def __init__(self, path=SOCKET_PATH, history=1024, max_backlog=1 << 20):
+        self.path = path
+        self.epoch = time.time()
+        self.seq = 0
+        self.dropped_clients = 0
+        self.max_backlog = max_backlog
+        self._history = collections.deque(maxlen=history)
+        self._clients = []  # subscribers past the handshake
+        self._lock = threading.Lock()
+
+        if os.path.exists(path):
+            os.unlink(path)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._server.bind(path)
+        os.chmod(path, 0o666)
+        self._server.listen(8)
+        self._server.setblocking(False)
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self._wake_w.setblocking(False)
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(self._server, selectors.EVENT_READ, self._server)
+        self._selector.register(self._wake_r, selectors.EVENT_READ, self._wake_r)
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="ipc-publisher", daemon=True)
+        self._thread.start()
+
+    @property
+    def subscribers(self):
+        with self._lock:
+            return len(self._clients)
+
+    def publish(self, event):
+        """Number ``event`` and queue it for every subscriber. Returns its seq."""
+        with self._lock:
+            self.seq += 1
+            seq = self.seq
+            record = dict(event, seq=seq)
+            line = (json.dumps(record, separators=(",", ":")) + "\n").encode()
+            self._history.append((seq, line))
+            for client in self._clients:
+                client.queued += line
+        self._wake()
+        return seq
+
+    def _wake(self):
+        try:
+            self._wake_w.send(b"\0")
+        except (BlockingIOError, OSError):
+            pass  # already pending, or closing
+
+    # ---------- Publisher thread ----------
+
+    def _run(self):
+        while not self._closed:
+            for key, mask in self._selector.select(0.5):
+                if key.data is self._server:
+                    self._accept()
+                elif key.data is self._wake_r:
+                    try:
+                        while self._wake_r.recv(4096):
+                            pass
+                    except (BlockingIOError, OSError):
+                        pass
+                elif mask & selectors.EVENT_READ:
+                    self._receive(key.data)
+            self._flush()
+
+    def _accept(self):
+        while True:
+            try:
+                sock, _ = self._server.accept()
+            except (BlockingIOError, OSError):
+                return
+            sock.setblocking(False)
+            self._selector.register(sock, selectors.EVENT_READ, _Client(sock))
+
+    def _receive(self, client):
+        try:
+            data = client.sock.recv(self.MAX_REQUEST)
+        except BlockingIOError:
+            return
+        except OSError:
+            data = b""
+        if not data:
+            self._drop(client)
+            return
+        if client in self._clients:
+            return  # nothing is expected after the handshake
+        client.request += data
+        if client.request.endswith(b"\n"):
+            self._handshake(client)
+        elif len(client.request) >= self.MAX_REQUEST:
+            self._drop(client)
+
+    def _handshake(self, client):
+        # SINCE <seq> [<epoch>]
+        parts = client.request.split()
+        try:
+            since = int(parts[1]) if parts[:1] == [b"SINCE"] else -1
+            epoch = float(parts[2]) if len(parts) > 2 else None
+        except (ValueError, IndexError):
+            self._drop(client)
+            return
+        if since >= 0 and epoch is not None and epoch != self.epoch:
+            since = 0  # numbered by an earlier run: everything since the restart is new to it
+        with self._lock:
+            hello = json.dumps({"hello": self.epoch, "seq": self.seq}) + "\n"
+            client.queued += hello.encode()
+            if since >= 0:
+                for seq, line in self._history:
+                    if seq > since:
+                        client.queued += line
+            self._clients.append(client)
+
+    def _flush(self):
+        with self._lock:
+            clients = list(self._clients)
+            for client in clients:
+                client.sending += client.queued
+                client.queued.clear()
+        for client in clients:
+            if len(client.sending) > self.max_backlog:
+                self._drop(client)
+                continue
+            if client.sending:
+                try:
+                    sent = client.sock.send(client.sending)
+                except BlockingIOError:
+                    sent = 0
+                except OSError:
+                    self._drop(client)
+                    continue
+                del client.sending[:sent]
+            writing = bool(client.sending)
+            if writing != client.writing:
+                client.writing = writing
+                events = selectors.EVENT_READ | (selectors.EVENT_WRITE if writing else 0)
+                self._selector.modify(client.sock, events, client)
+
+    def _drop(self, client):
+        # Gone or too slow; it can reconnect and resume from its last seq
+        with self._lock:
+            if client in self._clients:
+                self._clients.remove(client)
+                self.dropped_clients += 1
+        self._selector.unregister(client.sock)
+        client.sock.close()
+
+    def close(self):
+        self._closed = True
+        self._wake()
+        self._thread.join(1.0)
+        for key in list(self._selector.get_map().values()):
+            key.fileobj.close()
+        self._selector.close()
+        self._wake_w.close()
+        with self._lock:
+            self._clients = []
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+
+class EventSubscriber:
+    """Client side: yields events in order and reconnects transparently.
+
+    ``since`` is the last sequence number already handled (None = start
+    with new events only). ``lost`` counts sequence numbers that could not
+    be recovered because they had already left the publisher's history.
+    """
+
+    def __init__(self, path=SOCKET_PATH, since=None, reconnect_delay=0.5):
+        self.path = path
+        self.last_seq = -1 if since is None else since
+        self.epoch = None
+        self.lost = 0
+        self.reconnect_delay = reconnect_delay
+        self._sock = None
+        self._buf = b""
+        self._ready = collections.deque()
+        self._next_connect = 0.0
+
+    def _connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(self.path)
+            epoch = "" if self.epoch is None else f" {self.epoch!r}"
+            sock.sendall(f"SINCE {self.last_seq}{epoch}\n".encode())
+        except OSError:
+            sock.close()
+            self._next_connect = time.monotonic() + self.reconnect_delay
+            return False
+        self._sock = sock
+        self._buf = b""
+        return True
+
+    def _disconnect(self):
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+        self._next_connect = time.monotonic() + self.reconnect_delay
+
+    def _handle_line(self, line):
+        msg = json.loads(line)
+        if "hello" in msg:
+            if self.epoch is not None and msg["hello"] != self.epoch:
+                # Publisher restarted: its numbering starts again from 1
+                self.last_seq = 0
+            elif self.last_seq < 0:
+                self.last_seq = msg["seq"]
+            self.epoch = msg["hello"]
+            return
+        seq = msg["seq"]
+        if seq <= self.last_seq:
+            return
+        if self.last_seq >= 0 and seq > self.last_seq + 1:
+            self.lost += seq - self.last_seq - 1
+        self.last_seq = seq
+        self._ready.append(msg)
+
+    def recv(self, timeout=None):
+        """Next event, or None if nothing arrives within ``timeout`` seconds."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self._ready:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return None
+            if self._sock is None:
+                wait = self._next_connect - time.monotonic()
+                if wait > 0:
+                    time.sleep(wait if remaining is None else min(wait, remaining))
+                    continue
+                if not self._connect():
+                    continue
+            self._sock.settimeout(remaining)
+            try:
+                chunk = self._sock.recv(65536)
+            except socket.timeout:
+                return None
+            except OSError:
+                self._disconnect()
+                continue
+            if not chunk:
+                self._disconnect()
+                continue
+            self._buf += chunk
+            *lines, self._buf = self._buf.split(b"\n")
+            for line in lines:
+                if line:
+                    self._handle_line(line)
+        return self._ready.popleft()
+
+    def drain(self):
+        """Every event available right now, without blocking."""
+        events = []
+        while True:
+            event = self.recv(timeout=0.0001) if not self._ready else self._ready.popleft()
+            if event is None:
+                return events
+            events.append(event)
+
+    def close(self):
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+
+class StatusFileShim:
+    """Keeps the legacy /tmp/lightning_status.json up to date.
+
+    Runs as a subscriber on its own thread, so the IRQ path never touches
+    the filesystem; writes go through a temp file and os.replace() so
+    readers never see a half-written file.
+    """
+
+    LEGACY_KEYS = ("timestamp", "lightning", "distance_km", "noise", "disturber")
+
+    def __init__(self, path=STATUS_FILE, socket_path=SOCKET_PATH):
+        self.path = path
+        self.subscriber = EventSubscriber(socket_path)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="status-file-shim", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def write(self, event):
+        data = {k: event[k] for k in self.LEGACY_KEYS if k in event}
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(data, f)
+            os.fchmod(f.fileno(), 0o666)
+        os.replace(tmp, self.path)
+
+    def _run(self):
+        while not self._stop.is_set():
+            event = self.subscriber.recv(timeout=0.5)
+            if event is not None:
+                try:
+                    self.write(event)
+                except OSError as e:
+                    print(f"⚠️ Status file write failed: {e}")
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join(1.0)
+        self.subscriber.close()
@@ -0,0 +1,235 @@
+"""
+Lightning storm tracker
+-----------------------
+Turns AS3935 strikes into storm cells you can act on.
+
+* Every strike is kept for ``history_s`` with the truck's GPS position at
+  the time, in a bounded deque.
+* Strikes are grouped into cells by distance continuity. A strike joins
+  the cell whose fitted distance it is closest to, if that is within
+  ``join_km``; otherwise it starts a new cell. Cells with no strike for
+  ``cell_timeout_s`` are dropped.
+* Each cell fits distance against time by least squares over the last
+  ``fit_window_s``. The fit uses running sums with expired strikes
+  subtracted, so one update is amortised O(1) however busy the storm
+  is. The slope is the closing speed and the fit gives the ETA to
+  ``arrival_km``.
+* Strike rates per minute over 1, 5 and 15 min come from sliding counts.
+
+The AS3935 only reports distance, not bearing, so the closing speed is
+relative to the truck. Driving towards a cell shortens its ETA just as it
+does in reality.
+"""
+
+import math
+import threading
+import time
+from collections import deque
+
+# AS3935 distance 0x3F: strike detected, storm out of range
+OUT_OF_RANGE_KM = 63
+RATE_WINDOWS = (("strike_rate_1min", 60.0), ("strike_rate_5min", 300.0), ("strike_rate_15min", 900.0))
+
+
+class SlidingCount:
+    """Events in the last ``window_s`` seconds."""
+
+    def __init__(self, window_s):
+        self.window_s = window_s
+        self._times = deque()
+
+    def add(self, t):
+        self._times.append(t)
+
+    def count(self, now):
+        cutoff = now - self.window_s
+        while self._times and self._times[0] <= cutoff:
+            self._times.popleft()
+        return len(self._times)
+
+
+class StormCell:
+    """One cell: sliding least-squares fit of distance (km) against time (s)."""
+
+    def __init__(self, cell_id, t, window_s):
+        self.id = cell_id
+        self.window_s = window_s
+        self.t0 = t  # fit times are relative to this to keep the sums well conditioned
+        self.first_t = t
+        self.last_t = t
+        self.total = 0
+        self._strikes = deque()
+        self._n = 0
+        self._st = self._sd = self._stt = self._std = self._sdd = 0.0
+
+    def add(self, t, distance_km):
+        x = t - self.t0
+        self._strikes.append((t, distance_km))
+        self._n += 1
+        self._st += x
+        self._sd += distance_km
+        self._stt += x * x
+        self._std += x * distance_km
+        self._sdd += distance_km * distance_km
+        self.last_t = max(self.last_t, t)
+        self.total += 1
+        self.expire(t)
+
+    def expire(self, now):
+        cutoff = now - self.window_s
+        while self._strikes and self._strikes[0][0] <= cutoff:
+            t, d = self._strikes.popleft()
+            x = t - self.t0
+            self._n -= 1
+            self._st -= x
+            self._sd -= d
+            self._stt -= x * x
+            self._std -= x * d
+            self._sdd -= d * d
+
+    def __len__(self):
+        return self._n
+
+    def fit(self):
+        """(slope km/s, intercept km at t0, slope standard error) or None."""
+        n = self._n
+        if n == 0:
+            return None
+        mean_t, mean_d = self._st / n, self._sd / n
+        sxx = self._stt - n * mean_t * mean_t
+        if n < 2 or sxx <= 1e-9:
+            return 0.0, mean_d, math.inf
+        sxy = self._std - n * mean_t * mean_d
+        slope = sxy / sxx
+        intercept = mean_d - slope * mean_t
+        if n > 2:
+            syy = self._sdd - n * mean_d * mean_d
+            resid = max(0.0, syy - slope * sxy) / (n - 2)
+            se = math.sqrt(resid / sxx)
+        else:
+            se = math.inf
+        return slope, intercept, se
+
+    def distance_at(self, t):
+        fit = self.fit()
+        if fit is None:
+            return None
+        slope, intercept, _ = fit
+        return max(0.0, intercept + slope * (t - self.t0))
+
+
+class StormTracker:
+    def __init__(self, history_s=3600.0, max_history=5000, fit_window_s=900.0,
+                 cell_timeout_s=900.0, join_km=8.0, max_cells=4, arrival_km=10.0,
+                 min_strikes=5, min_span_s=120.0, stationary_kph=2.0):
+        """``arrival_km``: ETA is the time until the cell is that close (the
+        10 km "thunder is audible" rule). A trend needs ``min_strikes``
+        strikes spanning ``min_span_s``. Closing speeds under
+        ``stationary_kph``, or under twice their standard error, count as
+        stationary.
+        """
+        self.history = deque(maxlen=max_history)  # (timestamp, km, lat, lon, cell id)
+        self.history_s = history_s
+        self.fit_window_s = fit_window_s
+        self.cell_timeout_s = cell_timeout_s
+        self.join_km = join_km
+        self.max_cells = max_cells
+        self.arrival_km = arrival_km
+        self.min_strikes = min_strikes
+        self.min_span_s = min_span_s
+        self.stationary_kph = stationary_kph
+
+        self.cells = []
+        self.rates = [(key, SlidingCount(window)) for key, window in RATE_WINDOWS]
+        self.strikes_total = 0
+        self.out_of_range = 0
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+    def add_strike(self, distance_km, t=None, lat=None, lon=None):
+        """Record one strike (``t`` in epoch seconds, as the AS3935 events carry)."""
+        t = time.time() if t is None else t
+        with self._lock:
+            self.strikes_total += 1
+            for _, counter in self.rates:
+                counter.add(t)
+            self._expire(t)
+            cell = None
+            if distance_km is None or distance_km >= OUT_OF_RANGE_KM:
+                self.out_of_range += 1
+            else:
+                cell = self._cell_for(distance_km, t)
+                cell.add(t, distance_km)
+            self.history.append((t, distance_km, lat, lon, cell.id if cell else None))
+
+    def _cell_for(self, distance_km, t):
+        best, best_gap = None, self.join_km
+        for cell in self.cells:
+            gap = abs(cell.distance_at(t) - distance_km)
+            if gap <= best_gap:
+                best, best_gap = cell, gap
+        if best is None:
+            if len(self.cells) >= self.max_cells:
+                # Drop the quietest cell to stay bounded
+                self.cells.remove(min(self.cells, key=lambda c: c.last_t))
+            best = StormCell(self._next_id, t, self.fit_window_s)
+            self._next_id += 1
+            self.cells.append(best)
+        return best
+
+    def _expire(self, now):
+        for cell in self.cells:
+            cell.expire(now)
+        self.cells = [c for c in self.cells if len(c) and now - c.last_t <= self.cell_timeout_s]
+        cutoff = now - self.history_s
+        while self.history and self.history[0][0] <= cutoff:
+            self.history.popleft()
+
+    def cell_trend(self, cell, now):
+        """Trend dict for one cell."""
+        distance = cell.distance_at(now)
+        out = {"cell": cell.id, "distance_km": round(distance, 1), "strikes": len(cell),
+               "trend": None, "closing_kph": None, "eta_min": None}
+        fit = cell.fit()
+        span = cell.last_t - max(cell.first_t, now - self.fit_window_s)
+        if len(cell) < self.min_strikes or span < self.min_span_s:
+            return out
+        slope, _, se = fit
+        closing = -slope * 3600.0  # km/h, positive when approaching
+        significant = abs(slope) > 2.0 * se
+        if abs(closing) < self.stationary_kph or not significant:
+            out["trend"] = "stationary"
+        elif closing > 0:
+            out["trend"] = "approaching"
+            out["eta_min"] = round(max(0.0, distance - self.arrival_km) / closing * 60.0, 1)
+        else:
+            out["trend"] = "departing"
+        out["closing_kph"] = round(closing, 1)
+        return out
+
+    def read(self, now=None):
+        """Snapshot values for the nearest cell plus strike rates; {} before any strike."""
+        now = time.time() if now is None else now
+        with self._lock:
+            if not self.strikes_total:
+                return {}
+            self._expire(now)
+            out = {key: counter.count(now) * 60.0 / counter.window_s for key, counter in self.rates}
+            trends = [self.cell_trend(cell, now) for cell in self.cells]
+        for key in out:
+            out[key] = round(out[key], 1)
+        nearest = min(trends, key=lambda c: c["distance_km"], default=None)
+        out.update({
+            "storm_cells": len(trends),
+            "storm_distance_km": nearest and nearest["distance_km"],
+            "storm_trend": nearest and nearest["trend"],
+            "storm_closing_kph": nearest and nearest["closing_kph"],
+            "storm_eta_min": nearest and nearest["eta_min"],
+        })
+        return out
+
+    def cells_report(self, now=None):
+        now = time.time() if now is None else now
+        with self._lock:
+            self._expire(now)
+            return [self.cell_trend(cell, now) for cell in self.cells]
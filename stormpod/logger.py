@@ -1,5 +1,10 @@
 import csv
 import os
+import queue
+import threading
+import time
+
+from . import metrics
 
 LOGFILE = "bme280_log.csv"
 HEADERS = [
@@ -7,9 +12,17 @@ HEADERS = [
     "temp_C", "humidity_%", "pressure_hPa", "altitude_m",
     "wind_raw", "wind_volts", "speed_kph",
     "fix", "lat", "lon", "heading_deg",
-    "lightning", "distance_km"
+    "lightning", "distance_km",
+    "angle_deg", "ground_speed_kph", "true_wind_kph", "true_wind_dir_deg",
+    "gps_alt_m",
 ]
 
+FSYNC_POLICIES = ("none", "flush", "close")
+
+FLUSH_SECONDS = metrics.histogram("stormpod_log_flush_seconds", "Log batch write + flush (+ fsync) time")
+ROWS = metrics.counter("stormpod_log_rows_total", "Rows written to the log")
+DROPPED = metrics.counter("stormpod_log_dropped_total", "Rows dropped because the log queue was full")
+
 def log(data):
     file_exists = os.path.isfile(LOGFILE)
     with open(LOGFILE, mode="a", newline="") as f:
@@ -17,3 +30,196 @@ def log(data):
         if not file_exists:
             writer.writeheader()
         writer.writerow({key: data.get(key, "") for key in HEADERS})
+
+
+class BufferedLogger:
+    """Keeps the log open and writes rows in batches.
+
+    Rows are queued by ``log()`` and written by a background thread once
+    ``flush_rows`` have built up or ``flush_interval`` seconds have passed,
+    so callers never wait on the SD card. ``fsync`` is one of:
+
+    - ``"none"``: leave write-back to the OS
+    - ``"flush"``: fsync after every batch (survives power loss, costs more)
+    - ``"close"``: fsync only on rotate/close
+
+    Files rotate when they pass ``rotate_bytes`` and/or at midnight UTC
+    (``rotate_daily``); the old file is renamed with a timestamp suffix.
+    """
+
+    mode = "a"
+
+    def __init__(self, path=LOGFILE, headers=HEADERS, flush_rows=60, flush_interval=5.0,
+                 fsync="flush", rotate_bytes=None, rotate_daily=False,
+                 background=True, max_queue=10000):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"fsync must be one of {FSYNC_POLICIES}, got {fsync!r}")
+        self.path = path
+        self.headers = list(headers)
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.rotate_bytes = rotate_bytes
+        self.rotate_daily = rotate_daily
+
+        self.rows_written = 0
+        self.dropped = 0
+        self.rotations = 0
+
+        self._pending = []
+        self._last_flush = time.monotonic()
+        self._file = None
+        self._day = None
+        self._lock = threading.Lock()
+        self._open()
+
+        self._queue = None
+        self._thread = None
+        if background:
+            self._queue = queue.Queue(maxsize=max_queue)
+            self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+            self._thread.start()
+
+    # ---------- Format hooks (overridden by binlog.BinaryLogger) ----------
+
+    def _encode(self, data):
+        return [data.get(key, "") for key in self.headers]
+
+    def _open_file(self):
+        f = open(self.path, self.mode, newline="")
+        self._csv = csv.writer(f)
+        return f
+
+    def _write_header(self):
+        self._csv.writerow(self.headers)
+
+    def _header_matches(self):
+        with open(self.path, newline="") as f:
+            return next(csv.reader(f), None) == self.headers
+
+    def _write_rows(self, rows):
+        self._csv.writerows(rows)
+
+    # ---------- Public API ----------
+
+    def log(self, data):
+        """Queue one sample. Never blocks on disk in background mode."""
+        row = self._encode(data)
+        if self._queue is None:
+            with self._lock:
+                self._pending.append(row)
+                if self._due():
+                    self._flush_pending()
+            return
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            self.dropped += 1
+            DROPPED.inc()
+
+    def flush(self):
+        """Write everything queued so far (blocks until done)."""
+        if self._queue is not None:
+            self._queue.join()
+        with self._lock:
+            self._flush_pending()
+
+    def close(self):
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+        with self._lock:
+            self._flush_pending()
+            self._close_file()
+
+    # ---------- Internals ----------
+
+    def _run(self):
+        while True:
+            timeout = max(0.0, self.flush_interval - (time.monotonic() - self._last_flush))
+            try:
+                row = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                with self._lock:
+                    self._flush_pending()
+                continue
+            if row is None:
+                self._queue.task_done()
+                return
+            with self._lock:
+                self._pending.append(row)
+                # Batch up whatever else is already waiting
+                while len(self._pending) < self.flush_rows:
+                    try:
+                        row = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if row is None:
+                        self._queue.put(None)
+                        self._queue.task_done()
+                        break
+                    self._pending.append(row)
+                    self._queue.task_done()
+                if self._due():
+                    self._flush_pending()
+            self._queue.task_done()
+
+    def _due(self):
+        return (len(self._pending) >= self.flush_rows
+                or time.monotonic() - self._last_flush >= self.flush_interval)
+
+    def _open(self):
+        # Never append rows under a different header (e.g. after HEADERS grew)
+        if os.path.exists(self.path) and os.path.getsize(self.path) and not self._header_matches():
+            self._archive()
+        self._file = self._open_file()
+        self._day = time.strftime("%Y%m%d", time.gmtime())
+        if self._file.tell() == 0:
+            self._write_header()
+            self._file.flush()
+
+    def _close_file(self):
+        if self._file is None:
+            return
+        self._file.flush()
+        if self.fsync != "none":
+            os.fsync(self._file.fileno())
+        self._file.close()
+        self._file = None
+
+    def _rotate(self):
+        self._close_file()
+        self._archive()
+        self.rotations += 1
+        self._open()
+
+    def _archive(self):
+        stem, ext = os.path.splitext(self.path)
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.gmtime())
+        target = f"{stem}-{stamp}{ext}"
+        n = 1
+        while os.path.exists(target):
+            target = f"{stem}-{stamp}.{n}{ext}"
+            n += 1
+        os.rename(self.path, target)
+
+    def _flush_pending(self):
+        self._last_flush = time.monotonic()
+        if self._file is None:
+            return
+        if self.rotate_daily and time.strftime("%Y%m%d", time.gmtime()) != self._day:
+            self._rotate()
+        if not self._pending:
+            return
+        start = time.perf_counter()
+        self._write_rows(self._pending)
+        self.rows_written += len(self._pending)
+        ROWS.inc(len(self._pending))
+        self._pending = []
+        self._file.flush()
+        if self.fsync == "flush":
+            os.fsync(self._file.fileno())
+        FLUSH_SECONDS.observe(time.perf_counter() - start)
+        if self.rotate_bytes and self._file.tell() >= self.rotate_bytes:
+            self._rotate()
@@ -0,0 +1,347 @@
+"""
+Metrics
+-------
+Counters, gauges and latency histograms describing StormPOD itself (CAN
+frame rate, GPS sentences, lightning IRQs, poll and log flush latency,
+GUI frame time), served as Prometheus text:
+
+    curl http://127.0.0.1:9108/metrics
+
+Modules declare their metrics once at import time on the process-wide
+REGISTRY:
+
+    CAN_FRAMES = metrics.counter("stormpod_can_frames_total", "CAN frames decoded")
+    CAN_FRAMES.inc(handled)
+
+Recording is one attribute add (a histogram adds a bisect) with no lock.
+Each metric is written by a single thread (the CAN reader, the logger
+thread, the GUI loop...) and scrapes read it as it is, so a scrape can be
+one update behind but never blocks the hot path. Values that are cheap to
+compute on demand (sensor state, queue depth) use ``set_function`` and
+are only evaluated when scraped.
+"""
+
+import bisect
+import math
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Seconds: 100 us to 10 s, covering a CAN decode up to a stalled SD card
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+                   0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help="", labelnames=(), labels=None):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.label_values = labels or {}
+        self._children = {}
+        self._fn = None
+
+    def labels(self, **labels):
+        """The child series for one set of label values (create it once, keep it)."""
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} takes labels {self.labelnames}, got {tuple(labels)}")
+        key = tuple(str(labels[n]) for n in self.labelnames)
+        child = self._children.get(key)
+        if child is None:
+            child = self._child(dict(zip(self.labelnames, key)))
+            self._children[key] = child
+        return child
+
+    def _child(self, labels):
+        return type(self)(self.name, self.help, labels=labels)
+
+    def set_function(self, fn):
+        """Report ``fn()`` at scrape time instead of a recorded value."""
+        self._fn = fn
+
+    def series(self):
+        """The series carrying values: the children if labelled, else itself."""
+        return list(self._children.values()) if self.labelnames else [self]
+
+    def _current(self):
+        if self._fn is None:
+            return self.value
+        try:
+            return float(self._fn())
+        except Exception:
+            return math.nan
+
+    def samples(self):
+        """(name, labels, value) for exposition."""
+        for s in self.series():
+            yield self.name, s.label_values, s._current()
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, help="", labelnames=(), labels=None):
+        super().__init__(name, help, labelnames, labels)
+        self.value = 0
+
+    def inc(self, amount=1):
+        self.value += amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name, help="", labelnames=(), labels=None):
+        super().__init__(name, help, labelnames, labels)
+        self.value = 0.0
+
+    def set(self, value):
+        self.value = value
+
+    def inc(self, amount=1):
+        self.value += amount
+
+    def dec(self, amount=1):
+        self.value -= amount
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help="", labelnames=(), labels=None, buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames, labels)
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def _child(self, labels):
+        return Histogram(self.name, self.help, labels=labels, buckets=self.buckets)
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q):
+        """Estimate of the q-quantile from the buckets (None when empty)."""
+        counts = list(self.counts)
+        total = sum(counts)
+        if not total:
+            return None
+        rank = q * total
+        seen = 0
+        for i, n in enumerate(counts):
+            if seen + n >= rank and n:
+                lower = self.buckets[i - 1] if i else 0.0
+                if i == len(self.buckets):
+                    return lower  # in +Inf: the best we can say is "above the top bucket"
+                return lower + (self.buckets[i] - lower) * (rank - seen) / n
+            seen += n
+        return self.buckets[-1]
+
+    def samples(self):
+        for s in self.series():
+            counts = list(s.counts)
+            cumulative = 0
+            for bound, n in zip(self.buckets + (math.inf,), counts):
+                cumulative += n
+                yield f"{self.name}_bucket", {**s.label_values, "le": _format(bound)}, cumulative
+            yield f"{self.name}_sum", s.label_values, s.sum
+            yield f"{self.name}_count", s.label_values, cumulative
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, cls, name, help, labelnames, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is not None:
+                # Same declaration twice (e.g. a module reloaded): share it
+                if type(metric) is not cls or metric.labelnames != tuple(labelnames):
+                    raise ValueError(f"Metric {name} is already registered as a {metric.kind}")
+                return metric
+            metric = cls(name, help, labelnames, **kwargs)
+            self._metrics[name] = metric
+            return metric
+
+    def counter(self, name, help="", labelnames=()):
+        return self._register(Counter, name, help, labelnames)
+
+    def gauge(self, name, help="", labelnames=()):
+        return self._register(Gauge, name, help, labelnames)
+
+    def histogram(self, name, help="", labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram, name, help, labelnames, buckets=buckets)
+
+    def get(self, name):
+        return self._metrics.get(name)
+
+    def __iter__(self):
+        with self._lock:
+            return iter(list(self._metrics.values()))
+
+    def expose(self):
+        """Every metric in Prometheus text exposition format."""
+        lines = []
+        for metric in self:
+            lines.append(f"# HELP {metric.name} {_escape_help(metric.help)}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{_format_labels(labels)} {_format(value)}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self):
+        """{series: value} for counters and gauges, and {series: histogram} for
+        histograms, with series named like the exposition (``name{k="v"}``).
+        """
+        out = {}
+        for metric in self:
+            for s in metric.series():
+                key = metric.name + _format_labels(s.label_values)
+                out[key] = s if isinstance(s, Histogram) else s._current()
+        return out
+
+
+def _escape_help(text):
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    parts = []
+    for k, v in labels.items():
+        v = str(v).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+        parts.append(f'{k}="{v}"')
+    return "{" + ",".join(parts) + "}"
+
+
+def _format(value):
+    if value is None:
+        return "NaN"
+    value = float(value)
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value)
+
+
+class Digest:
+    """Plain-text view of a registry for the GUI diagnostics tab.
+
+    Counters show as a per-second rate since the previous call (and their
+    total), gauges as values and histograms as p50/p95 in milliseconds.
+    """
+
+    def __init__(self, registry=None):
+        self.registry = registry or REGISTRY
+        self._prev = {}
+        self._prev_t = None
+
+    def lines(self, now=None):
+        now = time.monotonic() if now is None else now
+        elapsed = None if self._prev_t is None else now - self._prev_t
+        out = []
+        current = {}
+        for metric in self.registry:
+            for s in metric.series():
+                name = metric.name + _format_labels(s.label_values)
+                if isinstance(s, Histogram):
+                    if s.count:
+                        p50, p95 = s.quantile(0.5), s.quantile(0.95)
+                        out.append(f"{name:56s} p50 {p50 * 1e3:8.2f} ms  p95 {p95 * 1e3:8.2f} ms"
+                                   f"  n={s.count}")
+                    continue
+                value = s._current()
+                if metric.kind == "counter":
+                    current[name] = value
+                    prev = self._prev.get(name)
+                    if elapsed and prev is not None:
+                        out.append(f"{name:56s} {(value - prev) / elapsed:10.1f}/s  total {_format(value)}")
+                    else:
+                        out.append(f"{name:56s} {'':10s}   total {_format(value)}")
+                else:
+                    out.append(f"{name:56s} {_format(value)}")
+        self._prev, self._prev_t = current, now
+        return out
+
+
+# ---------- Process-wide registry ----------
+
+REGISTRY = Registry()
+
+
+def counter(name, help="", labelnames=()):
+    return REGISTRY.counter(name, help, labelnames)
+
+
+def gauge(name, help="", labelnames=()):
+    return REGISTRY.gauge(name, help, labelnames)
+
+
+def histogram(name, help="", labelnames=(), buckets=DEFAULT_BUCKETS):
+    return REGISTRY.histogram(name, help, labelnames, buckets)
+
+
+# ---------- HTTP endpoint ----------
+
+class MetricsServer:
+    """Serves ``/metrics`` from a daemon thread (localhost only by default)."""
+
+    def __init__(self, registry=REGISTRY, host="127.0.0.1", port=9108):
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self._server = None
+        self._thread = None
+
+    def start(self):
+        if self._server is not None:
+            return self
+        registry = self.registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/metrics", "/"):
+                    self.send_error(404)
+                    return
+                body = registry.expose().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, fmt, *args):
+                pass  # scrapes every few seconds would flood the journal
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="metrics-http",
+                                        daemon=True)
+        self._thread.start()
+        return self
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}/metrics"
+
+    def stop(self):
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join(1.0)
+        self._server = None
+        self._thread = None
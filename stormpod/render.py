@@ -0,0 +1,102 @@
+"""
+Dashboard rendering
+-------------------
+Tk redoes geometry and redraw work for every ``label.config()`` call, even
+when the text is unchanged. DiffRenderer remembers what each field last
+showed and only touches the widgets whose text or colour changed. It also
+times every frame, so the GUI refresh rate can be raised without starving
+acquisition.
+
+CanvasDashboard draws a whole dashboard on one tk.Canvas. Each field is a
+pair of canvas text items updated with itemconfigure(), which avoids the
+per-widget geometry management of a Label grid.
+"""
+
+import collections
+import time
+
+
+class DiffRenderer:
+    def __init__(self, history=200):
+        self._targets = {}
+        self._last = {}
+        self.frame_times = collections.deque(maxlen=history)
+        self.updates = 0
+        self.skipped = 0
+
+    def bind(self, name, apply):
+        """Register ``apply(text=..., fg=...)`` as the sink for field ``name``."""
+        self._targets[name] = apply
+        self._last.pop(name, None)
+
+    def bind_label(self, name, label):
+        self.bind(name, label.config)
+
+    def set(self, name, text, fg=None):
+        """Show ``text`` (and ``fg``) in field ``name`` if it differs. Returns True if drawn."""
+        value = (text, fg)
+        if self._last.get(name) == value:
+            self.skipped += 1
+            return False
+        options = {"text": text}
+        if fg is not None:
+            options["fg"] = fg
+        self._targets[name](**options)
+        self._last[name] = value
+        self.updates += 1
+        return True
+
+    def render(self, fields):
+        """Apply one frame. ``fields`` maps name -> text or (text, fg)."""
+        start = time.perf_counter()
+        changed = 0
+        for name, value in fields.items():
+            text, fg = value if isinstance(value, tuple) else (value, None)
+            changed += self.set(name, text, fg)
+        self.frame_times.append(time.perf_counter() - start)
+        return changed
+
+    def invalidate(self):
+        """Forget the last values so the next frame redraws everything."""
+        self._last.clear()
+
+    def stats(self):
+        frames = sorted(self.frame_times)
+        return {
+            "updates": self.updates,
+            "skipped": self.skipped,
+            "frame_ms_median": frames[len(frames) // 2] * 1000 if frames else None,
+            "frame_ms_max": frames[-1] * 1000 if frames else None,
+        }
+
+
+class CanvasDashboard:
+    """Name/value text pairs on a single Canvas, driven by a DiffRenderer."""
+
+    def __init__(self, canvas, renderer=None, font=("Inconsolata", 22), name_color="#ffffff"):
+        self.canvas = canvas
+        self.renderer = renderer or DiffRenderer()
+        self.font = font
+        self.name_color = name_color
+        self.items = {}
+
+    def add_field(self, name, x, y, caption="", value="--", color="#ffffff", font=None,
+                  anchor="w", value_offset=0):
+        """Add a field at (x, y); the value is drawn ``value_offset`` px right of the caption."""
+        font = font or self.font
+        if caption:
+            self.canvas.create_text(x, y, text=caption, font=font, fill=self.name_color, anchor=anchor)
+        item = self.canvas.create_text(x + value_offset, y, text=value, font=font,
+                                       fill=color, anchor=anchor)
+        self.items[name] = item
+        self.renderer.bind(name, lambda text, fg=None, _item=item: self._apply(_item, text, fg))
+        return item
+
+    def _apply(self, item, text, fg):
+        if fg is None:
+            self.canvas.itemconfigure(item, text=text)
+        else:
+            self.canvas.itemconfigure(item, text=text, fill=fg)
+
+    def render(self, fields):
+        return self.renderer.render(fields)
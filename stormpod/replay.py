@@ -0,0 +1,294 @@
+"""
+Replay / simulation backend
+---------------------------
+Runs the real sensor classes against stand-in hardware and feeds them
+recorded data, so SensorManager and both GUIs run on a desk:
+
+* CAN frames -> python-can virtual bus -> CANReceiver
+* NMEA / UBX bytes -> FakeSerial -> GPSSensor
+* AS3935 IRQs -> FakeSPI registers + FakeGPIO edge -> AS3935Sensor
+* IMU quaternions -> FakeBNO -> IMUSensor
+
+Traces are JSON lines, one event per line, with ``t`` in seconds from
+the start of the recording:
+
+    {"t": 0.00, "src": "can", "id": 16, "data": "00b9028c2790"}
+    {"t": 0.00, "src": "gps", "data": "$GNRMC,...*1E\\r\\n"}
+    {"t": 0.35, "src": "as3935", "irq": 8, "distance_km": 14}
+    {"t": 0.10, "src": "imu", "quat": [0.92, 0.0, 0.0, 0.38]}
+
+GPS events may carry ``hex`` instead of ``data`` for binary UBX. Loaders
+below also turn candump/ASC/BLF logs (via can.LogReader) and raw
+NMEA/UBX captures into events.
+
+    python -m stormpod.replay --nmea tests/data/neo_m9n_5hz.nmea --speed max
+"""
+
+import argparse
+import json
+import struct
+import threading
+import time
+
+import can
+
+from .sensors.fakes import FakeBNO, FakeGPIO, FakeSerial, FakeSPI
+from .sensors.sensor_as3935 import AS3935Sensor
+from .sensors.sensor_can import CANReceiver
+from .sensors.sensor_gps import NAV_PVT, UBX_NAV_PVT, UBX_SYNC, GPSSensor
+from .sensors.sensor_imu import IMUSensor
+
+SOURCES = ("can", "gps", "as3935", "imu")
+
+
+# ---------- Trace loading ----------
+
+def load_trace(path):
+    with open(path) as f:
+        events = [json.loads(line) for line in f if line.strip()]
+    return sorted(events, key=lambda e: e["t"])
+
+
+def save_trace(path, events):
+    with open(path, "w") as f:
+        for event in events:
+            f.write(json.dumps(event, separators=(",", ":")) + "\n")
+
+
+def merge(*traces):
+    """One time-ordered trace from several (each already starting at t=0)."""
+    return sorted((e for trace in traces for e in trace), key=lambda e: e["t"])
+
+
+def _rebase(events):
+    if events:
+        t0 = events[0]["t"]
+        for event in events:
+            event["t"] = round(event["t"] - t0, 6)
+    return events
+
+
+def load_can_log(path):
+    """Events from any log python-can reads (.log candump, .asc, .blf, .csv ...)."""
+    events = [{"t": msg.timestamp, "src": "can", "id": msg.arbitration_id, "data": msg.data.hex()}
+              for msg in can.LogReader(path) if not msg.is_error_frame]
+    return _rebase(events)
+
+
+def _nmea_time(line):
+    # $xxRMC,hhmmss.ss,...
+    try:
+        hms = line.split(",", 2)[1]
+        return int(hms[0:2]) * 3600 + int(hms[2:4]) * 60 + float(hms[4:])
+    except (IndexError, ValueError):
+        return None
+
+
+def load_nmea(path, default_period=0.2):
+    """One event per fix epoch, timed from the RMC time of day."""
+    events = []
+    chunk, t, last_t = [], None, None
+    with open(path, "rb") as f:
+        for raw in f:
+            line = raw.decode("ascii", errors="ignore").strip()
+            if line[3:6] == "RMC" and chunk:
+                events.append({"t": t, "src": "gps", "data": "".join(chunk)})
+                chunk = []
+            if line[3:6] == "RMC" or t is None:
+                epoch = _nmea_time(line) if line[3:6] == "RMC" else None
+                if epoch is None:
+                    epoch = (last_t + default_period) if last_t is not None else 0.0
+                elif last_t is not None and epoch < last_t - 43200:
+                    epoch += 86400  # midnight rollover
+                t = last_t = epoch
+            chunk.append(line + "\r\n")
+    if chunk:
+        events.append({"t": t, "src": "gps", "data": "".join(chunk)})
+    return _rebase(events)
+
+
+def load_ubx(path):
+    """One event per UBX frame, timed from NAV-PVT iTOW (others inherit the last)."""
+    with open(path, "rb") as f:
+        buf = f.read()
+    events = []
+    pos, t = 0, 0.0
+    while True:
+        pos = buf.find(UBX_SYNC, pos)
+        if pos == -1 or len(buf) - pos < 8:
+            break
+        msg_class, msg_id, length = struct.unpack_from("<BBH", buf, pos + 2)
+        end = pos + 8 + length
+        if (msg_class, msg_id) == UBX_NAV_PVT and length == NAV_PVT.size:
+            t = struct.unpack_from("<I", buf, pos + 6)[0] / 1000.0
+        events.append({"t": t, "src": "gps", "hex": buf[pos:end].hex()})
+        pos = end
+    return _rebase(events)
+
+
+# ---------- Stand-in hardware ----------
+
+class ReplaySensors:
+    """The real sensor classes wired to fake hardware.
+
+    ``sensors`` is ready to hand to SensorManager(sensors=...); ``inject``
+    pushes one trace event into the matching fake.
+    """
+
+    def __init__(self, gps_protocol="nmea", irq_pin=23):
+        self.channel = f"stormpod-replay-{id(self)}"
+        self.can = CANReceiver(channel=self.channel, interface="virtual")
+        self.can_tx = can.Bus(channel=self.channel, interface="virtual")
+
+        self.serial = FakeSerial()
+        self.gps = GPSSensor(ser=self.serial, protocol=gps_protocol)
+
+        self.spi, self.gpio, self.irq_pin = FakeSPI(), FakeGPIO(), irq_pin
+        self.lightning = AS3935Sensor(irq_pin=irq_pin, spi=self.spi, gpio=self.gpio)
+
+        self.bno = FakeBNO()
+        self.imu = IMUSensor(bno=self.bno)
+
+        self.sensors = {"can": self.can, "gps": self.gps, "lightning": self.lightning, "imu": self.imu}
+
+    def inject(self, event):
+        src = event["src"]
+        if src == "can":
+            self.can_tx.send(can.Message(arbitration_id=event["id"], is_extended_id=False,
+                                         data=bytes.fromhex(event["data"])))
+        elif src == "gps":
+            data = bytes.fromhex(event["hex"]) if "hex" in event else event["data"].encode("ascii")
+            self.serial.feed(data)
+        elif src == "as3935":
+            self.spi.set_event(event["irq"], event.get("distance_km", 0))
+            self.gpio.trigger(self.irq_pin)
+        elif src == "imu":
+            self.bno.set_quaternion(*event["quat"])
+        else:
+            raise ValueError(f"unknown trace source {src!r}")
+
+    def close(self):
+        self.can_tx.shutdown()
+        self.can.close()
+        self.lightning.close()
+
+
+# ---------- Playback ----------
+
+class Replayer:
+    """Plays a trace into ReplaySensors at ``speed``x (None = as fast as possible)."""
+
+    def __init__(self, events, target, speed=1.0, loop=False):
+        self.events = list(events)
+        self.target = target
+        self.speed = speed or None
+        self.loop = loop
+        self.counts = dict.fromkeys(SOURCES, 0)
+        self.max_lag_s = 0.0
+        self.elapsed_s = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def run(self):
+        start = time.perf_counter()
+        offset = 0.0
+        span = self.events[-1]["t"] if self.events else 0.0
+        while not self._stop.is_set():
+            for event in self.events:
+                if self.speed:
+                    due = start + (event["t"] + offset) / self.speed
+                    wait = due - time.perf_counter()
+                    if wait > 0 and self._stop.wait(wait):
+                        break
+                    self.max_lag_s = max(self.max_lag_s, time.perf_counter() - due)
+                elif self._stop.is_set():
+                    break
+                self.target.inject(event)
+                self.counts[event["src"]] += 1
+            if not self.loop:
+                break
+            offset += span
+        self.elapsed_s = time.perf_counter() - start
+        return self.counts
+
+    def start(self):
+        self._thread = threading.Thread(target=self.run, name="replay", daemon=True)
+        self._thread.start()
+        return self
+
+    def wait(self, timeout=None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return not (self._thread and self._thread.is_alive())
+
+    def stop(self):
+        self._stop.set()
+        self.wait(2.0)
+
+    @property
+    def events_per_s(self):
+        total = sum(self.counts.values())
+        return total / self.elapsed_s if self.elapsed_s else 0.0
+
+
+def _parse_args(argv=None):
+    p = argparse.ArgumentParser(description="Replay recorded sensor data through StormPOD")
+    p.add_argument("--trace", help="JSON-lines trace (all sources)")
+    p.add_argument("--can", help="CAN log readable by python-can")
+    p.add_argument("--nmea", help="raw NMEA capture")
+    p.add_argument("--ubx", help="raw UBX capture")
+    p.add_argument("--speed", default="1", help="playback speed factor, or 'max'")
+    p.add_argument("--loop", action="store_true")
+    p.add_argument("--gui", choices=["basic", "enhanced"], help="run a GUI on the replayed data")
+    p.add_argument("--log", default="replay_log.csv", help="where SensorManager logs to")
+    return p.parse_args(argv)
+
+
+def main(argv=None):
+    from .sensor_manager import SensorManager
+
+    args = _parse_args(argv)
+    traces = []
+    if args.trace:
+        traces.append(load_trace(args.trace))
+    if args.can:
+        traces.append(load_can_log(args.can))
+    if args.nmea:
+        traces.append(load_nmea(args.nmea))
+    if args.ubx:
+        traces.append(load_ubx(args.ubx))
+    events = merge(*traces)
+    speed = None if args.speed == "max" else float(args.speed)
+
+    hw = ReplaySensors(gps_protocol="ubx" if args.ubx else "nmea")
+    manager = SensorManager(sensors=hw.sensors, store_path=None, log_path=args.log)
+    replayer = Replayer(events, hw, speed=speed, loop=args.loop).start()
+
+    if args.gui:
+        import tkinter as tk
+        root = tk.Tk()
+        if args.gui == "enhanced":
+            from gui_enhanced import EnhancedStormPODGUI
+            EnhancedStormPODGUI(root, manager=manager)
+        else:
+            from .gui_main import StormPODGUI
+            StormPODGUI(root, manager=manager)
+        root.mainloop()
+    else:
+        manager.start()
+        replayer.wait()
+        time.sleep(0.3)  # let the readers drain what was injected last
+        print(f"replayed {sum(replayer.counts.values())} events in {replayer.elapsed_s:.2f} s "
+              f"({replayer.events_per_s:,.0f} events/s, max lag {replayer.max_lag_s * 1000:.1f} ms)")
+        print(f"  sources: {replayer.counts}")
+        print(f"  can: {hw.can.stats()}")
+        print(f"  gps: {hw.gps.stats()}")
+        print(f"  last sample: {manager.get_latest()}")
+
+    replayer.stop()
+    manager.stop()
+    hw.close()
+
+
+if __name__ == "__main__":
+    main()
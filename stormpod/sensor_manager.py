@@ -1,39 +1,312 @@
-from sensors.sensor_can import CANReceiver
-from sensors.sensor_as3935 import AS3935Sensor
-from sensors.sensor_gps import GPSSensor
-from sensors.sensor_imu import IMUSensor
+from .acquisition import AcquisitionEngine
 from . import logger
+from .binlog import BinaryLogger
+from .derived import Derived
+from .fusion import HeadingFusion
+from .lightning_tracker import StormTracker
+from . import metrics
+from .store import SQLiteStore
+from .supervisor import FAILED, INITIALIZING, READY, RECONNECTING, STALE, SensorSupervisor
+from .timeseries import TimeSeriesStore
+from . import wind
+from .wind_stats import WindStats
+from collections import deque
+import importlib
+import threading
 import time
 
+# How long a lightning/noise event stays visible in the merged snapshot
+EVENT_HOLD_S = 5.0
+# Keys of an AS3935 event batch. The snapshot holds them for EVENT_HOLD_S
+# (for the GUI); the log/store/uplink see each batch once, in the poll
+# that follows it
+EVENT_KEYS = ("events", "strike_count", "noise_count", "disturber_count", "strike_rate_per_min",
+              "event_overflows", "lightning", "distance_km", "timestamp", "noise", "disturber")
+# Event batches kept for the next poll if polling stalls
+MAX_EVENT_BATCHES = 1000
+# Keys kept in the multi-resolution trend history
+HISTORY_KEYS = ("temp_C", "humidity_%", "pressure_hPa", "speed_kph", "true_wind_kph")
+
+POLL_SECONDS = metrics.histogram("stormpod_poll_seconds", "poll_all: merge, log, store and uplink")
+SENSOR_UP = metrics.gauge("stormpod_sensor_up", "1 while the sensor is ready", ["sensor"])
+SENSOR_ERRORS = metrics.counter("stormpod_sensor_errors_total", "Sensor read errors", ["sensor"])
+SENSOR_RECONNECTS = metrics.counter("stormpod_sensor_reconnects_total", "Sensor reopens", ["sensor"])
+SENSOR_AGE = metrics.gauge("stormpod_sensor_age_seconds", "Time since the sensor's last data", ["sensor"])
+
+# name -> (driver module, class, reader interval, ttl, publish_empty, stale_after_s,
+#          reopen_after_s). Order is merge order: later sources win on key clashes.
+# A sensor with no fresh data for stale_after_s shows as stale; after
+# reopen_after_s its device is closed and reopened in the background.
+SENSORS = {
+    "can": (".sensors.sensor_can", "CANReceiver", 0.0, None, True, 2.0, 10.0),
+    "gps": (".sensors.sensor_gps", "GPSSensor", 0.05, None, True, 3.0, 15.0),
+    "lightning": (".sensors.sensor_as3935", "AS3935Sensor", 0.05, EVENT_HOLD_S, False, None, None),
+    "imu": (".sensors.sensor_imu", "IMUSensor", 0.1, None, True, 1.0, 5.0),
+}
+
+
 class SensorManager:
-    def __init__(self):
-        self.can = CANReceiver()
-        self.gps = GPSSensor()
-        self.lightning = AS3935Sensor()
-        self.imu = IMUSensor()
+    def __init__(self, log_interval=1.0, log_format="csv", store_path="stormpod.db", uplink=None,
+                 sensors=None, log_path=None, factories=None, backoff_max=60.0, metrics_port=None):
+        """``sensors`` supplies ready-made sensors (e.g. replay.ReplaySensors)
+        and ``factories`` zero-argument constructors; any other sensor has
+        its driver imported and opened in the background by start(). Sensors
+        from a driver or factory are reopened with backoff (up to
+        ``backoff_max`` seconds) when they fail or go silent.
+        ``metrics_port`` serves metrics.REGISTRY on 127.0.0.1 from start().
+        """
         self.latest = {}
+        self.engine = AcquisitionEngine()
+        self.snapshot = self.engine.snapshot
+        self.factories = dict(factories or {})
+        self.supervisors = {}
+        # IMU yaw blended with GPS course (fed by sensor listeners)
+        self.fusion = HeadingFusion()
+        self._course_epoch = None
+        # Gusts and 2/10 min means, fed from every CAN wind frame
+        self.wind_stats = WindStats()
+        # Storm cells, closing speed and ETA, fed from every lightning strike
+        self.storm = StormTracker()
+        # Lightning event batches not yet logged (appended by the reader, drained by poll_all)
+        self._event_batches = deque(maxlen=MAX_EVENT_BATCHES)
 
-    def poll_all(self):
-        # Pull CAN-sourced sensor data
-        can_data = self.can.read()
+        sensors = sensors or {}
+        for name, (module_name, class_name, interval, ttl, publish_empty,
+                   stale_after_s, reopen_after_s) in SENSORS.items():
+            setattr(self, name, None)
+            supervisor = SensorSupervisor(
+                name, factory=self.factories.get(name), sensor=sensors.get(name),
+                loader=None if name in sensors or name in self.factories
+                else self._loader(module_name, class_name),
+                stale_after_s=stale_after_s, reopen_after_s=reopen_after_s,
+                backoff_max=backoff_max, on_change=self._on_sensor_change)
+            self.supervisors[name] = supervisor
+            self._export_health(name, supervisor)
+            # Readers go through the supervisor, so they exist (and fix the
+            # merge order) before any device is open and never block on one
+            read = self._queue_events(supervisor.read) if name == "lightning" else supervisor.read
+            self.engine.add_reader(name, read, interval=interval, ttl=ttl,
+                                   publish_empty=publish_empty)
+        # Registered last so the fused heading_deg wins; with no estimate it
+        # publishes {} and the raw IMU/GPS heading shows through
+        self.engine.add_reader("heading", self.fusion.read, interval=0.1)
+        self.engine.add_reader("wind_stats", self.wind_stats.read, interval=0.2)
+        self.engine.add_reader("storm", self.storm.read, interval=1.0)
 
-        # Pull local sensors (GPS + Lightning + IMU)
-        gps_data = self.gps.read()
-        lightning_data = self.lightning.read()
-        imu_data = self.imu.read()
+        log_kwargs = {"path": log_path} if log_path else {}
+        if log_format == "binary":
+            self.log_writer = BinaryLogger(**log_kwargs)
+        else:
+            self.log_writer = logger.BufferedLogger(**log_kwargs)
+        # Local SQLite copy of every sample (None disables it)
+        self.store = SQLiteStore(store_path) if store_path else None
+        # Optional uplink.UplinkPublisher fed from every poll
+        self.uplink = uplink
+        # Trend history (raw + 1 s / 1 min / 10 min roll-ups) for the GUI
+        self.history = TimeSeriesStore(HISTORY_KEYS)
+        # Derived values computed from each merged snapshot, in order
+        self.derived = Derived()
+        self.stages = [wind.apply, self.derived.apply]
+        self.metrics_server = metrics.MetricsServer(port=metrics_port) if metrics_port is not None else None
+        self.log_interval = log_interval
+        self._log_stop = threading.Event()
+        self._log_thread = None
+        self._started = False
 
-        # Merge all into one dictionary
-        self.latest = {}
-        self.latest.update(can_data)
-        self.latest.update(gps_data)
-        self.latest.update(lightning_data)
-        self.latest.update(imu_data)
+    # ---------- Sensor start-up and health ----------
+
+    @staticmethod
+    def _loader(module_name, class_name):
+        def load():
+            module = importlib.import_module(module_name, __package__)
+            return getattr(module, class_name)
+        return load
+
+    @staticmethod
+    def _export_health(name, sup):
+        # Read from the supervisor at scrape time; nothing on the hot path
+        SENSOR_UP.labels(sensor=name).set_function(lambda: sup.state == READY)
+        SENSOR_ERRORS.labels(sensor=name).set_function(lambda: sup.errors_total)
+        SENSOR_RECONNECTS.labels(sensor=name).set_function(lambda: sup.reconnects)
+        SENSOR_AGE.labels(sensor=name).set_function(
+            lambda: sup.age_s() if sup.sensor is not None else None)
+
+    def _queue_events(self, read):
+        def read_events():
+            batch = read()
+            if batch:
+                self._event_batches.append(batch)
+            return batch
+        return read_events
+
+    def _drain_events(self):
+        """Every event batch since the last poll, combined into one (or {})."""
+        batches = []
+        while self._event_batches:
+            batches.append(self._event_batches.popleft())
+        if not batches:
+            return {}
+        if len(batches) == 1:
+            return batches[0]
+        out = {"events": [e for b in batches for e in b.get("events", ())]}
+        for key in ("strike_count", "noise_count", "disturber_count"):
+            out[key] = sum(b.get(key, 0) for b in batches)
+        # Running totals / rates: the newest batch has the current value
+        for key in ("event_overflows", "strike_rate_per_min"):
+            out[key] = batches[-1].get(key)
+        strikes = [b for b in batches if b.get("lightning")]
+        last = strikes[-1] if strikes else batches[-1]
+        out.update({k: last[k] for k in ("lightning", "distance_km", "timestamp", "noise", "disturber")
+                    if k in last})
+        return out
+
+    def _on_sensor_change(self, name, sensor):
+        setattr(self, name, sensor)
+        listeners = getattr(sensor, "listeners", None)
+        if listeners is None:
+            return
+        if name == "imu":
+            listeners.append(self.fusion.update_imu)
+        elif name == "gps":
+            listeners.append(self._gps_course)
+        elif name == "can":
+            listeners.append(self._wind_frame)
+        elif name == "lightning":
+            listeners.append(self._strike)
+
+    def _gps_course(self, latest):
+        # One measurement per epoch with a fix. GGA/GSA-only chunks, the VTG
+        # repeating its epoch's RMC and a course left over from before the
+        # fix was lost all reach listeners too; the filter must not count them.
+        epoch = latest.get("fix_epoch")
+        if not latest.get("fix") or epoch is None or epoch == self._course_epoch:
+            return
+        self._course_epoch = epoch
+        self.fusion.update_gps(latest.get("heading_deg"), latest.get("ground_speed_kph"))
+
+    def _wind_frame(self, values):
+        # True wind only. Without a fix a parked truck and a moving one look
+        # the same to the vane (see wind.py), so the frame is left out of the
+        # gust and means rather than counting the truck's own speed as wind
+        apparent = values.get(wind.APPARENT_SPEED)
+        if apparent is None:
+            return
+        gps = self.gps
+        ground = gps.latest.get(wind.GROUND_SPEED) if gps is not None and gps.latest.get("fix") else None
+        if ground is None:
+            return
+        heading, _ = self.fusion.heading()
+        speed, direction = wind.true_wind(apparent, values.get(wind.APPARENT_ANGLE), ground, heading)
+        if speed is not None:
+            self.wind_stats.update(speed, direction)
 
+    def _strike(self, event):
+        # Tag the strike with where the truck was, if GPS has a fix
+        gps = self.gps
+        fix = gps.latest if gps is not None and gps.latest.get("fix") else {}
+        self.storm.add_strike(event.get("distance_km"), event.get("timestamp"),
+                              fix.get("lat"), fix.get("lon"))
+
+    @property
+    def status(self):
+        """Per-sensor health: state, error, reconnects, data age and timings."""
+        return {name: sup.report() for name, sup in self.supervisors.items()}
+
+    def sensor_state(self, name):
+        return self.supervisors[name].state
+
+    def init_report(self):
+        """Per-sensor state and import/init timings."""
+        return self.status
+
+    def wait_ready(self, timeout=None):
+        """Block until every sensor has had its first open attempt. Returns True if all are ready."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for sup in self.supervisors.values():
+            sup.wait_first_attempt(None if deadline is None else max(0.0, deadline - time.monotonic()))
+        return all(sup.state == READY for sup in self.supervisors.values())
+
+    def start(self):
+        """Start the readers, open pending sensors in parallel and start logging.
+
+        Returns immediately; each supervisor opens its sensor on its own
+        thread and keeps reopening it if it fails (see ``status``). Calling
+        it again does nothing, so a GUI can start a manager it was given.
+        """
+        if self._started:
+            return
+        self._started = True
+        self.engine.start()
+        for sup in self.supervisors.values():
+            sup.start()
+        if self.metrics_server is not None:
+            try:
+                self.metrics_server.start()
+                print(f"📈 Metrics on {self.metrics_server.url}")
+            except OSError as e:
+                print(f"⚠️ Metrics endpoint unavailable: {e}")
+        if self.uplink is not None:
+            self.uplink.start()
+        if self._log_thread is None:
+            self._log_thread = threading.Thread(target=self._log_loop, name="sensor-log", daemon=True)
+            self._log_thread.start()
+
+    def stop(self):
+        self._log_stop.set()
+        # Readers first, so nothing is mid-read when the devices close
+        self.engine.stop()
+        for sup in self.supervisors.values():
+            sup.stop(close=True)
+        if self._log_thread is not None:
+            self._log_thread.join(1.0)
+            self._log_thread = None
+        self.log_writer.close()
+        if self.uplink is not None:
+            self.uplink.stop()
+        if self.store is not None:
+            self.store.close()
+        if self.metrics_server is not None:
+            self.metrics_server.stop()
+
+    def _log_loop(self):
+        while not self._log_stop.wait(self.log_interval):
+            try:
+                self.poll_all()
+            except Exception as e:
+                print(f"⚠️ Log error: {e}")
+
+    def _merge(self):
+        data = self.snapshot.merged()
         # Timestamp (UTC HHMMSS) – GPS if available, else system time
-        self.latest["time_utc"] = gps_data.get("time_utc") or time.strftime("%H%M%S", time.gmtime())
+        data["time_utc"] = data.get("time_utc") or time.strftime("%H%M%S", time.gmtime())
+        for stage in self.stages:
+            stage(data)
+        return data
+
+    def poll_all(self):
+        """Take a snapshot of every sensor, log it and buffer it for uplink.
+
+        Lightning/noise events are logged once, in the first poll after
+        they arrive, however long the snapshot holds them for the GUI.
 
-        # Log it
-        logger.log(self.latest)
+        Runs on the logging thread; the sensors themselves are read by the
+        acquisition engine, so this never blocks on sensor I/O.
+        """
+        start = time.perf_counter()
+        sample = self._merge()
+        # The held events were logged by an earlier poll; log only new ones
+        for key in EVENT_KEYS:
+            sample.pop(key, None)
+        sample.update(self._drain_events())
+        self.latest = sample
+        self.history.append(self.latest)
+        self.log_writer.log(self.latest)
+        if self.store is not None:
+            self.store.append(self.latest)
+        if self.uplink is not None:
+            self.uplink.submit(self.latest)
+        POLL_SECONDS.observe(time.perf_counter() - start)
 
     def get_latest(self):
-        return self.latest
+        """Current merged snapshot. Safe to call from the GUI thread."""
+        return self._merge()
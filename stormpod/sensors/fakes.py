@@ -0,0 +1,151 @@
+"""
+Hardware stand-ins
+------------------
+Minimal fakes for the SPI, GPIO, serial and BNO08x interfaces the sensor
+drivers use, so the real driver code can run on a laptop (tests,
+benchmarks, replay).
+"""
+
+import math
+import threading
+
+
+class FakeSPI:
+    """spidev.SpiDev look-alike backed by an AS3935 register file."""
+
+    def __init__(self):
+        self.registers = [0] * 0x40
+        self.max_speed_hz = 0
+        self.mode = 0
+        self.transfers = 0
+        self.closed = False
+        self._lock = threading.Lock()
+
+    def open(self, bus, device):
+        self.bus, self.device = bus, device
+
+    def xfer2(self, data):
+        # AS3935 framing: 0b01xxxxxx = read register, 0b00xxxxxx = write
+        with self._lock:
+            self.transfers += 1
+            cmd, value = data[0], data[1]
+            reg = cmd & 0x3F
+            if cmd & 0xC0 == 0x40:
+                return [0, self.registers[reg]]
+            self.registers[reg] = value
+            return [0, 0]
+
+    def set_event(self, irq_src, distance_km=0):
+        """Load the interrupt and distance registers for the next IRQ."""
+        with self._lock:
+            self.registers[0x03] = irq_src & 0x0F
+            self.registers[0x07] = distance_km & 0x3F
+
+    def close(self):
+        self.closed = True
+
+
+class FakeGPIO:
+    """RPi.GPIO module look-alike. ``trigger(pin)`` fires edge callbacks."""
+
+    BCM = 11
+    BOARD = 10
+    IN = 1
+    OUT = 0
+    PUD_UP = 22
+    PUD_DOWN = 21
+    FALLING = 32
+    RISING = 31
+
+    def __init__(self):
+        self._mode = None
+        self.callbacks = {}
+
+    def setwarnings(self, flag):
+        pass
+
+    def getmode(self):
+        return self._mode
+
+    def setmode(self, mode):
+        self._mode = mode
+
+    def setup(self, pin, direction, pull_up_down=None):
+        pass
+
+    def add_event_detect(self, pin, edge, callback=None, bouncetime=None):
+        if pin in self.callbacks:
+            raise RuntimeError("Conflicting edge detection already enabled for this GPIO channel")
+        self.callbacks[pin] = callback
+
+    def remove_event_detect(self, pin):
+        self.callbacks.pop(pin, None)
+
+    def cleanup(self, pin=None):
+        if pin is None:
+            self.callbacks.clear()
+        else:
+            self.callbacks.pop(pin, None)
+
+    def trigger(self, pin):
+        callback = self.callbacks.get(pin)
+        if callback is not None:
+            callback(pin)
+
+
+class FakeSerial:
+    """pyserial look-alike: bytes pushed with ``feed()`` come out of ``read()``."""
+
+    def __init__(self):
+        self._buf = bytearray()
+        self._lock = threading.Lock()
+        self.written = bytearray()
+
+    def feed(self, data):
+        with self._lock:
+            self._buf += data
+
+    @property
+    def in_waiting(self):
+        return len(self._buf)
+
+    def read(self, size=1):
+        with self._lock:
+            data = bytes(self._buf[:size])
+            del self._buf[:size]
+        return data
+
+    def write(self, data):
+        self.written += data
+        return len(data)
+
+    def close(self):
+        pass
+
+
+def quat_from_yaw(yaw_deg):
+    """(w, x, y, z) for a level sensor pointing ``yaw_deg``."""
+    half = math.radians(yaw_deg) / 2
+    return (math.cos(half), 0.0, 0.0, math.sin(half))
+
+
+class FakeBNO:
+    """adafruit_bno08x look-alike exposing ``rotation_vector``.
+
+    Like the real driver, ``rotation_vector`` is (i, j, k, real);
+    set_quaternion takes (w, x, y, z) as quat_from_yaw returns it.
+    """
+
+    def __init__(self):
+        self.enabled = {}
+        self._quat = None
+
+    def enable_feature(self, feature, report_interval=None):
+        self.enabled[feature] = report_interval
+
+    def set_quaternion(self, w, x, y, z):
+        self._quat = (x, y, z, w)
+
+    @property
+    def rotation_vector(self):
+        return self._quat
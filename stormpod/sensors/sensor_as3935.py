@@ -1,8 +1,53 @@
 # Use the improved AS3935 driver - we'll copy it locally
-import spidev
-import RPi.GPIO as GPIO
+import collections
+import threading
 import time
 
+from .. import metrics
+
+try:
+    import spidev
+    import RPi.GPIO as GPIO
+except ImportError:  # off the Pi: pass spi=/gpio= (see sensors.fakes)
+    spidev = None
+    GPIO = None
+
+EVENTS = metrics.counter("stormpod_lightning_events_total", "AS3935 interrupts read, by type",
+                         ["type"])
+_EVENT_COUNTERS = {t: EVENTS.labels(type=t) for t in ("Lightning", "Noise", "Disturber", "Unknown")}
+
+class EventRing:
+    """Bounded, thread-safe FIFO between the GPIO callback thread and readers.
+
+    When full, the oldest event is discarded and ``overflows`` counts it.
+    """
+
+    def __init__(self, capacity=256):
+        self._events = collections.deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self.pushed = 0
+        self.overflows = 0
+
+    def push(self, event):
+        with self._lock:
+            if len(self._events) == self._events.maxlen:
+                self.overflows += 1
+            self._events.append(event)
+            self.pushed += 1
+
+    def pop(self):
+        with self._lock:
+            return self._events.popleft() if self._events else None
+
+    def drain(self):
+        with self._lock:
+            events = list(self._events)
+            self._events.clear()
+        return events
+
+    def __len__(self):
+        return len(self._events)
+
 class AS3935:
     IRQ_NOISE = 0x01
     IRQ_DISTURBER = 0x04
@@ -15,33 +60,38 @@ class AS3935:
         "spike_rejection": 2
     }
 
-    def __init__(self, spi_bus=0, spi_device=0, irq_pin=17, config=None):
+    def __init__(self, spi_bus=0, spi_device=0, irq_pin=17, config=None,
+                 spi=None, gpio=None, buffer_size=256):
         self.irq_pin = irq_pin
         self.config = dict(self.DEFAULT_CONFIG)
         if config:
             self.config.update(config)
 
+        if (spi is None and spidev is None) or (gpio is None and GPIO is None):
+            raise ImportError("AS3935 needs spidev and RPi.GPIO (or pass spi=/gpio=)")
+
         # SPI setup
-        self.spi = spidev.SpiDev()
+        self.spi = spi if spi is not None else spidev.SpiDev()
         self.spi.open(spi_bus, spi_device)
         self.spi.max_speed_hz = 500000
         self.spi.mode = 0b01
 
-        GPIO.setwarnings(False)
-        if GPIO.getmode() is None:
-            GPIO.setmode(GPIO.BCM)
-        GPIO.setup(self.irq_pin, GPIO.IN, pull_up_down=GPIO.PUD_UP)
+        self.gpio = gpio if gpio is not None else GPIO
+        self.gpio.setwarnings(False)
+        if self.gpio.getmode() is None:
+            self.gpio.setmode(self.gpio.BCM)
+        self.gpio.setup(self.irq_pin, self.gpio.IN, pull_up_down=self.gpio.PUD_UP)
 
-        self.latest_event = None
+        self.events = EventRing(buffer_size)
         self._init_sensor()
 
         # IRQ setup
-        try: 
-            GPIO.remove_event_detect(self.irq_pin)
-        except: 
+        try:
+            self.gpio.remove_event_detect(self.irq_pin)
+        except:
             pass
-        GPIO.add_event_detect(self.irq_pin, GPIO.FALLING,
-                              callback=self._irq_callback, bouncetime=2)
+        self.gpio.add_event_detect(self.irq_pin, self.gpio.FALLING,
+                                   callback=self._irq_callback, bouncetime=2)
 
     def _write_register(self, reg, value):
         cmd = 0x00 | (reg & 0x3F)
@@ -76,34 +126,42 @@ class AS3935:
         self._write_register(0x08, 0x00)
 
     def _irq_callback(self, channel):
+        # Runs on the RPi.GPIO callback thread
         irq_src = self._read_register(0x03) & 0x0F
         timestamp = time.time()
 
         if irq_src == self.IRQ_LIGHTNING:
             dist = self._read_register(0x07) & 0x3F
-            self.latest_event = {
+            event = {
                 "type": "Lightning",
                 "distance_km": dist,
                 "timestamp": timestamp
             }
         elif irq_src == self.IRQ_NOISE:
-            self.latest_event = {"type": "Noise", "timestamp": timestamp}
+            event = {"type": "Noise", "timestamp": timestamp}
         elif irq_src == self.IRQ_DISTURBER:
-            self.latest_event = {"type": "Disturber", "timestamp": timestamp}
+            event = {"type": "Disturber", "timestamp": timestamp}
         else:
-            self.latest_event = {"type": "Unknown", "timestamp": timestamp}
+            event = {"type": "Unknown", "timestamp": timestamp}
+        self.events.push(event)
 
     def read_event(self):
-        evt = self.latest_event
-        self.latest_event = None
-        return evt
+        """Oldest unread event, or None."""
+        return self.events.pop()
+
+    def read_events(self):
+        """Every unread event, oldest first."""
+        return self.events.drain()
 
     def close(self):
-        GPIO.cleanup(self.irq_pin)
+        self.gpio.cleanup(self.irq_pin)
         self.spi.close()
 
 class AS3935Sensor:
-    def __init__(self, spi_bus=0, spi_device=0, irq_pin=23, mode="outdoor"):
+    RATE_WINDOW_S = 60.0
+
+    def __init__(self, spi_bus=0, spi_device=0, irq_pin=23, mode="outdoor",
+                 spi=None, gpio=None):
         # Use the improved driver with configuration
         config = {
             "mode": mode,
@@ -111,29 +169,83 @@ class AS3935Sensor:
             "watchdog": 2,
             "spike_rejection": 2
         }
-        self.as3935 = AS3935(spi_bus=spi_bus, spi_device=spi_device, 
-                           irq_pin=irq_pin, config=config)
+        self.as3935 = AS3935(spi_bus=spi_bus, spi_device=spi_device,
+                           irq_pin=irq_pin, config=config, spi=spi, gpio=gpio)
+        self._strike_times = collections.deque()
+        # Called with each lightning event as it is read (e.g. the storm tracker)
+        self.listeners = []
 
     def read(self):
-        """Read the latest lightning event and return in expected format"""
-        event = self.as3935.read_event()
-        if event is None:
+        """Every event since the last call, summarised for the GUI.
+
+        Returns {} when nothing happened. Otherwise the newest strike (or
+        the newest noise/disturber event) sets the legacy keys, and
+        ``events``/``*_count``/``strike_rate_per_min`` cover the whole batch.
+        """
+        return self._summarise(self.as3935.read_events(), self.as3935.events.overflows)
+
+    def _summarise(self, events, overflows):
+        if not events:
             return {}
-        
+
+        counts = {"Lightning": 0, "Noise": 0, "Disturber": 0, "Unknown": 0}
+        for event in events:
+            counts[event.get("type", "Unknown")] += 1
+            if event.get("type") == "Lightning":
+                self._strike_times.append(event["timestamp"])
+                for listener in self.listeners:
+                    listener(event)
+
+        for kind, n in counts.items():
+            if n:
+                _EVENT_COUNTERS[kind].inc(n)
+
+        now = time.time()
+        while self._strike_times and now - self._strike_times[0] > self.RATE_WINDOW_S:
+            self._strike_times.popleft()
+
+        result = {
+            "events": events,
+            "strike_count": counts["Lightning"],
+            "noise_count": counts["Noise"],
+            "disturber_count": counts["Disturber"],
+            "strike_rate_per_min": len(self._strike_times) * 60.0 / self.RATE_WINDOW_S,
+            "event_overflows": overflows,
+        }
+
         # Convert to the format expected by the GUI
-        if event.get("type") == "Lightning":
-            return {
-                "lightning": True, 
-                "distance_km": event.get("distance_km", 0),
-                "timestamp": event.get("timestamp")
-            }
-        elif event.get("type") == "Noise":
-            return {"noise": True, "timestamp": event.get("timestamp")}
-        elif event.get("type") == "Disturber":
-            return {"disturber": True, "timestamp": event.get("timestamp")}
-        else:
-            return {}
-    
+        strikes = [e for e in events if e.get("type") == "Lightning"]
+        if strikes:
+            result.update({
+                "lightning": True,
+                "distance_km": strikes[-1].get("distance_km", 0),
+                "timestamp": strikes[-1].get("timestamp")
+            })
+        elif events[-1].get("type") == "Noise":
+            result.update({"noise": True, "timestamp": events[-1].get("timestamp")})
+        elif events[-1].get("type") == "Disturber":
+            result.update({"disturber": True, "timestamp": events[-1].get("timestamp")})
+        return result
+
     def close(self):
         """Clean shutdown"""
         self.as3935.close()
+
+class AS3935RemoteSensor(AS3935Sensor):
+    """Same output as AS3935Sensor, fed by the irq_listener service socket.
+
+    Use this when stormpod-irq.service owns the SPI bus and IRQ pin.
+    Events lost to a full publisher history show up in ``event_overflows``.
+    """
+
+    def __init__(self, socket_path=None, since=None):
+        from ..ipc import EventSubscriber, SOCKET_PATH
+        self.subscriber = EventSubscriber(socket_path or SOCKET_PATH, since=since)
+        self._strike_times = collections.deque()
+        self.listeners = []
+
+    def read(self):
+        return self._summarise(self.subscriber.drain(), self.subscriber.lost)
+
+    def close(self):
+        self.subscriber.close()
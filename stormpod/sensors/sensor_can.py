@@ -1,57 +1,89 @@
 import can
+import time
+
+from .. import metrics
+from ..can_frames import load_registry
+
+FRAMES = metrics.counter("stormpod_can_frames_total", "CAN frames received")
+UNDECODED = metrics.counter("stormpod_can_undecoded_total", "CAN frames with an unknown ID or length")
+BACKLOG = metrics.gauge("stormpod_can_backlog", "CAN frames queued at the last drain")
 
 class CANReceiver:
-    def __init__(self, channel='can0', bitrate=500000):
-        self.bus = can.interface.Bus(channel=channel, bustype='socketcan')
-        self.latest = {
-            "temp_C": None,
-            "humidity_%": None,
-            "pressure_hPa": None,
-            "angle_deg": None,
-            "wind_raw": None,
-            "wind_volts": None,
-            "speed_kph": None
-        }
+    def __init__(self, channel='can0', bitrate=500000, interface='socketcan', registry=None):
+        # Frame layouts come from can_frames.yaml: 0x10 BME280 (2 Hz), 0x11 wind (5 Hz)
+        self.registry = registry or load_registry()
+
+        # Kernel-level acceptance filters: only schema IDs wake us up
+        filters = [{"can_id": can_id, "can_mask": 0x7FF, "extended": False}
+                   for can_id in self.registry.can_ids]
+        self.bus = can.interface.Bus(channel=channel, interface=interface, can_filters=filters)
+
+        # The Notifier thread pulls frames off the socket as they arrive;
+        # update() drains everything it queued since the last call.
+        self.reader = can.BufferedReader()
+        self.notifier = can.Notifier(self.bus, [self.reader], timeout=0.1)
+
+        self.latest = {key: None for key in self.registry.keys()}
+        # Called with each decoded frame's values, on the reader thread
+        self.listeners = []
+
+        # Reception stats
+        self.frames_total = 0
+        self.frames_per_s = 0.0
+        self.backlog = 0
+        # monotonic time of the last decoded frame (for staleness checks)
+        self.last_update = None
+        self._rate_count = 0
+        self._rate_start = time.monotonic()
 
-    def update(self):
-        msg = self.bus.recv(timeout=0.1)
-        if msg is None:
-            return
-
-        if msg.arbitration_id == 0x10 and msg.dlc == 6:
-            t = (msg.data[0] << 8) | msg.data[1]
-            h = (msg.data[2] << 8) | msg.data[3]
-            p = (msg.data[4] << 8) | msg.data[5]
-            self.latest.update({
-                "temp_C": t / 10.0,
-                "humidity_%": h / 10.0,
-                "pressure_hPa": p / 10.0
-            })
-
-        elif msg.arbitration_id == 0x11 and msg.dlc == 4:
-            angle_raw = (msg.data[0] << 8) | msg.data[1]
-            wind_raw = (msg.data[2] << 8) | msg.data[3]
-            volts = (wind_raw / 1023.0) * 3.3
-            volts = min(volts, 2.2)
-
-            ZERO_WIND_VOLTAGE = 0.4
-            MAX_SENSOR_VOLTAGE = 2.0
-            MAX_WIND_KPH = 116.6
-
-            if volts <= ZERO_WIND_VOLTAGE:
-                wind_kph = 0.0
-            else:
-                adjusted = volts - ZERO_WIND_VOLTAGE
-                scale = MAX_WIND_KPH / (MAX_SENSOR_VOLTAGE - ZERO_WIND_VOLTAGE)
-                wind_kph = round(adjusted * scale, 1)
-
-            self.latest.update({
-                "angle_deg": angle_raw / 10.0,
-                "wind_raw": wind_raw,
-                "wind_volts": round(volts, 3),
-                "speed_kph": wind_kph
-            })
+    def _handle(self, msg):
+        values = self.registry.decode(msg.arbitration_id, msg.data)
+        if values is not None:
+            self.latest.update(values)
+            for listener in self.listeners:
+                listener(values)
+        else:
+            UNDECODED.inc()
+
+    def update(self, timeout=0.1):
+        """Decode every pending frame. Returns the number handled.
+
+        Waits up to ``timeout`` for the first frame, then drains the rest
+        of the queue without blocking so readings never lag behind the bus.
+        """
+        self.backlog = self.reader.buffer.qsize()
+        msg = self.reader.get_message(timeout=timeout)
+        handled = 0
+        while msg is not None:
+            self._handle(msg)
+            handled += 1
+            msg = self.reader.get_message(timeout=0)
+
+        self.frames_total += handled
+        FRAMES.inc(handled)
+        BACKLOG.set(self.backlog)
+        self._rate_count += handled
+        now = time.monotonic()
+        if handled:
+            self.last_update = now
+        elapsed = now - self._rate_start
+        if elapsed >= 1.0:
+            self.frames_per_s = self._rate_count / elapsed
+            self._rate_count = 0
+            self._rate_start = now
+        return handled
+
+    def stats(self):
+        return {
+            "frames_total": self.frames_total,
+            "frames_per_s": round(self.frames_per_s, 1),
+            "backlog": self.backlog,
+        }
 
     def read(self):
         self.update()
         return self.latest
+
+    def close(self):
+        self.notifier.stop()
+        self.bus.shutdown()
@@ -1,17 +1,103 @@
 import serial
+import struct
 import time
 
+from .. import metrics
+
+KNOTS_TO_KPH = 1.852
+
+SENTENCES = metrics.counter("stormpod_gps_messages_total", "GPS sentences/UBX messages applied")
+BYTES = metrics.counter("stormpod_gps_bytes_total", "Bytes read from the GPS UART")
+ERRORS = metrics.counter("stormpod_gps_errors_total", "Corrupt GPS messages", ["kind"])
+CHECKSUM_ERRORS = ERRORS.labels(kind="checksum")
+PARSE_ERRORS = ERRORS.labels(kind="parse")
+MAX_LINE = 256  # NMEA caps sentences at 82 chars; anything longer is noise
+
+# ---------- UBX (u-blox binary) ----------
+UBX_SYNC = b"\xb5\x62"
+UBX_MAX_PAYLOAD = 1024
+UBX_NAV_PVT = (0x01, 0x07)
+UBX_CFG_VALSET = (0x06, 0x8A)
+
+# M9N configuration keys (u-blox M9 interface description)
+CFG_RATE_MEAS = (0x30210001, "<H")                 # measurement period, ms
+CFG_MSGOUT_UBX_NAV_PVT_UART1 = (0x20910007, "<B")  # NAV-PVT every N epochs
+CFG_UART1OUTPROT_UBX = (0x10740001, "<B")
+CFG_UART1OUTPROT_NMEA = (0x10740002, "<B")
+
+# UBX-NAV-PVT payload (92 bytes)
+NAV_PVT = struct.Struct("<IHBBBBBBIiBBBBiiiiIIiiiiiIIHH4xihH")
+
+def nmea_checksum(body):
+    """XOR of every character between '$' and '*'."""
+    cs = 0
+    for ch in body.encode("ascii", errors="ignore"):
+        cs ^= ch
+    return cs
+
+def ubx_checksum(data):
+    """8-bit Fletcher checksum over class, id, length and payload."""
+    ck_a = ck_b = 0
+    for b in data:
+        ck_a = (ck_a + b) & 0xFF
+        ck_b = (ck_b + ck_a) & 0xFF
+    return ck_a, ck_b
+
+def ubx_frame(msg_class, msg_id, payload=b""):
+    body = struct.pack("<BBH", msg_class, msg_id, len(payload)) + payload
+    return UBX_SYNC + body + bytes(ubx_checksum(body))
+
+def ubx_valset(items, layers=0x01):
+    """CFG-VALSET frame for ``[(key, fmt), value]`` pairs (layer 1 = RAM)."""
+    payload = struct.pack("<BBxx", 0, layers)
+    for (key, fmt), value in items:
+        payload += struct.pack("<I", key) + struct.pack(fmt, value)
+    return ubx_frame(*UBX_CFG_VALSET, payload)
+
 class GPSSensor:
-    def __init__(self, port="/dev/serial0", baud=38400):
-        self.ser = serial.Serial(port, baud, timeout=1)
+    def __init__(self, port="/dev/serial0", baud=38400, ser=None, protocol="nmea", rate_hz=10):
+        self.ser = ser if ser is not None else serial.Serial(port, baud, timeout=1)
+        if protocol not in ("nmea", "ubx"):
+            raise ValueError(f"protocol must be 'nmea' or 'ubx', got {protocol!r}")
+        self.protocol = protocol
         self.latest = {
             "lat": None,
             "lon": None,
             "fix": False,
-            "speed_kph": 0.0,
+            "ground_speed_kph": None,
             "time_utc": None
         }
-    
+        self._buf = bytearray()
+        self.counters = {
+            "bytes": 0,
+            "sentences": 0,
+            "checksum_errors": 0,
+            "parse_errors": 0,
+            "ignored": 0,
+            "overruns": 0,
+        }
+        self.sentences_per_s = 0.0
+        # monotonic time of the last applied message (for staleness checks)
+        self.last_update = None
+        # Called with ``latest`` after every feed that applied a message.
+        # ``fix_epoch`` (RMC time or NAV-PVT iTOW) names the navigation epoch
+        # the course/speed came from, so listeners can take each epoch once.
+        self.listeners = []
+        self._rate_count = 0
+        self._rate_start = time.monotonic()
+
+        if protocol == "ubx" and ser is None:
+            self.configure_ubx(rate_hz)
+
+    def configure_ubx(self, rate_hz=10):
+        """Switch UART1 to NAV-PVT only at ``rate_hz`` (RAM layer, lost on power cycle)."""
+        self.ser.write(ubx_valset([
+            (CFG_RATE_MEAS, int(round(1000 / rate_hz))),
+            (CFG_MSGOUT_UBX_NAV_PVT_UART1, 1),
+            (CFG_UART1OUTPROT_UBX, 1),
+            (CFG_UART1OUTPROT_NMEA, 0),
+        ]))
+
     def _parse_latlon(self, raw, direction):
         if not raw or raw == "0":
             return None
@@ -22,22 +108,218 @@ class GPSSensor:
         return coord if direction in ["N", "E"] else -coord
 
     def _parse_line(self, line):
-        if line.startswith("$GPRMC") or line.startswith("$GNRMC"):
-            parts = line.split(",")
-            if parts[2] == "A":
-                self.latest["fix"] = True
-                self.latest["lat"] = self._parse_latlon(parts[3], parts[4])
-                self.latest["lon"] = self._parse_latlon(parts[5], parts[6])
-                self.latest["speed_kph"] = round(float(parts[7]) * 1.852, 2)
-                self.latest["time_utc"] = parts[1][:6]
-                try:
-                    heading = float(parts[8])
-                    self.latest["heading_deg"] = heading
-                except:
-                    self.latest["heading_deg"] = None
+        """Parse one NMEA sentence into ``self.latest``.
+
+        Returns True when the sentence was applied, False when it was
+        corrupt (bad checksum or fields) and None for sentence types we
+        do not use.
+        """
+        if not line.startswith("$"):
+            return None
+        if not self._checksum_ok(line):
+            return False
+        body = line[1:line.rfind("*")]
+
+        parts = body.split(",")
+        handler = self._HANDLERS.get(parts[0][2:])
+        if handler is None:
+            return None
+        try:
+            handler(self, parts)
+        except (ValueError, IndexError):
+            return False
+        return True
+
+    def _parse_rmc(self, parts):
+        if parts[2] == "A":
+            self.latest["fix"] = True
+            self.latest["lat"] = self._parse_latlon(parts[3], parts[4])
+            self.latest["lon"] = self._parse_latlon(parts[5], parts[6])
+            self.latest["ground_speed_kph"] = round(float(parts[7]) * KNOTS_TO_KPH, 2)
+            self.latest["time_utc"] = parts[1][:6]
+            self.latest["fix_epoch"] = parts[1]
+            try:
+                heading = float(parts[8])
+                self.latest["heading_deg"] = heading
+            except ValueError:
+                self.latest["heading_deg"] = None
+        else:
+            self._lost_fix()
+
+    def _lost_fix(self):
+        # Speed and course describe the last fix, not the truck now
+        self.latest["fix"] = False
+        self.latest["ground_speed_kph"] = None
+        self.latest["heading_deg"] = None
+
+    def _parse_gga(self, parts):
+        quality = int(parts[6] or 0)
+        self.latest["fix_quality"] = quality
+        self.latest["sats"] = int(parts[7]) if parts[7] else None
+        self.latest["hdop"] = float(parts[8]) if parts[8] else None
+        if quality > 0:
+            self.latest["lat"] = self._parse_latlon(parts[2], parts[3])
+            self.latest["lon"] = self._parse_latlon(parts[4], parts[5])
+            self.latest["gps_alt_m"] = float(parts[9]) if parts[9] else None
+
+    def _parse_vtg(self, parts):
+        if parts[1]:
+            self.latest["heading_deg"] = float(parts[1])
+        if parts[7]:
+            self.latest["ground_speed_kph"] = round(float(parts[7]), 2)
+
+    def _parse_gsa(self, parts):
+        self.latest["fix_mode"] = int(parts[2] or 1)
+        self.latest["pdop"] = float(parts[15]) if parts[15] else None
+        self.latest["hdop"] = float(parts[16]) if parts[16] else None
+        self.latest["vdop"] = float(parts[17]) if parts[17] else None
+
+    _HANDLERS = {
+        "RMC": _parse_rmc,
+        "GGA": _parse_gga,
+        "VTG": _parse_vtg,
+        "GSA": _parse_gsa,
+    }
+
+    def feed(self, data):
+        """Push raw serial bytes through the parser. Returns messages applied."""
+        self.counters["bytes"] += len(data)
+        BYTES.inc(len(data))
+        self._buf += data
+        if self.protocol == "ubx":
+            applied = self._feed_ubx()
+        else:
+            applied = self._feed_nmea()
+
+        self.counters["sentences"] += applied
+        SENTENCES.inc(applied)
+        self._rate_count += applied
+        now = time.monotonic()
+        if applied:
+            self.last_update = now
+            for listener in self.listeners:
+                listener(self.latest)
+        elapsed = now - self._rate_start
+        if elapsed >= 1.0:
+            self.sentences_per_s = self._rate_count / elapsed
+            self._rate_count = 0
+            self._rate_start = now
+        return applied
+
+    def _feed_nmea(self):
+        applied = 0
+        start = 0
+        while True:
+            end = self._buf.find(b"\n", start)
+            if end == -1:
+                break
+            line = self._buf[start:end].decode("ascii", errors="ignore").strip()
+            start = end + 1
+            if not line:
+                continue
+            result = self._parse_line(line)
+            if result:
+                applied += 1
+            elif result is None:
+                self.counters["ignored"] += 1
+            elif self._checksum_ok(line):
+                self.counters["parse_errors"] += 1
+                PARSE_ERRORS.inc()
+            else:
+                self.counters["checksum_errors"] += 1
+                CHECKSUM_ERRORS.inc()
+        del self._buf[:start]
+        if len(self._buf) > MAX_LINE:
+            self.counters["overruns"] += 1
+            self._buf.clear()
+        return applied
+
+    def _feed_ubx(self):
+        buf = self._buf
+        applied = 0
+        pos = 0
+        while True:
+            sync = buf.find(UBX_SYNC, pos)
+            if sync == -1:
+                # Keep a trailing 0xB5 in case the 0x62 is still on the wire
+                pos = len(buf) - 1 if buf.endswith(UBX_SYNC[:1]) else len(buf)
+                break
+            if sync > pos:
+                self.counters["ignored"] += 1  # NMEA or junk between frames
+            pos = sync
+            if len(buf) - pos < 6:
+                break
+            msg_class, msg_id, length = struct.unpack_from("<BBH", buf, pos + 2)
+            if length > UBX_MAX_PAYLOAD:
+                self.counters["parse_errors"] += 1
+                PARSE_ERRORS.inc()
+                pos += 2
+                continue
+            end = pos + 8 + length
+            if len(buf) < end:
+                break
+            if bytes(ubx_checksum(buf[pos + 2:end - 2])) != buf[end - 2:end]:
+                self.counters["checksum_errors"] += 1
+                CHECKSUM_ERRORS.inc()
+                pos += 2
+                continue
+            if (msg_class, msg_id) == UBX_NAV_PVT and length == NAV_PVT.size:
+                self._parse_nav_pvt(buf, pos + 6)
+                applied += 1
+            else:
+                self.counters["ignored"] += 1
+            pos = end
+        del buf[:pos]
+        return applied
+
+    def _parse_nav_pvt(self, buf, offset):
+        (itow, _year, _month, _day, hour, minute, sec, _valid, _tacc, _nano,
+         fix_type, flags, _flags2, num_sv, lon, lat, _height, h_msl, h_acc, v_acc,
+         _vel_n, _vel_e, _vel_d, g_speed, head_mot, s_acc, head_acc, p_dop, _flags3,
+         _head_veh, _mag_dec, _mag_acc) = NAV_PVT.unpack_from(buf, offset)
+
+        fix = bool(flags & 0x01) and fix_type in (2, 3, 4)
+        latest = self.latest
+        latest["fix"] = fix
+        latest["sats"] = num_sv
+        latest["fix_mode"] = min(fix_type, 3) or 1
+        latest["pdop"] = p_dop * 0.01
+        latest["time_utc"] = f"{hour:02d}{minute:02d}{sec:02d}"
+        if fix:
+            latest["fix_epoch"] = itow
+            latest["lat"] = lat * 1e-7
+            latest["lon"] = lon * 1e-7
+            latest["gps_alt_m"] = h_msl / 1000.0
+            latest["ground_speed_kph"] = round(g_speed * 0.0036, 2)
+            latest["heading_deg"] = round(head_mot * 1e-5, 2)
+            latest["h_acc_m"] = h_acc / 1000.0
+            latest["v_acc_m"] = v_acc / 1000.0
+            latest["speed_acc_kph"] = round(s_acc * 0.0036, 2)
+            latest["heading_acc_deg"] = round(head_acc * 1e-5, 2)
+        else:
+            self._lost_fix()
+
+    @staticmethod
+    def _checksum_ok(line):
+        # The NEO-M9N checksums every sentence; one without *hh is corrupt
+        body = line[1:]
+        star = body.rfind("*")
+        if star == -1:
+            return False
+        try:
+            return int(body[star + 1:star + 3], 16) == nmea_checksum(body[:star])
+        except ValueError:
+            return False
+
+    def stats(self):
+        return dict(self.counters, sentences_per_s=round(self.sentences_per_s, 1))
 
     def read(self):
-        for _ in range(10):
-            line = self.ser.readline().decode("utf-8", errors="ignore").strip()
-            self._parse_line(line)
+        # Only take what the UART has already buffered; never block
+        waiting = self.ser.in_waiting
+        if waiting:
+            self.feed(self.ser.read(waiting))
         return self.latest
+
+    def close(self):
+        self.ser.close()
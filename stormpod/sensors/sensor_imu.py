@@ -1,20 +1,54 @@
+import math
+import threading
 import time
-import board
-import busio
-import adafruit_bno08x
-from adafruit_bno08x.i2c import BNO08X_I2C
+
+from .. import metrics
+
+try:
+    import board
+    import busio
+    import adafruit_bno08x
+    from adafruit_bno08x.i2c import BNO08X_I2C
+    BNO_REPORT_ROTATION_VECTOR = adafruit_bno08x.BNO_REPORT_ROTATION_VECTOR
+except ImportError:  # off the Pi: pass bno= (see sensors.fakes)
+    board = None
+    BNO_REPORT_ROTATION_VECTOR = 0x05
+
+SAMPLES = metrics.counter("stormpod_imu_samples_total", "IMU rotation vectors read")
+SAMPLE_ERRORS = metrics.counter("stormpod_imu_sample_errors_total", "IMU reads that raised")
 
 class IMUSensor:
-    def __init__(self, address=0x4B):
-        i2c = busio.I2C(board.SCL, board.SDA)
-        self.bno = BNO08X_I2C(i2c, address=address)
-        time.sleep(1.5)
+    def __init__(self, address=0x4B, bno=None, rate_hz=100):
+        """``rate_hz`` is the rotation vector report rate. The sensor is
+        sampled at that rate on a background thread, and every yaw goes to
+        ``listeners`` (e.g. fusion.HeadingFusion.update_imu). ``rate_hz=None``
+        samples only when read() is called.
+        """
+        self._i2c = None
+        if bno is None:
+            if board is None:
+                raise ImportError("IMUSensor needs adafruit-circuitpython-bno08x (or pass bno=)")
+            self._i2c = busio.I2C(board.SCL, board.SDA)
+            self.bno = BNO08X_I2C(self._i2c, address=address)
+            time.sleep(1.5)
+        else:
+            self.bno = bno
+        self.rate_hz = rate_hz
         self.last_heading = None
+        # monotonic time of the last quaternion read (for staleness checks)
+        self.last_update = None
+        self.listeners = []
+        self.samples = 0
+        self.sample_errors = 0
         self.bno_ready = False
+        self._error = None
+        self._stop = threading.Event()
+        self._thread = None
 
+        interval_us = int(1e6 / rate_hz) if rate_hz else None
         for attempt in range(3):
             try:
-                self.bno.enable_feature(adafruit_bno08x.BNO_REPORT_ROTATION_VECTOR)
+                self._enable(interval_us)
                 print(f"✅ IMU rotation vector enabled on try {attempt+1}")
                 self.bno_ready = True
                 break
@@ -23,25 +57,72 @@ class IMUSensor:
                 time.sleep(0.5)
 
         if not self.bno_ready:
-            print("❌ IMU failed to initialize. Heading data will be unavailable.")
+            self.close()
+            raise OSError("IMU rotation vector could not be enabled")
 
-    def read(self):
-        if not self.bno_ready:
-            return {"heading_deg": None}
+        if rate_hz:
+            self._thread = threading.Thread(target=self._sample_loop, name="imu-sampler", daemon=True)
+            self._thread.start()
+
+    def _enable(self, interval_us):
+        if interval_us is None:
+            self.bno.enable_feature(BNO_REPORT_ROTATION_VECTOR)
+            return
         try:
-            data = self.bno.rotation_vector
-            if data is None:
-                return {"heading_deg": self.last_heading}
-            w, x, y, z = data
-            yaw = self._quat_to_yaw(w, x, y, z)
-            self.last_heading = round(yaw, 1)
-            return {"heading_deg": self.last_heading}
-        except Exception as e:
-            print(f"⚠️ IMU read error: {e}")
-            return {"heading_deg": self.last_heading}
+            self.bno.enable_feature(BNO_REPORT_ROTATION_VECTOR, report_interval=interval_us)
+        except TypeError:  # adafruit_bno08x < 1.2 has a fixed report interval
+            self.bno.enable_feature(BNO_REPORT_ROTATION_VECTOR)
+
+    def sample(self):
+        """Read one rotation vector. Returns the yaw, or None if there is none yet."""
+        data = self.bno.rotation_vector
+        if data is None:
+            return None
+        # adafruit_bno08x order is (i, j, k, real)
+        x, y, z, w = data
+        yaw = self._quat_to_yaw(w, x, y, z)
+        self.last_heading = round(yaw, 1)
+        self.last_update = time.monotonic()
+        self.samples += 1
+        SAMPLES.inc()
+        for listener in self.listeners:
+            listener(yaw, self.last_update)
+        return yaw
+
+    def _sample_loop(self):
+        period = 1.0 / self.rate_hz
+        deadline = time.monotonic()
+        while not self._stop.is_set():
+            try:
+                self.sample()
+            except Exception as e:
+                self.sample_errors += 1
+                SAMPLE_ERRORS.inc()
+                self._error = e
+            deadline += period
+            wait = deadline - time.monotonic()
+            if wait < 0:  # fell behind (I2C stall): don't try to catch up
+                deadline, wait = time.monotonic(), 0
+            self._stop.wait(wait)
+
+    def read(self):
+        # Errors propagate so the supervisor can count them and reopen the IMU
+        if self._thread is None:
+            self.sample()
+        elif self._error is not None:
+            error, self._error = self._error, None
+            raise error
+        return {"heading_deg": self.last_heading}
+
+    def close(self):
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(1.0)
+        if self._i2c is not None:
+            self._i2c.deinit()
+            self._i2c = None
 
     def _quat_to_yaw(self, w, x, y, z):
-        import math
         siny_cosp = 2 * (w * z + x * y)
         cosy_cosp = 1 - 2 * (y * y + z * z)
         yaw = math.atan2(siny_cosp, cosy_cosp)
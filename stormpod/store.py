@@ -0,0 +1,243 @@
+"""
+Store-and-forward buffer
+------------------------
+Local SQLite (WAL) copy of every sample so nothing is lost while the truck
+is out of coverage. Samples are split into time-indexed tables and
+inserted in batched transactions from a background thread. Per-consumer
+"unsent" cursors (fetch_unsent/mark_sent) let a forwarder drain them
+later; UplinkPublisher does not use them yet.
+"""
+
+import queue
+import sqlite3
+import threading
+import time
+
+DB_FILE = "stormpod.db"
+
+# table -> [(column, sample key, SQL type)]
+TABLES = {
+    "atmos": [
+        ("temp_C", "temp_C", "REAL"),
+        ("humidity_pct", "humidity_%", "REAL"),
+        ("pressure_hPa", "pressure_hPa", "REAL"),
+    ],
+    "wind": [
+        ("angle_deg", "angle_deg", "REAL"),
+        ("speed_kph", "speed_kph", "REAL"),
+        ("wind_raw", "wind_raw", "INTEGER"),
+        ("wind_volts", "wind_volts", "REAL"),
+    ],
+    "gps": [
+        ("lat", "lat", "REAL"),
+        ("lon", "lon", "REAL"),
+        ("fix", "fix", "INTEGER"),
+        ("speed_kph", "ground_speed_kph", "REAL"),
+        ("heading_deg", "heading_deg", "REAL"),
+    ],
+    "lightning": [
+        ("distance_km", "distance_km", "REAL"),
+    ],
+}
+
+
+class SQLiteStore:
+    def __init__(self, path=DB_FILE, batch_size=200, flush_interval=5.0,
+                 background=True, max_queue=50000):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self.rows_inserted = 0
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_schema()
+
+        self._inserts = {}
+        for table, cols in TABLES.items():
+            names = ", ".join(["ts"] + [c for c, _, _ in cols])
+            marks = ", ".join("?" * (len(cols) + 1))
+            self._inserts[table] = f"INSERT INTO {table} ({names}) VALUES ({marks})"
+
+        self._last_strike = None
+        self._pending_lock = threading.Lock()
+        self._pending = []
+        self._last_flush = time.monotonic()
+        self._queue = None
+        self._thread = None
+        if background:
+            self._queue = queue.Queue(maxsize=max_queue)
+            self._thread = threading.Thread(target=self._run, name="store-writer", daemon=True)
+            self._thread.start()
+
+    def _create_schema(self):
+        with self._lock:
+            for table, cols in TABLES.items():
+                col_defs = ", ".join(f"{c} {t}" for c, _, t in cols)
+                self._conn.execute(
+                    f"CREATE TABLE IF NOT EXISTS {table} "
+                    f"(id INTEGER PRIMARY KEY, ts REAL NOT NULL, {col_defs})")
+                self._conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_ts ON {table}(ts)")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS unsent_cursor "
+                "(consumer TEXT, tbl TEXT, last_id INTEGER NOT NULL, PRIMARY KEY (consumer, tbl))")
+
+    # ---------- Writing ----------
+
+    def append(self, sample, ts=None):
+        """Queue one merged SensorManager sample for insertion."""
+        item = (time.time() if ts is None else ts, sample)
+        if self._queue is None:
+            self._pending.append(item)
+            if len(self._pending) >= self.batch_size:
+                self._write_pending(raise_errors=True)
+            return
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            self.dropped += 1
+
+    def _rows(self, items):
+        rows = {table: [] for table in TABLES}
+        for ts, sample in items:
+            for table, cols in TABLES.items():
+                if table == "lightning":
+                    rows[table].extend(self._strikes(ts, sample))
+                    continue
+                values = [sample.get(key) for _, key, _ in cols]
+                if any(v is not None for v in values):
+                    rows[table].append([ts] + values)
+        return rows
+
+    def _strikes(self, ts, sample):
+        """One lightning row per strike, stamped with its IRQ time.
+
+        A poll can carry several strikes in ``events``; a sample without
+        them (older callers) gives its newest strike. Strikes no newer
+        than the last one stored are skipped, so appending a sample the
+        snapshot still holds does not store its strikes twice.
+        """
+        if not sample.get("lightning"):
+            return []
+        events = [e for e in sample.get("events") or () if e.get("type") == "Lightning"]
+        if not events:
+            events = [sample]
+        rows = []
+        for event in events:
+            row_ts = event.get("timestamp") or ts
+            if self._last_strike is not None and row_ts <= self._last_strike:
+                continue
+            self._last_strike = row_ts
+            rows.append([row_ts, event.get("distance_km")])
+        return rows
+
+    def insert_many(self, items):
+        """Insert ``(ts, sample)`` pairs in one transaction."""
+        rows = self._rows(items)
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                for table, table_rows in rows.items():
+                    if table_rows:
+                        self._conn.executemany(self._inserts[table], table_rows)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        self.rows_inserted += sum(len(r) for r in rows.values())
+
+    def flush(self):
+        if self._queue is not None:
+            self._queue.join()
+        self._write_pending(raise_errors=True)
+
+    def _run(self):
+        while True:
+            timeout = max(0.0, self.flush_interval - (time.monotonic() - self._last_flush))
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                self._write_pending()
+                continue
+            if item is None:
+                self._queue.task_done()
+                return
+            with self._pending_lock:
+                self._pending.append(item)
+                due = len(self._pending) >= self.batch_size
+            if due:
+                self._write_pending()
+            self._queue.task_done()
+
+    def _write_pending(self, raise_errors=False):
+        with self._pending_lock:
+            items, self._pending = self._pending, []
+            self._last_flush = time.monotonic()
+        if items:
+            try:
+                self.insert_many(items)
+            except sqlite3.Error as e:
+                if raise_errors:
+                    raise
+                print(f"⚠️ Store insert failed: {e}")
+
+    def close(self):
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+            self._queue = None
+        self.flush()
+        with self._lock:
+            self._conn.close()
+
+    # ---------- Reading ----------
+
+    def query(self, table, start=None, end=None):
+        """Rows of ``table`` with start <= ts < end, oldest first."""
+        sql = f"SELECT * FROM {table}"
+        where, args = [], []
+        if start is not None:
+            where.append("ts >= ?")
+            args.append(start)
+        if end is not None:
+            where.append("ts < ?")
+            args.append(end)
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        with self._lock:
+            return self._conn.execute(sql + " ORDER BY ts", args).fetchall()
+
+    def fetch_unsent(self, table, limit=1000, consumer="uplink"):
+        """Next ``limit`` rows ``consumer`` has not acknowledged, by id."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT last_id FROM unsent_cursor WHERE consumer = ? AND tbl = ?",
+                (consumer, table)).fetchone()
+            last_id = row[0] if row else 0
+            return self._conn.execute(
+                f"SELECT * FROM {table} WHERE id > ? ORDER BY id LIMIT ?",
+                (last_id, limit)).fetchall()
+
+    def mark_sent(self, table, last_id, consumer="uplink"):
+        """Acknowledge every row of ``table`` up to and including ``last_id``."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO unsent_cursor (consumer, tbl, last_id) VALUES (?, ?, ?) "
+                "ON CONFLICT (consumer, tbl) DO UPDATE SET last_id = MAX(last_id, excluded.last_id)",
+                (consumer, table, last_id))
+
+    def unsent_count(self, table, consumer="uplink"):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT last_id FROM unsent_cursor WHERE consumer = ? AND tbl = ?",
+                (consumer, table)).fetchone()
+            return self._conn.execute(
+                f"SELECT COUNT(*) FROM {table} WHERE id > ?", (row[0] if row else 0,)).fetchone()[0]
+
+    @staticmethod
+    def columns(table):
+        return ["id", "ts"] + [c for c, _, _ in TABLES[table]]
@@ -0,0 +1,260 @@
+"""
+Sensor supervision
+------------------
+SensorSupervisor owns one sensor for its whole life. It opens the sensor
+in the background and tracks health: consecutive read errors and how long
+since the sensor last produced fresh data. When the device dies it closes
+it and reopens it with exponential backoff.
+
+The acquisition reader only ever calls ``read()``. That call never waits
+on a dead device. While nothing is open it returns {} after a short idle
+wait, and all opening, closing and retrying happens on the supervisor's
+own thread.
+
+Sensors may expose ``last_update`` (time.monotonic() of the last genuinely
+new data). Otherwise any non-empty read counts as fresh.
+"""
+
+import threading
+import time
+
+INITIALIZING = "initializing"  # first open in progress
+READY = "ready"
+STALE = "stale"                # open, but no fresh data for stale_after_s
+FAILED = "failed"              # down; waiting for the next retry
+RECONNECTING = "reconnecting"  # reopen in progress
+
+
+class SensorSupervisor:
+    def __init__(self, name, factory=None, loader=None, sensor=None, stale_after_s=None,
+                 reopen_after_s=None, error_threshold=3, backoff_initial=1.0, backoff_max=60.0,
+                 on_change=None):
+        """Supervise one sensor.
+
+        ``loader()`` returns the sensor class (timed as import) and
+        ``factory`` builds the sensor (``factory()``, or ``loader()()``).
+        A ready-made ``sensor`` with neither is supervised but never
+        reopened. ``on_change(name, sensor_or_None)`` fires when the open
+        sensor changes.
+        """
+        self.name = name
+        self.factory = factory
+        self.loader = loader
+        self.stale_after_s = stale_after_s
+        self.reopen_after_s = reopen_after_s
+        self.error_threshold = error_threshold
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+        self.on_change = on_change
+
+        self.sensor = None
+        self.state = INITIALIZING
+        self.error = None
+        self.errors_total = 0
+        self.reconnects = 0
+        self.import_s = None
+        self.init_s = None
+        self.ready_after_s = None
+        self._consecutive_errors = 0
+        self._last_fresh = None
+        self._backoff = 0.0
+        self._next_attempt = 0.0
+        self._created = time.perf_counter()
+        self._first_attempt = threading.Event()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._opened = threading.Event()
+        self._closing = []
+        self._thread = None
+
+        if sensor is not None:
+            self._set_sensor(sensor)
+            self.state = READY
+            self.ready_after_s = 0.0
+            self._first_attempt.set()
+
+    @property
+    def reopenable(self):
+        return self.factory is not None or self.loader is not None
+
+    # ---------- Reader side (acquisition thread) ----------
+
+    def read(self):
+        sensor = self.sensor
+        if sensor is None:
+            self._opened.wait(0.1)  # idle without spinning until something is open
+            return {}
+        try:
+            values = sensor.read()
+        except Exception as e:
+            self.errors_total += 1
+            self._consecutive_errors += 1
+            self.error = f"{type(e).__name__}: {e}"
+            if self._consecutive_errors >= self.error_threshold:
+                self._fail(sensor, self.error)
+            raise
+        self._consecutive_errors = 0
+        if values:
+            self._last_fresh = time.monotonic()
+        if self.state in (STALE, FAILED) and not self._is_stale():
+            self.state = READY
+        return values
+
+    # ---------- Health ----------
+
+    def age_s(self):
+        """Seconds since fresh data, or None if there never was any."""
+        fresh = getattr(self.sensor, "last_update", None) or self._last_fresh
+        return None if fresh is None else time.monotonic() - fresh
+
+    def _is_stale(self, limit=None):
+        limit = self.stale_after_s if limit is None else limit
+        if limit is None or self.sensor is None:
+            return False
+        age = self.age_s()
+        if age is None:
+            age = time.monotonic() - self._opened_at
+        return age > limit
+
+    def check(self):
+        """Update STALE/READY and fail a sensor that has been silent too long."""
+        sensor = self.sensor
+        if sensor is None:
+            return
+        if self.reopen_after_s is not None and self.reopenable and self._is_stale(self.reopen_after_s):
+            self._fail(sensor, f"no data for {self.reopen_after_s:.0f} s")
+        elif self._is_stale():
+            if self.state == READY:
+                self.state = STALE
+        elif self.state == STALE:
+            self.state = READY
+
+    def _fail(self, sensor, reason):
+        if not self.reopenable:
+            self.state = FAILED  # keep reading; a good read recovers it
+            return
+        if self.sensor is not sensor:
+            return
+        print(f"⚠️ {self.name} down ({reason}); reconnecting")
+        self._set_sensor(None)
+        self.state = FAILED
+        self._schedule_retry()
+        self._closing.append(sensor)  # closed on the supervisor thread, never the reader's
+        self._wake.set()
+
+    # ---------- Open / reopen (supervisor thread) ----------
+
+    def _set_sensor(self, sensor):
+        self.sensor = sensor
+        self._consecutive_errors = 0
+        self._last_fresh = None
+        self._opened_at = time.monotonic()
+        if sensor is None:
+            self._opened.clear()
+        else:
+            self._opened.set()
+        if self.on_change is not None:
+            self.on_change(self.name, sensor)
+
+    def _schedule_retry(self):
+        self._backoff = min(self.backoff_max, (self._backoff * 2) or self.backoff_initial)
+        self._next_attempt = time.monotonic() + self._backoff
+
+    def _close(self, sensor):
+        close = getattr(sensor, "close", None)
+        if close is not None:
+            try:
+                close()
+            except Exception as e:
+                print(f"⚠️ {self.name} close failed: {e}")
+
+    def open(self):
+        """One open attempt. Returns True on success."""
+        first = self.state == INITIALIZING
+        if not first:
+            self.state = RECONNECTING
+        try:
+            start = time.perf_counter()
+            factory = self.factory or self.loader()
+            imported = time.perf_counter()
+            sensor = factory()
+            done = time.perf_counter()
+        except Exception as e:
+            self.error = f"{type(e).__name__}: {e}"
+            self.state = FAILED
+            self._schedule_retry()
+            if first:
+                print(f"❌ {self.name} unavailable: {e} (retrying in {self._backoff:.0f} s)")
+            self._first_attempt.set()
+            return False
+
+        if self._stop.is_set():
+            self._close(sensor)  # stopped while the device was opening
+            self._first_attempt.set()
+            return False
+        self.import_s, self.init_s = imported - start, done - imported
+        if first:
+            self.ready_after_s = time.perf_counter() - self._created
+            print(f"✅ {self.name} ready (import {self.import_s * 1000:.0f} ms, "
+                  f"init {self.init_s * 1000:.0f} ms)")
+        else:
+            self.reconnects += 1
+            print(f"✅ {self.name} reconnected")
+        self._backoff = 0.0
+        self.error = None
+        self._set_sensor(sensor)
+        self.state = READY
+        self._first_attempt.set()
+        return True
+
+    def _run(self, check_interval):
+        while not self._stop.is_set():
+            while self._closing:
+                self._close(self._closing.pop())
+            if self.sensor is None and self.reopenable:
+                wait = self._next_attempt - time.monotonic()
+                if wait <= 0:
+                    self.open()
+                    continue
+            else:
+                self.check()
+                wait = check_interval
+            self._wake.wait(wait)
+            self._wake.clear()
+
+    def start(self, check_interval=0.5):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, args=(check_interval,),
+                                            name=f"supervise-{self.name}", daemon=True)
+            self._thread.start()
+
+    def wait_first_attempt(self, timeout=None):
+        return self._first_attempt.wait(timeout)
+
+    def stop(self, close=False):
+        self._stop.set()
+        self._wake.set()
+        self._opened.set()  # release an idle read()
+        if self._thread is not None:
+            self._thread.join(1.0)
+            self._thread = None
+        while self._closing:
+            self._close(self._closing.pop())
+        if close and self.sensor is not None:
+            self._close(self.sensor)
+
+    def report(self):
+        age = self.age_s() if self.sensor is not None else None
+        retry = max(0.0, self._next_attempt - time.monotonic()) \
+            if self.state == FAILED and self.reopenable else None
+        return {
+            "state": self.state,
+            "error": self.error,
+            "errors_total": self.errors_total,
+            "reconnects": self.reconnects,
+            "age_s": age,
+            "retry_in_s": retry,
+            "import_s": self.import_s,
+            "init_s": self.init_s,
+            "ready_after_s": self.ready_after_s,
+        }
@@ -0,0 +1,174 @@
+"""
+Multi-resolution time series
+----------------------------
+Fixed-size NumPy rings for trend history. Raw samples go into one ring
+and are rolled up as they arrive into 1 s / 1 min / 10 min tiers. Each
+tier bucket keeps the min, mean and max of its samples. Memory is
+allocated once, so a whole chase (and days of 10 min buckets) fits in
+constant space.
+
+Missing readings are stored as NaN, never as made-up defaults.
+Matplotlib draws NaN as a gap.
+"""
+
+import threading
+import time
+
+import numpy as np
+
+# (bucket seconds, buckets kept): 1 h of 1 s, 24 h of 1 min, 7 days of 10 min
+DEFAULT_TIERS = ((1, 3600), (60, 1440), (600, 1008))
+
+
+def _as_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+class Ring:
+    """Preallocated circular buffer of timestamps and value rows."""
+
+    def __init__(self, capacity, width):
+        self.capacity = capacity
+        self.times = np.full(capacity, np.nan)
+        self.values = np.full((capacity, width), np.nan)
+        self.head = 0  # next slot to write
+        self.count = 0
+
+    def append(self, t, row):
+        self.times[self.head] = t
+        self.values[self.head] = row
+        self.head = (self.head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def ordered(self, start=None):
+        """(times, values) oldest first, copied, optionally only t >= start."""
+        if self.count < self.capacity:
+            times, values = self.times[:self.count].copy(), self.values[:self.count].copy()
+        else:
+            order = np.r_[self.head:self.capacity, 0:self.head]
+            times, values = self.times[order], self.values[order]
+        if start is not None:
+            keep = np.searchsorted(times, start)
+            times, values = times[keep:], values[keep:]
+        return times, values
+
+
+class Tier:
+    """Buckets of ``bucket_s`` seconds holding per-column min/mean/max."""
+
+    def __init__(self, bucket_s, capacity, width):
+        self.bucket_s = bucket_s
+        # Columns are [min..., mean..., max...] so one ring holds all three
+        self.ring = Ring(capacity, 3 * width)
+        self.width = width
+        self._bucket = None
+        self._sum = np.zeros(width)
+        self._n = np.zeros(width)
+        self._min = np.full(width, np.inf)
+        self._max = np.full(width, -np.inf)
+
+    def add(self, t, row):
+        bucket = int(t // self.bucket_s)
+        # A clock step backwards folds into the open bucket
+        if self._bucket is None or bucket > self._bucket:
+            if self._bucket is not None:
+                self.ring.append(self._bucket * self.bucket_s, self._current())
+                if bucket > self._bucket + 1:
+                    # Break the line across the outage instead of bridging it
+                    self.ring.append((self._bucket + 1) * self.bucket_s, np.nan)
+            self._bucket = bucket
+            self._sum[:] = 0.0
+            self._n[:] = 0
+            self._min[:] = np.inf
+            self._max[:] = -np.inf
+        valid = ~np.isnan(row)
+        self._sum[valid] += row[valid]
+        self._n[valid] += 1
+        np.fmin(self._min, row, out=self._min)
+        np.fmax(self._max, row, out=self._max)
+
+    def _current(self):
+        has = self._n > 0
+        mean = np.divide(self._sum, self._n, out=np.full(self.width, np.nan), where=has)
+        return np.concatenate([
+            np.where(has, self._min, np.nan), mean, np.where(has, self._max, np.nan),
+        ])
+
+    def span_s(self):
+        return self.ring.capacity * self.bucket_s
+
+    def ordered(self, start=None):
+        """Closed buckets plus the one still filling, oldest first."""
+        times, values = self.ring.ordered(start)
+        if self._bucket is not None:
+            times = np.append(times, self._bucket * self.bucket_s)
+            values = np.vstack([values, self._current()])
+        return times, values
+
+
+class TimeSeriesStore:
+    """Raw ring plus rolled-up tiers for a fixed set of sample keys.
+
+    ``append`` runs on the logging thread and the read methods run on the
+    GUI thread; a lock keeps the two consistent.
+    """
+
+    def __init__(self, keys, raw_capacity=600, tiers=DEFAULT_TIERS):
+        self.keys = list(keys)
+        self._index = {k: i for i, k in enumerate(self.keys)}
+        self.raw = Ring(raw_capacity, len(self.keys))
+        self.tiers = [Tier(bucket_s, cap, len(self.keys)) for bucket_s, cap in tiers]
+        self.version = 0  # bumped on every append; cheap change detection
+        self._lock = threading.Lock()
+
+    def append(self, sample, ts=None):
+        ts = time.time() if ts is None else ts
+        row = np.array([_as_float(sample.get(k)) for k in self.keys])
+        with self._lock:
+            self.raw.append(ts, row)
+            for tier in self.tiers:
+                tier.add(ts, row)
+            self.version += 1
+
+    def latest(self, key):
+        with self._lock:
+            if not self.raw.count:
+                return np.nan
+            return self.raw.values[self.raw.head - 1, self._index[key]]
+
+    def recent(self, key, window_s=None, now=None):
+        """Raw (times, values) for ``key``, optionally only the last ``window_s``."""
+        now = time.time() if now is None else now
+        start = None if window_s is None else now - window_s
+        with self._lock:
+            times, values = self.raw.ordered(start)
+        return times, values[:, self._index[key]]
+
+    def pick_tier(self, window_s, max_points=600):
+        """Finest tier that covers ``window_s`` in at most ``max_points`` buckets."""
+        for tier in self.tiers:
+            if tier.span_s() >= window_s and window_s / tier.bucket_s <= max_points:
+                return tier
+        return self.tiers[-1]
+
+    def series(self, key, window_s, max_points=600, now=None):
+        """Decimated (times, min, mean, max) for the last ``window_s`` seconds."""
+        now = time.time() if now is None else now
+        tier = self.pick_tier(window_s, max_points)
+        col = self._index[key]
+        with self._lock:
+            times, values = tier.ordered(now - window_s)
+        w = len(self.keys)
+        return times, values[:, col], values[:, w + col], values[:, 2 * w + col]
+
+    def columns(self, keys, window_s, max_points=600, now=None):
+        """(times, {key: mean}) for several keys from one tier."""
+        now = time.time() if now is None else now
+        tier = self.pick_tier(window_s, max_points)
+        with self._lock:
+            times, values = tier.ordered(now - window_s)
+        w = len(self.keys)
+        return times, {k: values[:, w + self._index[k]] for k in keys}
@@ -3,14 +3,19 @@
 import RPi.GPIO as GPIO
 import time
 import spidev
-import json
 import os
+import sys
+
+# Run as `python tools/irq_listener.py` from the stormpod directory
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from ipc import EventPublisher, StatusFileShim, SOCKET_PATH, STATUS_FILE
 
 IRQ_PIN = 17
-OUTPUT_FILE = "/tmp/lightning_status.json"
+OUTPUT_FILE = STATUS_FILE
 
 class AS3935:
-    def __init__(self):
+    def __init__(self, publisher):
+        self.publisher = publisher
         self.spi = spidev.SpiDev()
         self.spi.open(0, 0)
         self.spi.max_speed_hz = 500000
@@ -45,22 +50,31 @@ class AS3935:
         data = {"timestamp": time.time()}
 
         if int_src == 0x08:
-            data.update({"lightning": True,
+            data.update({"type": "Lightning", "lightning": True,
                          "distance_km": self._read_register(0x07)})
         elif int_src == 0x01:
-            data.update({"noise": True})
+            data.update({"type": "Noise", "noise": True})
         elif int_src == 0x04:
-            data.update({"disturber": True})
+            data.update({"type": "Disturber", "disturber": True})
+        else:
+            data.update({"type": "Unknown"})
 
-        with open(OUTPUT_FILE, "w") as f:
-            json.dump(data, f)
-        os.chmod(OUTPUT_FILE, 0o666)
+        # Socket fan-out only; the status file is written off this thread
+        self.publisher.publish(data)
 
 if __name__ == "__main__":
-    sensor = AS3935()
-    print("Lightning IRQ listener running. Ctrl+C to exit.")
+    publisher = EventPublisher(SOCKET_PATH)
+    shim = None
+    if "--no-status-file" not in sys.argv:
+        shim = StatusFileShim(OUTPUT_FILE, SOCKET_PATH).start()
+    sensor = AS3935(publisher)
+    print(f"Lightning IRQ listener running on {SOCKET_PATH}. Ctrl+C to exit.")
     try:
         while True:
             time.sleep(1)
     except KeyboardInterrupt:
         GPIO.cleanup()
+    finally:
+        if shim is not None:
+            shim.stop()
+        publisher.close()
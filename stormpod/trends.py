@@ -0,0 +1,114 @@
+"""
+Trend plotting
+--------------
+Stacked line charts that redraw with blitting: one persistent Line2D per
+axis, updated with set_data(). Only the lines are redrawn on each frame,
+over a cached background of the static parts (axes, ticks, grid and
+labels). The full figure is redrawn only when a y-range or the time
+window has to change, or after the canvas itself has been redrawn
+(resize, tab switch).
+
+The x axis is "minutes ago" with a fixed range, so the background stays
+valid while the data scrolls.
+"""
+
+import collections
+import time
+
+import numpy as np
+
+BG_COLOR = "#0a0a0a"
+
+
+class TrendPlot:
+    def __init__(self, fig, axes, series, window_s=300.0, y_margin=0.1):
+        """``series`` is a list of (key, label, color), one per axis."""
+        self.fig = fig
+        self.canvas = fig.canvas
+        self.axes = list(axes)
+        self.keys = [key for key, _, _ in series]
+        self.window_s = window_s
+        self.y_margin = y_margin
+        self.frame_times = collections.deque(maxlen=100)
+        self.full_redraws = 0
+        self.blits = 0
+
+        self.lines = []
+        for ax, (_, label, color) in zip(self.axes, series):
+            ax.set_facecolor(BG_COLOR)
+            ax.tick_params(colors="white")
+            for spine in ax.spines.values():
+                spine.set_color("white")
+            ax.set_ylabel(label, color="white")
+            ax.grid(True, alpha=0.3)
+            ax.set_xlim(-window_s / 60.0, 0)
+            line, = ax.plot([], [], color=color, linewidth=2, animated=True)
+            self.lines.append(line)
+        self.axes[-1].set_xlabel("Minutes ago", color="white")
+
+        self._backgrounds = None
+        self._needs_full = True
+        self.canvas.mpl_connect("draw_event", self._on_draw)
+
+    def set_window(self, window_s):
+        if window_s != self.window_s:
+            self.window_s = window_s
+            for ax in self.axes:
+                ax.set_xlim(-window_s / 60.0, 0)
+            self._needs_full = True
+
+    def invalidate(self):
+        """Force a full redraw next frame (e.g. the tab was just shown)."""
+        self._needs_full = True
+
+    def update(self, times, columns, now=None):
+        """Push new data; ``columns`` maps series key -> values (NaN = gap)."""
+        now = time.time() if now is None else now
+        x = (np.asarray(times, dtype=float) - now) / 60.0
+        for ax, line, key in zip(self.axes, self.lines, self.keys):
+            y = np.asarray(columns[key], dtype=float)
+            line.set_data(x, y)
+            visible = y[(x >= -self.window_s / 60.0) & ~np.isnan(y)] if len(y) else y
+            if len(visible) and self._rescale(ax, visible.min(), visible.max()):
+                self._needs_full = True
+
+    def _rescale(self, ax, lo, hi):
+        # Only touch the limits when the data leaves them or has shrunk to a
+        # small part of them; every change costs a full redraw
+        cur_lo, cur_hi = ax.get_ylim()
+        pad = max((hi - lo) * self.y_margin, 0.5)
+        fits = cur_lo <= lo and hi <= cur_hi
+        too_loose = (cur_hi - cur_lo) > 4 * (hi - lo + 2 * pad)
+        if fits and not too_loose and not ax.get_autoscaley_on():
+            return False
+        ax.set_ylim(lo - pad, hi + pad)
+        return True
+
+    def draw(self):
+        start = time.perf_counter()
+        if self._needs_full or self._backgrounds is None:
+            self.canvas.draw()  # _on_draw caches backgrounds and draws lines
+            self.full_redraws += 1
+        else:
+            for ax, line, bg in zip(self.axes, self.lines, self._backgrounds):
+                self.canvas.restore_region(bg)
+                ax.draw_artist(line)
+                self.canvas.blit(ax.bbox)
+            self.blits += 1
+        self.frame_times.append(time.perf_counter() - start)
+
+    def _on_draw(self, event):
+        self._backgrounds = [self.canvas.copy_from_bbox(ax.bbox) for ax in self.axes]
+        for ax, line in zip(self.axes, self.lines):
+            ax.draw_artist(line)
+        self._needs_full = False
+
+    def stats(self):
+        frames = sorted(self.frame_times)
+        return {
+            "frames": self.full_redraws + self.blits,
+            "full_redraws": self.full_redraws,
+            "blits": self.blits,
+            "frame_ms_median": frames[len(frames) // 2] * 1000 if frames else None,
+            "frame_ms_max": frames[-1] * 1000 if frames else None,
+        }
@@ -0,0 +1,253 @@
+"""
+Telemetry uplink
+----------------
+Builds the telemetry messages described in NETWORK_ARCHITECTURE.md from
+SensorManager samples and publishes them in batches over a pluggable
+transport, so radio wake-ups and per-message overhead scale with the
+number of batches rather than the number of samples.
+
+Transports only need ``publish(topic, payload)``, which raises
+ConnectionError when the link is down. LocalBroker is an in-process
+stand-in used by the tests and for desk runs; MQTTTransport wraps
+paho-mqtt when it is installed.
+"""
+
+import collections
+import json
+import threading
+import time
+import zlib
+
+DEVICE_ID = "stormpod_001"
+TOPIC = "stormpod/{device_id}/telemetry"
+
+
+def build_message(sample, device_id=DEVICE_ID, ts=None, device_status=None):
+    """Telemetry message for one merged SensorManager sample."""
+    ts = time.time() if ts is None else ts
+    return {
+        "device_id": device_id,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(ts)),
+        "location": {
+            "lat": sample.get("lat"),
+            "lon": sample.get("lon"),
+            "alt": sample.get("gps_alt_m"),
+            "accuracy": sample.get("h_acc_m"),
+        },
+        "environmental": {
+            "temperature_c": sample.get("temp_C"),
+            "humidity_pct": sample.get("humidity_%"),
+            "pressure_hpa": sample.get("pressure_hPa"),
+            "sea_level_pressure_hpa": sample.get("sea_level_pressure_hPa"),
+            "pressure_tendency_3h_hpa": sample.get("pressure_tendency_3h_hPa"),
+            "dew_point_c": sample.get("dew_point_C"),
+            "wind_speed_kph": sample.get("speed_kph"),
+            "wind_direction_deg": sample.get("angle_deg"),
+            "true_wind_speed_kph": sample.get("true_wind_kph"),
+            "true_wind_direction_deg": sample.get("true_wind_dir_deg"),
+            "wind_gust_kph": sample.get("gust_kph"),
+            "wind_mean_10min_kph": sample.get("wind_10min_kph"),
+        },
+        "alerts": {
+            "lightning_detected": bool(sample.get("lightning")),
+            "lightning_distance_km": sample.get("distance_km"),
+            "storm_distance_km": sample.get("storm_distance_km"),
+            "storm_trend": sample.get("storm_trend"),
+            "storm_closing_kph": sample.get("storm_closing_kph"),
+            "storm_eta_min": sample.get("storm_eta_min"),
+            "strike_rate_per_min": sample.get("strike_rate_5min"),
+            "severe_weather": False,
+        },
+        "device_status": dict(device_status or {}),
+    }
+
+
+def encode_batch(messages, compress=True):
+    body = json.dumps({"count": len(messages), "messages": messages},
+                      separators=(",", ":")).encode()
+    return zlib.compress(body, 6) if compress else body
+
+
+def decode_batch(payload):
+    """Inverse of encode_batch(); detects compression from the first byte."""
+    if payload[:1] != b"{":
+        payload = zlib.decompress(payload)
+    return json.loads(payload)["messages"]
+
+
+class LocalBroker:
+    """In-process broker stand-in: records publishes and fans them out."""
+
+    def __init__(self):
+        self.online = True
+        self.published = []
+        self._subscribers = collections.defaultdict(list)
+        self._lock = threading.Lock()
+
+    def subscribe(self, topic, callback):
+        with self._lock:
+            self._subscribers[topic].append(callback)
+
+    def publish(self, topic, payload):
+        if not self.online:
+            raise ConnectionError("broker offline")
+        with self._lock:
+            self.published.append((topic, payload))
+            callbacks = list(self._subscribers.get(topic, ()))
+        for cb in callbacks:
+            cb(topic, payload)
+
+
+class MQTTTransport:
+    """paho-mqtt transport (optional dependency)."""
+
+    def __init__(self, host, port=8883, client_id=DEVICE_ID, tls=True, qos=1):
+        try:
+            import paho.mqtt.client as mqtt
+        except ImportError as e:
+            raise ImportError("MQTTTransport needs paho-mqtt: pip install paho-mqtt") from e
+        self.qos = qos
+        self.client = mqtt.Client(client_id=client_id)
+        if tls:
+            self.client.tls_set()
+        self.client.connect_async(host, port)
+        self.client.loop_start()
+
+    def publish(self, topic, payload):
+        if not self.client.is_connected():
+            raise ConnectionError("MQTT not connected")
+        info = self.client.publish(topic, payload, qos=self.qos)
+        if info.rc != 0:
+            raise ConnectionError(f"MQTT publish failed (rc={info.rc})")
+
+    def close(self):
+        self.client.loop_stop()
+        self.client.disconnect()
+
+
+class UplinkPublisher:
+    """Batches, compresses and publishes telemetry with bounded retries.
+
+    Samples wait in a bounded queue until a batch is full, then are packed
+    into a bounded outbox of encoded batches. When either is full the
+    oldest entry is dropped and counted in ``stats``; a dropped sample is
+    never re-sent. With the defaults the outbox rides out about 10 min of
+    lost link at one sample per second. The SQLite store keeps its own
+    local copy, but nothing forwards it yet: re-sending from
+    SQLiteStore.fetch_unsent()/mark_sent() is out of scope here.
+    Failed sends are retried with exponential backoff, oldest batch first.
+    """
+
+    def __init__(self, transport, device_id=DEVICE_ID, batch_size=10, flush_interval=30.0,
+                 compress=True, max_queue=600, max_outbox=60,
+                 backoff_initial=2.0, backoff_max=300.0, status_fn=None):
+        self.transport = transport
+        self.device_id = device_id
+        self.topic = TOPIC.format(device_id=device_id)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.compress = compress
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+        self.status_fn = status_fn
+
+        self._queue = collections.deque(maxlen=max_queue)
+        self._outbox = collections.deque(maxlen=max_outbox)
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._last_flush = time.monotonic()
+        self._backoff = 0.0
+        self._next_attempt = 0.0
+
+        self.stats = {
+            "batches_sent": 0, "samples_sent": 0, "bytes_sent": 0,
+            "samples_dropped": 0, "batches_dropped": 0, "send_failures": 0,
+        }
+
+    def submit(self, sample, ts=None):
+        """Queue one sample. Returns False if an older sample had to be dropped."""
+        status = self.status_fn() if self.status_fn else None
+        msg = build_message(sample, self.device_id, ts, status)
+        with self._lock:
+            full = len(self._queue) == self._queue.maxlen
+            if full:
+                self.stats["samples_dropped"] += 1
+            self._queue.append(msg)
+            if len(self._queue) >= self.batch_size:
+                self._wake.set()
+        return not full
+
+    @property
+    def pending(self):
+        with self._lock:
+            return len(self._queue), len(self._outbox)
+
+    def flush(self, force=False):
+        """Pack queued samples into batches and send them, oldest first.
+
+        Only full batches are packed unless ``force`` is set. Packed
+        (compressed) batches wait in a bounded outbox while the link is
+        down, and nothing is sent while a retry backoff is pending.
+        Returns the number of batches published.
+        """
+        with self._lock:
+            while self._queue and (force or len(self._queue) >= self.batch_size):
+                n = min(self.batch_size, len(self._queue))
+                batch = [self._queue.popleft() for _ in range(n)]
+                if len(self._outbox) == self._outbox.maxlen:
+                    self.stats["batches_dropped"] += 1
+                self._outbox.append((encode_batch(batch, self.compress), n))
+        self._last_flush = time.monotonic()
+
+        if time.monotonic() < self._next_attempt:
+            return 0
+        sent = 0
+        while True:
+            with self._lock:
+                if not self._outbox:
+                    break
+                payload, count = self._outbox[0]
+            try:
+                self.transport.publish(self.topic, payload)
+            except (ConnectionError, OSError):
+                self.stats["send_failures"] += 1
+                self._backoff = min(self.backoff_max, (self._backoff * 2) or self.backoff_initial)
+                self._next_attempt = time.monotonic() + self._backoff
+                break
+            with self._lock:
+                self._outbox.popleft()
+            self._backoff = 0.0
+            self._next_attempt = 0.0
+            self.stats["batches_sent"] += 1
+            self.stats["samples_sent"] += count
+            self.stats["bytes_sent"] += len(payload)
+            sent += 1
+        return sent
+
+    # ---------- Background sender ----------
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="uplink", daemon=True)
+            self._thread.start()
+
+    def stop(self, flush=True):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(2.0)
+            self._thread = None
+        if flush:
+            self._next_attempt = 0.0
+            self.flush(force=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(1.0)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            stale = time.monotonic() - self._last_flush >= self.flush_interval
+            self.flush(force=stale)
@@ -0,0 +1,162 @@
+"""
+True wind
+---------
+The roof pod measures apparent wind: the air moving past a truck that is
+itself moving. True wind is what's left after adding the truck's own
+velocity back.
+
+Conventions (meteorological, degrees clockwise):
+
+* ``angle_deg``: vane angle the apparent wind blows FROM, relative to the
+  truck's nose (0 = head-on, 90 = from the right). ``vane_offset_deg``
+  corrects a vane that is not mounted square to the truck.
+* ``heading_deg``: direction the truck points, from north.
+* ``true_wind_dir_deg``: compass direction the true wind blows FROM.
+
+As (east, north) vectors of where the air is going:
+
+    apparent = -A * (sin(H + a), cos(H + a))
+    truck    =  V * (sin H, cos H)
+    true     = apparent + truck
+
+True speed depends only on A, a and V, so it is available without a
+heading. True direction also needs the heading. With no GPS fix nothing
+is computed, because a parked truck and a moving one look the same to
+the vane; a ground speed left over from before the fix was lost is not
+used either.
+
+``true_wind`` handles one sample and ``apply`` is the live pipeline stage
+(SensorManager runs it on every merged snapshot). ``true_wind_batch``
+does the same for whole NumPy columns, and ``reprocess`` runs it over a
+CSV or binary log:
+
+    python -m stormpod.wind stormpod_log.bin --out true_wind.csv
+"""
+
+import argparse
+import csv
+import math
+import os
+import sys
+import time
+
+import numpy as np
+
+from .binlog import load_columns
+
+# Snapshot keys read and written by apply()
+APPARENT_SPEED, APPARENT_ANGLE = "speed_kph", "angle_deg"
+GROUND_SPEED, HEADING, FIX = "ground_speed_kph", "heading_deg", "fix"
+TRUE_SPEED, TRUE_DIR = "true_wind_kph", "true_wind_dir_deg"
+
+
+def true_wind(apparent_kph, angle_deg, ground_speed_kph, heading_deg, vane_offset_deg=0.0):
+    """(true_wind_kph, true_wind_dir_deg) for one sample; None where unknown."""
+    if apparent_kph is None or angle_deg is None or ground_speed_kph is None:
+        return None, None
+    # Work relative to the truck (x right, y forward), then rotate by heading
+    rel = math.radians(angle_deg + vane_offset_deg)
+    x = -apparent_kph * math.sin(rel)
+    y = -apparent_kph * math.cos(rel) + ground_speed_kph
+    speed = round(math.hypot(x, y), 1)
+    if heading_deg is None:
+        return speed, None
+    if speed == 0.0:
+        return speed, None  # calm: no direction
+    from_rel = math.degrees(math.atan2(-x, -y))
+    return speed, round((heading_deg + from_rel) % 360.0, 1)
+
+
+def true_wind_batch(apparent_kph, angle_deg, ground_speed_kph, heading_deg, vane_offset_deg=0.0):
+    """Vectorised true_wind over equal-length columns.
+
+    Inputs are anything np.asarray accepts; missing values are NaN. Returns
+    float arrays (speed, direction) with NaN wherever the inputs do not
+    determine the result (and direction NaN in a dead calm).
+    """
+    a = np.asarray(apparent_kph, dtype=np.float64)
+    rel = np.radians(np.asarray(angle_deg, dtype=np.float64) + vane_offset_deg)
+    v = np.asarray(ground_speed_kph, dtype=np.float64)
+    h = np.asarray(heading_deg, dtype=np.float64)
+
+    x = -a * np.sin(rel)
+    y = -a * np.cos(rel) + v
+    speed = np.round(np.hypot(x, y), 1)
+    with np.errstate(invalid="ignore"):
+        direction = np.round((h + np.degrees(np.arctan2(-x, -y))) % 360.0, 1)
+    direction[speed == 0.0] = np.nan
+    return speed, direction
+
+
+def apply(data, vane_offset_deg=0.0):
+    """Pipeline stage: add true wind to a merged snapshot in place."""
+    ground = data.get(GROUND_SPEED) if data.get(FIX) else None
+    speed, direction = true_wind(data.get(APPARENT_SPEED), data.get(APPARENT_ANGLE),
+                                 ground, data.get(HEADING), vane_offset_deg)
+    data[TRUE_SPEED] = speed
+    data[TRUE_DIR] = direction
+    return data
+
+
+# ---------- Log reprocessing ----------
+
+def reprocess(path, out_path=None, vane_offset_deg=0.0):
+    """True wind for every row of a log. Returns {column: array}.
+
+    Rows without a GPS fix get NaN. Logs from before angle_deg and
+    ground_speed_kph were logged cannot be corrected (and their speed_kph column held GPS speed, not wind) and
+    raise ValueError. ``out_path`` also writes time_utc plus the true wind
+    columns as CSV.
+    """
+    keys = ("time_utc", APPARENT_SPEED, APPARENT_ANGLE, GROUND_SPEED, HEADING)
+    cols = load_columns(path, keys + (FIX,))
+    missing = [k for k in keys[1:] if cols[k] is None]
+    if missing:
+        raise ValueError(f"{path} has no {', '.join(missing)} column(s); cannot compute true wind")
+    ground = cols[GROUND_SPEED]
+    if cols[FIX] is not None:
+        ground = np.where(cols[FIX] == 1, ground, np.nan)
+    speed, direction = true_wind_batch(cols[APPARENT_SPEED], cols[APPARENT_ANGLE],
+                                       ground, cols[HEADING], vane_offset_deg)
+    result = {"time_utc": cols["time_utc"], TRUE_SPEED: speed, TRUE_DIR: direction}
+    if out_path:
+        _write_csv(out_path, result)
+    return result
+
+
+def _write_csv(path, result):
+    times = result["time_utc"]
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["time_utc", TRUE_SPEED, TRUE_DIR])
+        for i in range(len(result[TRUE_SPEED])):
+            t = "" if times is None or np.isnan(times[i]) else f"{int(times[i]):06d}"
+            s, d = result[TRUE_SPEED][i], result[TRUE_DIR][i]
+            writer.writerow([t, "" if np.isnan(s) else f"{s:.1f}", "" if np.isnan(d) else f"{d:.1f}"])
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Recompute true wind over a StormPOD log")
+    p.add_argument("log", help="CSV or binary log")
+    p.add_argument("--out", help="write time_utc + true wind columns as CSV")
+    p.add_argument("--vane-offset", type=float, default=0.0, help="vane mounting offset, degrees")
+    args = p.parse_args(argv)
+
+    start = time.perf_counter()
+    try:
+        result = reprocess(args.log, args.out, args.vane_offset)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    elapsed = time.perf_counter() - start
+    speed = result[TRUE_SPEED]
+    valid = ~np.isnan(speed)
+    print(f"{len(speed):,} rows from {os.path.basename(args.log)} in {elapsed:.2f} s "
+          f"({valid.sum():,} with true wind)")
+    if valid.any():
+        print(f"  true wind mean {np.nanmean(speed):.1f} km/h, max {np.nanmax(speed):.1f} km/h")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,174 @@
+"""
+Streaming wind statistics
+-------------------------
+WMO-style statistics over the wind stream at the full 5 Hz frame rate:
+
+* 3 s running mean (the WMO gust averaging period)
+* 2 min and 10 min mean speed
+* gust: the highest 3 s mean in the last 10 min, with the time it happened
+* vector (unit-vector) mean direction over 2 and 10 min, and the
+  Yamartino standard deviation of direction over 10 min
+
+Every update is amortised O(1). Each window keeps running sums of speed,
+sin and cos and subtracts samples as they expire. The gust uses a
+monotonic deque whose front is always the window maximum. Windows run on
+time.monotonic(), so a wall clock step (NTP on a Pi without an RTC) does
+not flush or freeze them. Only the gust's reported time is wall time.
+
+``update`` runs on the CAN reader (via CANReceiver.listeners) and ``read``
+on the acquisition thread; a lock keeps them apart.
+"""
+
+import math
+import threading
+import time
+from collections import deque
+
+GUST_S = 3.0
+SHORT_S = 120.0
+LONG_S = 600.0
+
+
+class WindowMean:
+    """Running mean of speed and direction (unit vectors) over ``window_s``."""
+
+    def __init__(self, window_s):
+        self.window_s = window_s
+        self._samples = deque()
+        self._speed = 0.0
+        self._sin = 0.0
+        self._cos = 0.0
+        self._dir_count = 0
+
+    def push(self, t, speed, sin_d=None, cos_d=None):
+        self._samples.append((t, speed, sin_d, cos_d))
+        self._speed += speed
+        if sin_d is not None:
+            self._sin += sin_d
+            self._cos += cos_d
+            self._dir_count += 1
+        self.expire(t)
+
+    def expire(self, now):
+        cutoff = now - self.window_s
+        samples = self._samples
+        while samples and samples[0][0] <= cutoff:
+            _, speed, sin_d, cos_d = samples.popleft()
+            self._speed -= speed
+            if sin_d is not None:
+                self._sin -= sin_d
+                self._cos -= cos_d
+                self._dir_count -= 1
+        if not samples:
+            # Reset so floating-point residue can't build up across gaps
+            self._speed = self._sin = self._cos = 0.0
+
+    def __len__(self):
+        return len(self._samples)
+
+    @property
+    def speed(self):
+        return self._speed / len(self._samples) if self._samples else None
+
+    def direction(self):
+        """(vector mean direction, Yamartino std dev) in degrees, or (None, None)."""
+        n = self._dir_count
+        if n == 0:
+            return None, None
+        s, c = self._sin / n, self._cos / n
+        r2 = s * s + c * c
+        if r2 < 1e-12:
+            return None, None  # directions cancel out
+        mean = math.degrees(math.atan2(s, c)) % 360.0
+        eps = math.sqrt(max(0.0, 1.0 - r2))
+        std = math.degrees(math.asin(min(1.0, eps)) * (1.0 + (2.0 / math.sqrt(3.0) - 1.0) * eps ** 3))
+        return mean, std
+
+
+class WindowMax:
+    """Maximum over ``window_s`` via a monotonic deque (front is the max)."""
+
+    def __init__(self, window_s):
+        self.window_s = window_s
+        self._q = deque()  # (t, value, wall_time), values decreasing
+
+    def push(self, t, value, wall=None):
+        q = self._q
+        while q and q[-1][1] <= value:
+            q.pop()
+        q.append((t, value, wall))
+        self.expire(t)
+
+    def expire(self, now):
+        cutoff = now - self.window_s
+        while self._q and self._q[0][0] <= cutoff:
+            self._q.popleft()
+
+    def peak(self):
+        """(value, wall_time) of the maximum, or (None, None)."""
+        if not self._q:
+            return None, None
+        _, value, wall = self._q[0]
+        return value, wall
+
+
+class WindStats:
+    def __init__(self, gust_s=GUST_S, short_s=SHORT_S, long_s=LONG_S, min_gust_samples=3):
+        """``min_gust_samples``: how many samples a 3 s mean needs before it
+        counts towards the gust (so one frame after a gap is not a gust).
+        """
+        self.gust = WindowMean(gust_s)
+        self.short = WindowMean(short_s)
+        self.long = WindowMean(long_s)
+        self.peak = WindowMax(long_s)
+        self.min_gust_samples = min_gust_samples
+        self.updates = 0
+        self._last_t = None
+        self._lock = threading.Lock()
+
+    def update(self, speed_kph, direction_deg=None, t=None, wall=None):
+        """Add one sample. ``direction_deg`` None (unknown, or calm) only skips direction."""
+        if speed_kph is None:
+            return
+        t = time.monotonic() if t is None else t
+        wall = time.time() if wall is None else wall
+        if direction_deg is not None and speed_kph > 0:
+            rad = math.radians(direction_deg)
+            sin_d, cos_d = math.sin(rad), math.cos(rad)
+        else:
+            sin_d = cos_d = None
+        with self._lock:
+            self.gust.push(t, speed_kph)
+            self.short.push(t, speed_kph, sin_d, cos_d)
+            self.long.push(t, speed_kph, sin_d, cos_d)
+            if len(self.gust) >= self.min_gust_samples:
+                self.peak.push(t, self.gust.speed, wall)
+            self._last_t = t
+            self.updates += 1
+
+    def read(self, now=None):
+        """Snapshot values; {} until the first sample."""
+        if self._last_t is None:
+            return {}
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            for window in (self.gust, self.short, self.long, self.peak):
+                window.expire(now)
+            dir_2min, _ = self.short.direction()
+            dir_10min, dir_std = self.long.direction()
+            gust, gust_wall = self.peak.peak()
+            speeds = self.gust.speed, self.short.speed, self.long.speed
+        return {
+            "wind_3s_kph": _round(speeds[0]),
+            "wind_2min_kph": _round(speeds[1]),
+            "wind_10min_kph": _round(speeds[2]),
+            "gust_kph": _round(gust),
+            "gust_time": gust_wall,
+            "wind_dir_2min_deg": _round(dir_2min),
+            "wind_dir_10min_deg": _round(dir_10min),
+            "wind_dir_std_deg": _round(dir_std),
+        }
+
+
+def _round(value):
+    return None if value is None else round(value, 1)
@@ -0,0 +1,75 @@
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from stormpod.acquisition import AcquisitionEngine, Snapshot
+
+
+def test_snapshot_merge_order_and_ttl():
+    snap = Snapshot()
+    snap.register("gps")
+    snap.register("imu")
+    snap.register("lightning", ttl=0.05)
+    snap.publish("imu", {"heading_deg": 90.0})
+    snap.publish("gps", {"heading_deg": 10.0, "fix": True})
+    snap.publish("lightning", {"lightning": True})
+
+    merged = snap.merged()
+    assert merged["heading_deg"] == 90.0
+    assert merged["fix"] is True
+    assert merged["lightning"] is True
+
+    time.sleep(0.06)
+    assert "lightning" not in snap.merged()
+
+
+def test_slow_sensor_does_not_block_snapshot():
+    release = threading.Event()
+
+    def slow_read():
+        release.wait(2.0)
+        return {"lat": 1.0}
+
+    engine = AcquisitionEngine()
+    engine.add_reader("gps", slow_read, interval=0.0)
+    engine.add_reader("can", lambda: {"temp_C": 21.5}, interval=0.01)
+    engine.start()
+    try:
+        deadline = time.time() + 1.0
+        while "temp_C" not in engine.snapshot.merged() and time.time() < deadline:
+            time.sleep(0.01)
+
+        start = time.perf_counter()
+        merged = engine.snapshot.merged()
+        elapsed = time.perf_counter() - start
+
+        assert merged["temp_C"] == 21.5
+        assert "lat" not in merged
+        assert elapsed < 0.01
+    finally:
+        release.set()
+        engine.stop()
+
+
+def test_reader_survives_errors():
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) == 1:
+            raise OSError("bus off")
+        return {"temp_C": 1.0}
+
+    engine = AcquisitionEngine()
+    reader = engine.add_reader("can", flaky, interval=0.01)
+    engine.start()
+    try:
+        deadline = time.time() + 1.0
+        while "temp_C" not in engine.snapshot.merged() and time.time() < deadline:
+            time.sleep(0.01)
+        assert reader.errors == 1
+        assert engine.snapshot.merged()["temp_C"] == 1.0
+    finally:
+        engine.stop()
@@ -0,0 +1,122 @@
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from stormpod.alerts import compile_rules, load_engine
+
+
+def _names(active):
+    return [a["name"] for a in active]
+
+
+def test_default_rules_load_and_missing_fields_never_match():
+    engine = load_engine()
+    # The old check_alerts read a missing temperature as 0 °C
+    assert engine.evaluate({}, now=0.0) == []
+    assert engine.evaluate({"temp_C": None, "gust_kph": None}, now=100.0) == []
+
+
+def test_several_alerts_active_by_priority():
+    engine = load_engine()
+    data = {"lightning": True, "distance_km": 14, "wind_2min_kph": 65.0, "gust_kph": 95.0,
+            "noise": True}
+    active = engine.evaluate(data, now=0.0)
+    assert _names(active) == ["lightning", "high_wind", "em_noise"]
+    assert active[0]["message"] == "⚡ LIGHTNING DETECTED - 14 km"
+    assert active[1]["message"] == "💨 HIGH WIND WARNING - 65 km/h, gusts 95 km/h"
+
+
+def test_hysteresis_and_clear_delay():
+    engine = compile_rules({"rules": [
+        {"name": "heat", "field": "temp_C", "above": 40, "clear": 38, "clear_for_s": 10},
+    ]})
+    assert _names(engine.evaluate({"temp_C": 40.5}, now=0.0)) == ["heat"]
+    # Below the threshold but above clear: stays on
+    assert _names(engine.evaluate({"temp_C": 39.0}, now=1.0)) == ["heat"]
+    # Under clear, but not for clear_for_s yet
+    assert _names(engine.evaluate({"temp_C": 37.0}, now=2.0)) == ["heat"]
+    assert _names(engine.evaluate({"temp_C": 37.0}, now=11.0)) == ["heat"]
+    assert engine.evaluate({"temp_C": 37.0}, now=12.5) == []
+    # Back over clear (but under the threshold) does not re-raise
+    assert engine.evaluate({"temp_C": 39.0}, now=13.0) == []
+
+
+def test_minimum_duration_and_blips():
+    engine = compile_rules({"rules": [
+        {"name": "cold", "field": "temp_C", "below": -20, "for_s": 30, "message": "{temp_C:.1f}"},
+    ]})
+    assert engine.evaluate({"temp_C": -21.0}, now=0.0) == []
+    # A blip back over the threshold restarts the timer
+    engine.evaluate({"temp_C": -19.0}, now=10.0)
+    engine.evaluate({"temp_C": -22.0}, now=20.0)
+    assert engine.evaluate({"temp_C": -22.0}, now=45.0) == []
+    # Raises on time even though no field changed
+    active = engine.evaluate({"temp_C": -22.0}, now=50.0)
+    assert _names(active) == ["cold"] and active[0]["message"] == "-22.0"
+
+
+def test_only_rules_a_change_can_flip_are_checked():
+    engine = compile_rules({"rules": [
+        {"name": f"r{i}", "field": f"f{i % 10}", "above": i} for i in range(100)
+    ]})
+    data = {f"f{i}": 0.0 for i in range(10)}
+    engine.evaluate(data, now=0.0)
+    assert engine.checks == 100
+    engine.evaluate(data, now=1.0)
+    assert engine.checks == 100
+    data["f3"] = 1.0  # crosses nothing (f3 rules start at 3)
+    engine.evaluate(data, now=2.0)
+    assert engine.checks == 100
+    data["f3"] = 50.0  # crosses 3, 13, 23, 33 and 43
+    assert len(engine.evaluate(data, now=3.0)) == 5
+    assert engine.checks == 105
+    data["f3"] = 0.0
+    assert engine.evaluate(data, now=4.0) == []
+    assert engine.checks == 110
+
+
+def test_indexed_evaluation_matches_checking_every_rule():
+    rng = random.Random(3)
+    config = {"rules": []}
+    for i in range(60):
+        field = f"f{i % 4}"
+        spec = rng.choice([
+            {"field": field, "above": i % 20, "clear": i % 20 - 3, "clear_for_s": 2},
+            {"field": field, "below": -(i % 20), "clear": -(i % 20) + 2, "for_s": 1},
+            {"any": [{"field": field, "above": i % 15}, {"field": "f9", "below": -5}]},
+            {"field": "flag", "equals": True},
+        ])
+        spec.update(name=f"r{i}", priority=i % 5, message=f"{{{field}}} {{f9}}")
+        config["rules"].append(spec)
+    engine, reference = compile_rules(config), compile_rules(config)
+    data = {}
+    for t in range(400):
+        for field in rng.sample(["f0", "f1", "f2", "f3", "f9", "flag"], 2):
+            data[field] = rng.choice([None, True, rng.uniform(-25, 25), round(rng.uniform(-25, 25))])
+        # Forgetting every field makes the reference re-check every rule
+        reference._last = dict.fromkeys(reference._last, object())
+        assert engine.evaluate(data, now=t * 0.5) == reference.evaluate(data, now=t * 0.5)
+
+
+def test_message_with_missing_field():
+    engine = compile_rules({"rules": [
+        {"name": "wind", "any": [{"field": "gust_kph", "above": 90}, {"field": "w", "above": 60}],
+         "message": "{w:.0f} / {gust_kph:.0f}"},
+    ]})
+    assert engine.evaluate({"gust_kph": 99.0}, now=0.0)[0]["message"] == "-- / 99"
+
+
+@pytest.mark.parametrize("rule", [
+    {"name": "x", "field": "a"},
+    {"name": "x", "field": "a", "above": 1, "below": 0},
+    {"name": "x", "field": "a", "above": 10, "clear": 12},
+    {"name": "x", "field": "a", "equals": 1, "clear": 0},
+    {"name": "x", "field": "a", "above": 1, "typo": 2},
+    {"field": "a", "above": 1},
+])
+def test_bad_rules_are_rejected(rule):
+    with pytest.raises(ValueError):
+        compile_rules({"rules": [rule]})
@@ -0,0 +1,28 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from benchmarks.run import compare, direction, flatten
+
+
+def test_flatten_keeps_numbers_only():
+    flat = flatten({"can": {"decode": {"us_per_frame": 3, "ok": True}, "note": "x"}, "n": 2})
+    assert flat == {"can.decode.us_per_frame": 3.0, "n": 2.0}
+
+
+def test_direction_of_metric_names():
+    assert direction("can.decode.frames_per_s") == 1
+    assert direction("gps.parse_line_us_per_sentence") == -1
+    assert direction("trends.blit.frame_ms_median") == -1
+    assert direction("imu.quat_to_yaw_us") == -1
+    assert direction("binlog.csv_bytes") == 0
+
+
+def test_compare_flags_only_real_regressions():
+    base = {"a.rows_per_s": 1000.0, "a.caller_us": 10.0, "a.rows": 5.0}
+    now = {"a.rows_per_s": 800.0, "a.caller_us": 10.5, "a.rows": 50.0, "new.x_us": 1.0}
+    rows = {r[0]: r for r in compare(base, now, threshold=0.15)}
+    assert set(rows) == {"a.rows_per_s", "a.caller_us", "a.rows"}
+    assert rows["a.rows_per_s"][4] is True
+    assert rows["a.caller_us"][4] is False
+    assert rows["a.rows"][4] is False
@@ -0,0 +1,103 @@
+import csv
+import math
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from stormpod.binlog import BinaryLogger, MISSING_INT, binary_to_csv, csv_to_binary, read_binary_log
+from stormpod.logger import BufferedLogger, HEADERS
+
+
+def test_write_and_mmap_read(tmp_path):
+    path = tmp_path / "log.bin"
+    log = BinaryLogger(str(path), background=False, flush_rows=2)
+    log.log({"time_utc": "083000", "temp_C": 18.5, "fix": True, "lat": 43.6532123, "lon": -79.3832})
+    log.log({"time_utc": "083001", "temp_C": None, "fix": False, "wind_raw": 412})
+    log.log({"time_utc": "083002", "lightning": True, "distance_km": 12})
+    log.close()
+
+    records = read_binary_log(str(path))
+    assert len(records) == 3
+    assert list(records["time_utc"]) == [83000, 83001, 83002]
+    assert records["temp_C"][0] == pytest.approx(18.5)
+    assert math.isnan(records["temp_C"][1])
+    assert records["lat"][0] == 43.6532123
+    assert list(records["fix"]) == [1, 0, MISSING_INT]
+    assert list(records["wind_raw"]) == [MISSING_INT, 412, MISSING_INT]
+    assert records["distance_km"][2] == 12
+    # Unscaled columns are views onto the mapped file, not copies
+    assert not records["time_utc"].flags.owndata
+    assert records.records["temp_C"][0] == 1850
+
+
+def test_bad_values_are_stored_as_missing(tmp_path):
+    path = tmp_path / "log.bin"
+    log = BinaryLogger(str(path), background=False)
+    log.log({"time_utc": "083000", "temp_C": "n/a", "wind_raw": 99999, "lat": 43.65, "fix": "yes"})
+    log.log({"time_utc": "083001", "temp_C": 1e9, "lat": math.nan})
+    log.close()
+
+    assert log.bad_values == 4
+    records = read_binary_log(str(path))
+    assert len(records) == 2  # the rows are kept
+    assert np.isnan(records["temp_C"]).all()
+    assert records["wind_raw"][0] == MISSING_INT
+    assert records["fix"][0] == MISSING_INT
+    assert records["lat"][0] == 43.65
+    assert np.isnan(records["lat"][1])
+
+
+def test_scaled_columns_keep_their_precision(tmp_path):
+    path = tmp_path / "log.bin"
+    log = BinaryLogger(str(path), background=False)
+    log.log({"temp_C": -0.01, "pressure_hPa": 1013.25, "heading_deg": 359.9, "lon": -79.3832107})
+    log.close()
+
+    records = read_binary_log(str(path))
+    assert records["temp_C"][0] == -0.01
+    assert records["pressure_hPa"][0] == 1013.25
+    assert records["heading_deg"][0] == 359.9
+    assert records["lon"][0] == -79.3832107
+    assert records.records.dtype.itemsize == 48  # 76 as float32/float64 columns
+
+
+def test_truncated_record_is_ignored(tmp_path):
+    path = tmp_path / "log.bin"
+    log = BinaryLogger(str(path), background=False)
+    for i in range(5):
+        log.log({"time_utc": i})
+    log.close()
+    with open(path, "ab") as f:
+        f.write(b"\x01\x02\x03")
+    assert len(read_binary_log(str(path))) == 5
+
+
+def test_csv_round_trip(tmp_path):
+    src = tmp_path / "log.csv"
+    log = BufferedLogger(str(src), background=False)
+    log.log({"time_utc": "235959", "temp_C": 21.3, "humidity_%": 65.2, "pressure_hPa": 1013.2,
+             "wind_raw": 300, "speed_kph": 12.5, "fix": True, "lat": 43.6532, "lon": -79.3832,
+             "heading_deg": 225.0})
+    log.log({"time_utc": "000000", "lightning": True, "distance_km": 8})
+    log.close()
+
+    bin_path = tmp_path / "log.bin"
+    assert csv_to_binary(str(src), str(bin_path)) == 2
+    back = tmp_path / "back.csv"
+    assert binary_to_csv(str(bin_path), str(back)) == 2
+
+    with open(src, newline="") as f:
+        original = list(csv.DictReader(f))
+    with open(back, newline="") as f:
+        restored = list(csv.DictReader(f))
+    for a, b in zip(original, restored):
+        for key in HEADERS:
+            if a[key] and a[key] not in ("True", "False") and key != "time_utc":
+                assert float(b[key]) == pytest.approx(float(a[key]), rel=1e-6)
+            else:
+                assert b[key] == a[key]
+    assert os.path.getsize(bin_path) < 2 * os.path.getsize(src) + 512
+    assert np.isnan(read_binary_log(str(bin_path))["temp_C"][1])
@@ -0,0 +1,67 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from stormpod.can_frames import compile_schema, load_registry
+
+
+def _wind_kph(wind_raw):
+    # Reference: the hand-written decoder CANReceiver used before the schema
+    volts = min((wind_raw / 1023.0) * 3.3, 2.2)
+    if volts <= 0.4:
+        return 0.0
+    return round((volts - 0.4) * (116.6 / (2.0 - 0.4)), 1)
+
+
+def test_default_schema_matches_firmware_encoding():
+    registry = load_registry()
+    assert registry.can_ids == (0x10, 0x11)
+
+    atmos = registry.decode(0x10, bytes([0x00, 0xCD, 0x01, 0xC2, 0x27, 0x92]))
+    assert atmos == {"temp_C": 20.5, "humidity_%": 45.0, "pressure_hPa": 1013.0}
+
+    for raw in (0, 100, 124, 512, 700, 1023):
+        wind = registry.decode(0x11, bytes([0x0E, 0x10, raw >> 8, raw & 0xFF]))
+        assert wind["angle_deg"] == 360.0
+        assert wind["wind_raw"] == raw
+        assert wind["wind_volts"] == round(min(raw / 1023.0 * 3.3, 2.2), 3)
+        assert wind["speed_kph"] == _wind_kph(raw)
+
+
+def test_wrong_length_and_unknown_id_are_ignored():
+    registry = load_registry()
+    assert registry.decode(0x10, bytes(4)) is None
+    assert registry.decode(0x7FF, bytes(8)) is None
+
+
+def test_batch_decode_matches_scalar_path():
+    registry = load_registry()
+    rng = np.random.default_rng(1)
+    frames = []
+    for i, raw in enumerate(rng.integers(0, 1024, size=200)):
+        angle = int(rng.integers(0, 3600))
+        frames.append((0x11, bytes([angle >> 8, angle & 0xFF, raw >> 8, raw & 0xFF]), float(i)))
+    frames.append((0x10, bytes([0x00, 0xCD, 0x01, 0xC2, 0x27, 0x92]), 5.0))
+    frames.append((0x11, bytes(3), 6.0))
+
+    batch = registry.decode_batch(frames)
+    wind = batch["wind"]
+    assert len(wind["timestamp"]) == 200
+    for i, (arb_id, data, _) in enumerate(frames[:200]):
+        expected = registry.decode(arb_id, data)
+        for key, value in expected.items():
+            # Batch output is unrounded; scalar output is rounded for display
+            assert wind[key][i] == pytest.approx(value, abs=0.05)
+    assert batch["atmos"]["pressure_hPa"][0] == pytest.approx(1013.0)
+
+
+def test_new_frame_from_schema():
+    registry = compile_schema({"frames": {"0x20": {
+        "name": "rain",
+        "format": "<hB",
+        "signals": [{"name": "rain_mm", "scale": 0.2}, "tips"],
+    }}})
+    assert registry.decode(0x20, bytes([0x05, 0x00, 0x03])) == {"rain_mm": pytest.approx(1.0), "tips": 3}
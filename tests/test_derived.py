@@ -0,0 +1,120 @@
+import math
+import os
+import random
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from stormpod.binlog import BinaryLogger
+from stormpod.logger import BufferedLogger
+from stormpod.derived import (Derived, backfill, derive_batch, dew_point, heat_index,
+                              pressure_altitude, sea_level_pressure, utc_seconds, wind_chill)
+
+
+def test_reference_values():
+    assert dew_point(20.0, 50.0) == pytest.approx(9.3, abs=0.1)
+    assert dew_point(20.0, 100.0) == pytest.approx(20.0)
+    assert heat_index(32.2, 70.0) == pytest.approx(41.1, abs=0.5)  # NWS table: 90 °F, 70 % -> 106 °F
+    assert heat_index(20.0, 70.0) is None
+    assert wind_chill(-10.0, 20.0) == pytest.approx(-17.9, abs=0.1)  # Environment Canada table
+    assert wind_chill(15.0, 20.0) is None and wind_chill(-10.0, 3.0) is None
+    assert pressure_altitude(1013.25) == pytest.approx(0.0)
+    assert pressure_altitude(898.76) == pytest.approx(1000.0, abs=1.0)  # ISA at 1 km
+    assert sea_level_pressure(1000.0, 100.0, 15.0) == pytest.approx(1011.9, abs=0.2)
+
+
+def test_stage_fills_snapshot_and_caches():
+    derived = Derived()
+    sample = {"temp_C": 20.0, "humidity_%": 50.0, "pressure_hPa": 898.76}
+    for i in range(10):
+        data = derived.apply(dict(sample), t=float(i))
+    assert data["dew_point_C"] == 9.3 and data["altitude_m"] == 1000.0
+    assert data["heat_index_C"] is None and data["sea_level_pressure_hPa"] is None
+    assert derived.dew_point.misses == 1 and derived.altitude.misses == 1
+
+
+def test_tendency_windows():
+    derived = Derived()
+    # Falling 1 hPa/h for 3 h, sampled every 10 s
+    for i in range(3 * 360 + 1):
+        t = i * 10.0
+        data = derived.apply({"pressure_hPa": 1010.0 - t / 3600}, t=t)
+    assert data["pressure_tendency_1h_hPa"] == pytest.approx(-1.0, abs=0.05)
+    assert data["pressure_tendency_3h_hPa"] == pytest.approx(-3.0, abs=0.05)
+
+    # Not enough history yet
+    fresh = Derived()
+    assert fresh.apply({"pressure_hPa": 1000.0}, t=0.0)["pressure_tendency_1h_hPa"] is None
+
+
+def _station_pressure(slp, alt, temp):
+    return slp / sea_level_pressure(1.0, alt, temp)
+
+
+def test_tendency_uses_sea_level_pressure_while_climbing():
+    derived = Derived()
+    for i in range(361):
+        t = i * 10.0
+        alt = t / 3600 * 300.0  # climb 300 m in an hour in a steady atmosphere
+        p = _station_pressure(1013.0, alt, 15.0)
+        data = derived.apply({"pressure_hPa": p, "temp_C": 15.0, "fix": True, "gps_alt_m": alt}, t=t)
+    assert data["pressure_tendency_1h_hPa"] == pytest.approx(0.0, abs=0.1)
+    assert derived.tendency.change(3600, 3600.0) < -30  # station pressure fell a lot
+
+
+def test_batch_matches_scalar():
+    rng = random.Random(3)
+    rows = [(rng.uniform(-30, 45), rng.uniform(5, 100), rng.uniform(850, 1040),
+             rng.uniform(0, 60), rng.uniform(0, 1500)) for _ in range(500)]
+    temp, rh, p, wind, alt = (np.array(c) for c in zip(*rows))
+    out = derive_batch(temp, rh, p, wind, alt)
+    for i, (t, h, pr, w, a) in enumerate(rows):
+        for key, value in (("dew_point_C", dew_point(t, h)), ("heat_index_C", heat_index(t, h)),
+                           ("wind_chill_C", wind_chill(t, w)), ("altitude_m", pressure_altitude(pr)),
+                           ("sea_level_pressure_hPa", sea_level_pressure(pr, a, t))):
+            if value is None:
+                assert math.isnan(out[key][i]), key
+            else:
+                assert out[key][i] == pytest.approx(value, abs=0.51 if key == "altitude_m" else 0.051), key
+
+
+def test_backfill_binary_log_across_midnight(tmp_path):
+    assert list(utc_seconds([235959, 0, 1])) == [86399, 86400, 86401]
+
+    path = str(tmp_path / "log.bin")
+    log = BinaryLogger(path, background=False, flush_rows=1000)
+    start = 22 * 3600
+    for i in range(0, 3 * 3600, 60):
+        s = (start + i) % 86400
+        hhmmss = f"{s // 3600:02d}{s // 60 % 60:02d}{s % 60:02d}"
+        log.log({"time_utc": hhmmss, "temp_C": 20.0, "humidity_%": 50.0,
+                 "pressure_hPa": 1000.0 + i / 3600})
+    log.close()
+
+    result = backfill(path, str(tmp_path / "derived.csv"))
+    assert np.allclose(result["dew_point_C"], 9.3)
+    assert np.isnan(result["pressure_tendency_1h_hPa"][:55]).all()
+    assert result["pressure_tendency_1h_hPa"][-1] == pytest.approx(1.0)
+    assert (tmp_path / "derived.csv").read_text().splitlines()[0].startswith("time_utc,dew_point_C")
+
+
+def test_backfill_csv_log(tmp_path):
+    path = str(tmp_path / "log.csv")
+    log = BufferedLogger(path, background=False, flush_rows=100)
+    for i in range(60):
+        log.log({"time_utc": f"{120000 + i:06d}", "temp_C": 20.0, "humidity_%": 50.0,
+                 "pressure_hPa": 1000.0, "fix": i % 2 == 0, "gps_alt_m": 250.0,
+                 "lightning": False})
+    log.close()
+
+    result = backfill(path)
+    assert np.allclose(result["dew_point_C"], 9.3)
+    assert np.allclose(result["altitude_m"], 111.0)
+    # Sea-level pressure only where the altitude came with a fix, as live
+    live = Derived().apply({"temp_C": 20.0, "humidity_%": 50.0, "pressure_hPa": 1000.0,
+                            "fix": True, "gps_alt_m": 250.0})
+    slp = result["sea_level_pressure_hPa"]
+    assert np.allclose(slp[0::2], live["sea_level_pressure_hPa"])
+    assert np.isnan(slp[1::2]).all()
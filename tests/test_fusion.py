@@ -0,0 +1,62 @@
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from stormpod.fusion import HeadingFusion, wrap180
+
+
+def _drive(fusion, true_heading, imu_offset, seconds, speed_kph=50.0, t0=0.0, noise=3.0):
+    """100 Hz IMU with a constant offset, 10 Hz noisy GPS course."""
+    rng = random.Random(1)
+    t = t0
+    for i in range(int(seconds * 100)):
+        t = t0 + i / 100
+        fusion.update_imu((true_heading + imu_offset) % 360, t)
+        if i % 10 == 0:
+            fusion.update_gps((true_heading + rng.gauss(0, noise)) % 360, speed_kph, t)
+    return t
+
+
+def test_bias_converges_to_the_imu_offset():
+    fusion = HeadingFusion()
+    t = _drive(fusion, true_heading=350.0, imu_offset=12.0, seconds=30)
+    heading, source = fusion.heading(t)
+    assert source == "fused"
+    assert abs(wrap180(heading - 350.0)) < 1.0
+    assert fusion.bias == pytest.approx(-12.0, abs=1.0)
+    assert fusion.stats()["bias_sigma_deg"] < 1.0
+
+
+def test_gps_is_ignored_when_slow_or_turning():
+    fusion = HeadingFusion()
+    _drive(fusion, true_heading=90.0, imu_offset=5.0, seconds=5, speed_kph=3.0)
+    assert fusion.gps_used == 0
+    assert fusion.heading(5.0) == (95.0, "imu")
+
+    # A 30 deg/s turn: the course lags, so it must not pull the bias
+    turning = HeadingFusion()
+    for i in range(300):
+        t = i / 100
+        turning.update_imu((90.0 + 30.0 * t) % 360, t)
+        if i % 10 == 0 and i > 20:
+            assert not turning.update_gps(90.0, 50.0, t)
+    assert turning.gps_rejected > 0 and turning.bias_var is None
+
+
+def test_imu_smoothing_wraps_through_north():
+    fusion = HeadingFusion(smooth_s=0.05)
+    for i in range(100):
+        fusion.update_imu(359.0 if i % 2 else 1.0, i / 100)
+    heading, _ = fusion.heading(1.0)
+    assert abs(wrap180(heading)) < 1.0
+
+
+def test_falls_back_to_gps_course_without_imu():
+    fusion = HeadingFusion()
+    assert fusion.read() == {}
+    fusion.update_gps(123.4, 40.0, t=10.0)
+    assert fusion.heading(10.5) == (123.4, "gps")
+    assert fusion.heading(20.0) == (None, None)
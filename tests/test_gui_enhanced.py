@@ -0,0 +1,35 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import gui_enhanced
+from gui_enhanced import EnhancedStormPODGUI
+
+
+class _Label:
+    labels = []
+
+    def __init__(self, parent, **options):
+        self.options = options
+        _Label.labels.append(self)
+
+    def pack(self, **options):
+        pass
+
+
+def test_trends_tab_says_unavailable_without_matplotlib(monkeypatch):
+    gui = EnhancedStormPODGUI.__new__(EnhancedStormPODGUI)
+    gui.trends_frame = object()
+    gui.trend_plot = None
+    gui.trends_unavailable = False
+    gui.trends_visible = lambda: True
+    monkeypatch.setitem(sys.modules, "matplotlib", None)
+    monkeypatch.setitem(sys.modules, "matplotlib.pyplot", None)
+    monkeypatch.setattr(gui_enhanced.tk, "Label", _Label)
+
+    gui._on_tab_changed()
+    gui._on_tab_changed()  # coming back to the tab does not retry or stack labels
+    assert gui.trends_unavailable
+    assert len(_Label.labels) == 1
+    assert _Label.labels[0].options["text"].startswith("📈 Trends unavailable")
+    assert gui.trend_plot is None
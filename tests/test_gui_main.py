@@ -0,0 +1,31 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from stormpod.gui_main import StormPODGUI, panel_state
+from stormpod.sensor_manager import FAILED, READY, STALE
+
+
+class _Manager:
+    def __init__(self, **states):
+        self.states = states
+
+    def sensor_state(self, name):
+        return self.states.get(name, READY)
+
+
+def test_heading_panel_follows_the_snapshot_not_the_imu():
+    manager = _Manager(imu=FAILED)
+    gps_heading = {"heading_deg": 225.0, "heading_source": "gps"}
+    assert panel_state(manager, "heading", gps_heading) == READY
+    # No heading yet, but the GPS can still provide one
+    assert panel_state(manager, "heading", {}) == READY
+    assert panel_state(_Manager(imu=FAILED, gps=STALE), "heading", {}) == FAILED
+    assert panel_state(manager, "imu", gps_heading) == FAILED
+
+
+def test_basic_gui_shows_gps_course_with_the_imu_down():
+    gui = StormPODGUI.__new__(StormPODGUI)
+    gui.manager = _Manager(imu=FAILED)
+    fields = gui.format_fields({"heading_deg": 225.0, "heading_source": "gps"})
+    assert fields["heading"] == "Heading: 225.0° SW (GPS course)"
@@ -0,0 +1,181 @@
+import json
+import os
+import socket
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from stormpod.ipc import EventPublisher, EventSubscriber, StatusFileShim
+from stormpod.sensors.sensor_as3935 import AS3935RemoteSensor
+
+
+def _wait_for(cond, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not cond():
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+
+
+def _connected(sub, pub, n=1):
+    # A recv() with nothing published just completes the handshake
+    sub.recv(timeout=0.05)
+    _wait_for(lambda: pub.subscribers >= n)
+
+
+def test_fan_out_to_several_subscribers_in_order(tmp_path):
+    pub = EventPublisher(str(tmp_path / "l.sock"))
+    subs = [EventSubscriber(pub.path) for _ in range(3)]
+    for i, sub in enumerate(subs):
+        _connected(sub, pub, i + 1)
+
+    for km in range(20):
+        pub.publish({"type": "Lightning", "distance_km": km})
+
+    for sub in subs:
+        got = [sub.recv(timeout=1.0) for _ in range(20)]
+        assert [e["distance_km"] for e in got] == list(range(20))
+        assert [e["seq"] for e in got] == list(range(1, 21))
+        assert sub.lost == 0
+        sub.close()
+    pub.close()
+    assert not os.path.exists(pub.path)
+
+
+def test_burst_is_not_overwritten(tmp_path):
+    pub = EventPublisher(str(tmp_path / "l.sock"))
+    sub = EventSubscriber(pub.path)
+    _connected(sub, pub)
+    for _ in range(500):
+        pub.publish({"type": "Noise"})
+    _wait_for(lambda: len(sub.drain()) == 500 or sub.last_seq == 500)
+    assert sub.last_seq == 500 and sub.lost == 0
+    sub.close()
+    pub.close()
+
+
+def test_resume_after_disconnect_replays_missed_events(tmp_path):
+    pub = EventPublisher(str(tmp_path / "l.sock"), history=100)
+    sub = EventSubscriber(pub.path, reconnect_delay=0.01)
+    _connected(sub, pub)
+    pub.publish({"n": 1})
+    assert sub.recv(timeout=1.0)["n"] == 1
+
+    sub.close()  # consumer restarts while events keep coming
+    for n in range(2, 6):
+        pub.publish({"n": n})
+
+    assert [sub.recv(timeout=1.0)["n"] for _ in range(4)] == [2, 3, 4, 5]
+    assert sub.lost == 0
+
+    # A subscriber that starts late can ask for everything still in history
+    late = EventSubscriber(pub.path, since=0)
+    assert [late.recv(timeout=1.0)["seq"] for _ in range(5)] == [1, 2, 3, 4, 5]
+    late.close()
+    sub.close()
+    pub.close()
+
+
+def test_resume_across_publisher_restart(tmp_path):
+    path = str(tmp_path / "l.sock")
+    pub = EventPublisher(path)
+    sub = EventSubscriber(path, reconnect_delay=0.01)
+    _connected(sub, pub)
+    for n in range(3):
+        pub.publish({"n": n})
+    assert [sub.recv(timeout=1.0)["seq"] for _ in range(3)] == [1, 2, 3]
+
+    # The listener restarts and publishes before the subscriber is back
+    pub.close()
+    time.sleep(0.01)
+    pub = EventPublisher(path)
+    pub.publish({"n": "a"})
+    pub.publish({"n": "b"})
+    got = [sub.recv(timeout=2.0) for _ in range(2)]
+    assert [e["n"] for e in got] == ["a", "b"]
+    assert sub.epoch == pub.epoch and sub.lost == 0
+    sub.close()
+    pub.close()
+
+
+def test_stuck_subscriber_never_blocks_publish(tmp_path):
+    pub = EventPublisher(str(tmp_path / "l.sock"), max_backlog=64 * 1024)
+    stuck = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stuck.connect(pub.path)
+    stuck.sendall(b"SINCE -1\n")  # and never reads
+    _wait_for(lambda: pub.subscribers == 1)
+
+    start = time.perf_counter()
+    for _ in range(2000):
+        pub.publish({"type": "Noise", "pad": "x" * 500})
+    assert time.perf_counter() - start < 0.5
+    # Once it is max_backlog behind it is cut loose; others carry on
+    _wait_for(lambda: pub.dropped_clients == 1 and pub.subscribers == 0)
+    sub = EventSubscriber(pub.path)
+    _connected(sub, pub)
+    pub.publish({"type": "Noise"})
+    assert sub.recv(timeout=1.0)["seq"] == 2001
+    stuck.close()
+    sub.close()
+    pub.close()
+
+
+def test_gap_beyond_history_is_counted(tmp_path):
+    pub = EventPublisher(str(tmp_path / "l.sock"), history=3)
+    for n in range(10):
+        pub.publish({"n": n})
+    sub = EventSubscriber(pub.path, since=2)
+    assert sub.recv(timeout=1.0)["seq"] == 8
+    assert sub.lost == 5
+    sub.close()
+    pub.close()
+
+
+def test_delivery_latency_is_sub_millisecond(tmp_path):
+    pub = EventPublisher(str(tmp_path / "l.sock"))
+    sub = EventSubscriber(pub.path)
+    _connected(sub, pub)
+    latencies = []
+    for _ in range(200):
+        t0 = time.perf_counter()
+        pub.publish({"t": t0})
+        sub.recv(timeout=1.0)
+        latencies.append(time.perf_counter() - t0)
+    latencies.sort()
+    assert latencies[len(latencies) // 2] < 0.001
+    sub.close()
+    pub.close()
+
+
+def test_status_file_shim_keeps_legacy_format(tmp_path):
+    pub = EventPublisher(str(tmp_path / "l.sock"))
+    status = tmp_path / "lightning_status.json"
+    shim = StatusFileShim(str(status), pub.path).start()
+    _wait_for(lambda: pub.subscribers == 1)
+
+    pub.publish({"type": "Lightning", "lightning": True, "distance_km": 12, "timestamp": 1.5})
+    _wait_for(status.exists)
+    assert json.loads(status.read_text()) == {"timestamp": 1.5, "lightning": True, "distance_km": 12}
+    assert os.stat(status).st_mode & 0o777 == 0o666
+    shim.stop()
+    pub.close()
+
+
+def test_remote_sensor_matches_local_summary(tmp_path):
+    pub = EventPublisher(str(tmp_path / "l.sock"))
+    sensor = AS3935RemoteSensor(pub.path)
+    assert sensor.read() == {}
+    _wait_for(lambda: pub.subscribers == 1)
+
+    now = time.time()
+    pub.publish({"type": "Lightning", "lightning": True, "distance_km": 14, "timestamp": now})
+    pub.publish({"type": "Disturber", "disturber": True, "timestamp": now})
+    reads = []
+    _wait_for(lambda: reads.append(sensor.read()) or sensor.subscriber.last_seq == 2)
+    reads = [r for r in reads if r]
+    assert sum(r["strike_count"] for r in reads) == 1
+    assert sum(r["disturber_count"] for r in reads) == 1
+    strike = next(r for r in reads if r["strike_count"])
+    assert strike["lightning"] is True and strike["distance_km"] == 14
+    assert reads[-1]["event_overflows"] == 0
+    sensor.close()
+    pub.close()
@@ -0,0 +1,89 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from stormpod.lightning_tracker import OUT_OF_RANGE_KM, StormTracker
+
+T0 = 1_700_000_000.0
+
+
+def _storm(tracker, start_km, kph, minutes, every_s=20.0, t0=T0):
+    """Strikes from one cell moving at ``kph`` (positive = closing)."""
+    t = t0
+    while t < t0 + minutes * 60:
+        tracker.add_strike(round(start_km - kph * (t - t0) / 3600.0), t)
+        t += every_s
+    return t
+
+
+def test_approaching_cell_closing_speed_and_eta():
+    tracker = StormTracker()
+    t = _storm(tracker, 40, 30.0, 20)
+    # One strike every 20 s, read right after the last one
+    assert tracker.read(now=t - 20.0)["strike_rate_1min"] == 3.0
+    out = tracker.read(now=t)
+    assert out["storm_cells"] == 1
+    assert out["storm_trend"] == "approaching"
+    assert out["storm_closing_kph"] == pytest.approx(30.0, abs=3.0)
+    assert out["storm_distance_km"] == pytest.approx(30.0, abs=1.5)
+    # 30 km -> 10 km at 30 km/h is 40 min
+    assert out["storm_eta_min"] == pytest.approx(40.0, abs=5.0)
+
+
+def test_departing_and_stationary():
+    tracker = StormTracker()
+    t = _storm(tracker, 15, -25.0, 20)
+    assert tracker.read(now=t)["storm_trend"] == "departing"
+    assert tracker.read(now=t)["storm_eta_min"] is None
+
+    tracker = StormTracker()
+    t = _storm(tracker, 20, 0.0, 20)
+    out = tracker.read(now=t)
+    assert out["storm_trend"] == "stationary" and out["storm_eta_min"] is None
+
+
+def test_too_few_strikes_gives_no_trend():
+    tracker = StormTracker()
+    for i in range(3):
+        tracker.add_strike(30, T0 + i * 60)
+    out = tracker.read(now=T0 + 180)
+    assert out["storm_distance_km"] == 30.0 and out["storm_trend"] is None
+
+
+def test_separate_cells_nearest_reported():
+    tracker = StormTracker()
+    t = T0
+    for i in range(50):
+        tracker.add_strike(35, t)
+        tracker.add_strike(round(12 - i * 0.05), t + 1)
+        t += 15
+    out = tracker.read(now=t)
+    assert out["storm_cells"] == 2
+    assert out["storm_distance_km"] < 12
+    assert sorted(c["strikes"] for c in tracker.cells_report(now=t)) == [50, 50]
+
+
+def test_out_of_range_strikes_count_but_do_not_fit():
+    tracker = StormTracker()
+    tracker.add_strike(OUT_OF_RANGE_KM, T0, lat=52.0, lon=-1.5)
+    out = tracker.read(now=T0 + 1)
+    assert out["storm_cells"] == 0 and out["storm_distance_km"] is None
+    assert out["strike_rate_1min"] == 1.0
+    assert tracker.history[0][2:4] == (52.0, -1.5)
+
+
+def test_cost_stays_bounded_and_cells_expire():
+    tracker = StormTracker(max_history=1000)
+    # 2000 strikes an hour for two hours
+    t = _storm(tracker, 40, 10.0, 120, every_s=1.8)
+    cell = tracker.cells[0]
+    assert len(cell) <= tracker.fit_window_s / 1.8 + 1
+    assert len(tracker.history) == 1000
+    assert tracker.read(now=t + 3600)["storm_cells"] == 0
+    assert tracker.read(now=t + 3600)["strike_rate_15min"] == 0.0
+
+
+def test_empty_before_first_strike():
+    assert StormTracker().read() == {}
@@ -0,0 +1,72 @@
+import csv
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from stormpod import logger
+from stormpod.logger import BufferedLogger
+
+
+def _rows(path):
+    with open(path, newline="") as f:
+        return list(csv.reader(f))
+
+
+def test_buffers_until_threshold(tmp_path):
+    path = tmp_path / "log.csv"
+    log = BufferedLogger(str(path), flush_rows=5, flush_interval=3600, fsync="none", background=False)
+    for i in range(4):
+        log.log({"time_utc": f"00000{i}", "temp_C": 20 + i})
+    assert _rows(path) == [logger.HEADERS]
+
+    log.log({"time_utc": "000004", "temp_C": 24})
+    rows = _rows(path)
+    assert len(rows) == 6
+    assert rows[-1][:2] == ["000004", "24"]
+    log.close()
+
+
+def test_background_writer_and_reopen_keeps_single_header(tmp_path):
+    path = tmp_path / "log.csv"
+    log = BufferedLogger(str(path), flush_rows=100, flush_interval=3600)
+    for i in range(250):
+        log.log({"time_utc": i, "lightning": True})
+    log.close()
+    assert log.rows_written == 250
+
+    log = BufferedLogger(str(path), background=False)
+    log.log({"time_utc": 250})
+    log.close()
+    rows = _rows(path)
+    assert rows.count(logger.HEADERS) == 1
+    assert len(rows) == 252
+
+
+def test_rotates_by_size(tmp_path):
+    path = tmp_path / "log.csv"
+    log = BufferedLogger(str(path), flush_rows=10, rotate_bytes=500, fsync="close", background=False)
+    for i in range(100):
+        log.log({"time_utc": i, "temp_C": 21.5, "pressure_hPa": 1013.2})
+    log.close()
+
+    files = sorted(p.name for p in tmp_path.iterdir())
+    assert log.rotations >= 1
+    assert len(files) == log.rotations + 1
+    total = 0
+    for name in files:
+        rows = _rows(tmp_path / name)
+        assert rows[0] == logger.HEADERS
+        total += len(rows) - 1
+    assert total == 100
+
+
+def test_existing_file_with_old_header_is_moved_aside(tmp_path):
+    path = tmp_path / "log.csv"
+    path.write_text("time_utc,temp_C\n000000,20\n")
+    log = BufferedLogger(str(path), background=False, flush_rows=1)
+    log.log({"time_utc": "000001", "temp_C": 21})
+    log.close()
+
+    assert _rows(path)[0] == logger.HEADERS and len(_rows(path)) == 2
+    archived = [p for p in tmp_path.iterdir() if p.name != "log.csv"]
+    assert len(archived) == 1 and _rows(archived[0])[0] == ["time_utc", "temp_C"]
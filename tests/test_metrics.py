@@ -0,0 +1,106 @@
+import os
+import sys
+import urllib.error
+import urllib.request
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from stormpod import metrics
+from stormpod.metrics import Digest, MetricsServer, Registry
+from stormpod.sensors.sensor_gps import GPSSensor
+
+
+def test_exposition_format():
+    reg = Registry()
+    frames = reg.counter("x_frames_total", "Frames\nreceived")
+    frames.inc(3)
+    errors = reg.counter("x_errors_total", "Errors", ["kind"])
+    errors.labels(kind='bad "crc"').inc()
+    reg.gauge("x_depth", "Queue depth").set(2.5)
+    hist = reg.histogram("x_seconds", "Latency", buckets=(0.01, 0.1))
+    for v in (0.005, 0.05, 0.05, 3.0):
+        hist.observe(v)
+
+    text = reg.expose()
+    assert "# HELP x_frames_total Frames\\nreceived\n# TYPE x_frames_total counter\nx_frames_total 3\n" in text
+    assert 'x_errors_total{kind="bad \\"crc\\""} 1\n' in text
+    assert "x_depth 2.5\n" in text
+    assert 'x_seconds_bucket{le="0.01"} 1\n' in text
+    assert 'x_seconds_bucket{le="0.1"} 3\n' in text
+    assert 'x_seconds_bucket{le="+Inf"} 4\n' in text
+    assert "x_seconds_sum 3.105\n" in text and "x_seconds_count 4\n" in text
+
+
+def test_registration_and_scrape_time_functions():
+    reg = Registry()
+    assert reg.counter("a_total", "A") is reg.counter("a_total", "A")
+    with pytest.raises(ValueError):
+        reg.gauge("a_total", "A")
+    with pytest.raises(ValueError):
+        reg.counter("b_total", "B", ["sensor"]).labels(other="x")
+
+    up = reg.gauge("up", "Up", ["sensor"])
+    up.labels(sensor="gps").set_function(lambda: True)
+    up.labels(sensor="imu").set_function(lambda: 1 / 0)
+    text = reg.expose()
+    assert 'up{sensor="gps"} 1\n' in text and 'up{sensor="imu"} NaN\n' in text
+
+
+def test_histogram_quantile():
+    hist = Registry().histogram("h_seconds", "H", buckets=(0.001, 0.01, 0.1))
+    assert hist.quantile(0.5) is None
+    for _ in range(90):
+        hist.observe(0.0005)
+    for _ in range(10):
+        hist.observe(0.05)
+    assert hist.quantile(0.5) < 0.001
+    assert 0.01 < hist.quantile(0.95) <= 0.1
+
+
+def test_digest_shows_rates():
+    reg = Registry()
+    c = reg.counter("c_total", "C")
+    digest = Digest(reg)
+    digest.lines(now=0.0)
+    c.inc(50)
+    (line,) = digest.lines(now=10.0)
+    assert "5.0/s" in line and "total 50" in line
+
+
+def test_server_serves_prometheus_text():
+    reg = Registry()
+    reg.counter("served_total", "S").inc()
+    server = MetricsServer(reg, port=0).start()
+    try:
+        with urllib.request.urlopen(server.url, timeout=5) as resp:
+            assert resp.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+            assert "served_total 1" in resp.read().decode()
+        with pytest.raises(urllib.error.HTTPError):
+            urllib.request.urlopen(f"http://127.0.0.1:{server.port}/nope", timeout=5)
+    finally:
+        server.stop()
+
+
+def test_sensors_record_into_the_default_registry():
+    sentences = metrics.REGISTRY.get("stormpod_gps_messages_total")
+    before = sentences.value
+    gps = GPSSensor(ser=object())
+    gps.feed(b"$GPRMC,123519,A,4807.038,N,01131.000,E,022.4,084.4,230394,003.1,W*6A\r\n")
+    assert sentences.value == before + 1
+
+
+def test_poll_all_records_latency_and_sensor_health(tmp_path):
+    from stormpod.sensor_manager import POLL_SECONDS, SensorManager
+
+    class _Sensor:
+        def read(self):
+            return {"temp_C": 20.0}
+
+    manager = SensorManager(store_path=None, log_path=str(tmp_path / "log.csv"),
+                            sensors={"can": _Sensor()})
+    before = POLL_SECONDS.count
+    manager.poll_all()
+    manager.stop()
+    assert POLL_SECONDS.count == before + 1
+    assert 'stormpod_sensor_up{sensor="can"} 1\n' in metrics.REGISTRY.expose()
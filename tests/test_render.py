@@ -0,0 +1,64 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from stormpod.render import CanvasDashboard, DiffRenderer
+
+
+class _Label:
+    def __init__(self):
+        self.calls = []
+
+    def config(self, **options):
+        self.calls.append(options)
+
+
+class _Canvas:
+    def __init__(self):
+        self.items = {}
+        self.configures = 0
+
+    def create_text(self, x, y, **options):
+        item = len(self.items) + 1
+        self.items[item] = dict(options, x=x, y=y)
+        return item
+
+    def itemconfigure(self, item, **options):
+        self.configures += 1
+        self.items[item].update(options)
+
+
+def test_only_changed_fields_reach_the_widget():
+    renderer = DiffRenderer()
+    temp, gps = _Label(), _Label()
+    renderer.bind_label("temp", temp)
+    renderer.bind_label("gps", gps)
+
+    assert renderer.render({"temp": "18.5°C", "gps": ("No Fix", "#f44336")}) == 2
+    assert renderer.render({"temp": "18.5°C", "gps": ("No Fix", "#f44336")}) == 0
+    assert renderer.render({"temp": "18.6°C", "gps": ("No Fix", "#f44336")}) == 1
+    assert renderer.render({"gps": ("43.6532, -79.3832", "#66bb6a")}) == 1
+
+    assert temp.calls == [{"text": "18.5°C"}, {"text": "18.6°C"}]
+    assert gps.calls[-1] == {"text": "43.6532, -79.3832", "fg": "#66bb6a"}
+    stats = renderer.stats()
+    assert stats["updates"] == 4 and stats["skipped"] == 3
+    assert stats["frame_ms_median"] is not None
+
+    renderer.invalidate()
+    assert renderer.render({"temp": "18.6°C"}) == 1
+
+
+def test_canvas_dashboard_updates_text_items_in_place():
+    canvas = _Canvas()
+    dash = CanvasDashboard(canvas)
+    dash.add_field("temp", 10, 20, caption="Temp:", value="--", value_offset=100)
+    dash.add_field("alert", 512, 40, value="", color="red")
+    assert len(canvas.items) == 3
+
+    dash.render({"temp": "18.5 °C", "alert": ("⚡ Lightning ~12 km", "#ff0000")})
+    dash.render({"temp": "18.5 °C", "alert": ("⚡ Lightning ~12 km", "#ff0000")})
+    assert canvas.configures == 2
+    assert canvas.items[dash.items["temp"]]["text"] == "18.5 °C"
+    assert canvas.items[dash.items["temp"]]["x"] == 110
+    assert canvas.items[dash.items["alert"]]["fill"] == "#ff0000"
@@ -0,0 +1,103 @@
+import os
+import sys
+import time
+
+import can
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from stormpod.replay import (ReplaySensors, Replayer, load_can_log, load_nmea, load_trace,
+                             load_ubx, merge, save_trace)
+from stormpod.sensor_manager import SensorManager
+from stormpod.sensors.fakes import quat_from_yaw
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+
+
+def _wait_for(cond, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not cond():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_capture_loaders_time_each_epoch():
+    nmea = load_nmea(os.path.join(DATA_DIR, "neo_m9n_5hz.nmea"))
+    assert len(nmea) == 100
+    assert nmea[0]["t"] == 0.0 and nmea[1]["t"] == pytest.approx(0.2)
+    assert nmea[0]["data"].count("\r\n") == 4
+
+    ubx = load_ubx(os.path.join(DATA_DIR, "neo_m9n_navpvt_10hz.ubx"))
+    assert len(ubx) == 100
+    assert ubx[-1]["t"] == pytest.approx(9.9)
+
+
+def test_can_log_and_trace_round_trip(tmp_path):
+    path = str(tmp_path / "bus.log")
+    writer = can.CanutilsLogWriter(path, channel="can0")
+    for i in range(3):
+        writer.on_message_received(can.Message(timestamp=100.0 + i * 0.5, arbitration_id=0x11,
+                                               is_extended_id=False, data=[0, 90, 2, 0]))
+    writer.stop()
+    events = load_can_log(path)
+    assert [e["t"] for e in events] == [0.0, 0.5, 1.0]
+    assert events[0]["id"] == 0x11 and events[0]["data"] == "005a0200"
+
+    trace = str(tmp_path / "trace.jsonl")
+    save_trace(trace, merge(events, [{"t": 0.25, "src": "imu", "quat": [1, 0, 0, 0]}]))
+    assert [e["src"] for e in load_trace(trace)] == ["can", "imu", "can", "can"]
+
+
+def test_full_stack_replay_through_sensor_manager(tmp_path):
+    trace = [
+        {"t": 0.0, "src": "can", "id": 0x10, "data": "00b9028c2790"},
+        {"t": 0.0, "src": "can", "id": 0x11, "data": "08ca0200"},
+        {"t": 0.0, "src": "gps", "data": "$GNGGA,153000.00,4339.1920,N,07922.9902,W,1,12,0.78,176.5,M,-35.2,M,,*7C\r\n"},
+        {"t": 0.0, "src": "imu", "quat": list(quat_from_yaw(90.0))},
+        {"t": 0.0, "src": "as3935", "irq": 0x08, "distance_km": 14},
+    ]
+    hw = ReplaySensors()
+    manager = SensorManager(sensors=hw.sensors, store_path=None,
+                            log_path=str(tmp_path / "replay.csv"))
+    try:
+        manager.start()
+        replayer = Replayer(trace, hw, speed=None).start()
+        assert replayer.wait(2.0)
+        assert replayer.counts == {"can": 2, "gps": 1, "as3935": 1, "imu": 1}
+
+        def ready():
+            data = manager.get_latest()
+            return (data.get("temp_C") is not None and data.get("sats")
+                    and data.get("lightning") and data.get("heading_deg") is not None)
+        _wait_for(ready)
+        data = manager.get_latest()
+        assert data["temp_C"] == pytest.approx(18.5)
+        assert data["pressure_hPa"] == pytest.approx(1012.8)
+        assert data["angle_deg"] == pytest.approx(225.0)
+        assert data["lat"] == pytest.approx(43.6532, abs=1e-4)
+        assert data["distance_km"] == 14
+        assert data["heading_deg"] == pytest.approx(90.0)
+        assert hw.can.frames_total == 2
+    finally:
+        manager.stop()
+        hw.close()
+
+
+def test_playback_speed_is_honoured():
+    class _Sink:
+        def __init__(self):
+            self.events = []
+
+        def inject(self, event):
+            self.events.append(event)
+
+    trace = [{"t": i * 0.1, "src": "imu", "quat": [1, 0, 0, 0]} for i in range(11)]
+    sink = _Sink()
+    start = time.perf_counter()
+    Replayer(trace, sink, speed=5.0).run()
+    assert 0.18 <= time.perf_counter() - start < 0.5
+    assert len(sink.events) == 11
+
+    fast = Replayer(trace, _Sink(), speed=None)
+    fast.run()
+    assert fast.elapsed_s < 0.05
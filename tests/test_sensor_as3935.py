@@ -0,0 +1,87 @@
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from stormpod.sensors.fakes import FakeGPIO, FakeSPI
+from stormpod.sensors.sensor_as3935 import AS3935, AS3935Sensor, EventRing
+
+IRQ_PIN = 23
+
+
+def _sensor():
+    spi, gpio = FakeSPI(), FakeGPIO()
+    return AS3935Sensor(irq_pin=IRQ_PIN, spi=spi, gpio=gpio), spi, gpio
+
+
+def _fire(spi, gpio, irq_src, distance=0):
+    spi.set_event(irq_src, distance)
+    gpio.trigger(IRQ_PIN)
+
+
+def test_init_programs_registers():
+    sensor, spi, gpio = _sensor()
+    assert spi.registers[0x00] == 0x12
+    assert spi.registers[0x01] == (2 << 4) | 2
+    assert IRQ_PIN in gpio.callbacks
+    sensor.close()
+    assert spi.closed
+
+
+def test_burst_between_reads_is_not_lost():
+    sensor, spi, gpio = _sensor()
+    assert sensor.read() == {}
+
+    for km in (20, 17, 14):
+        _fire(spi, gpio, AS3935.IRQ_LIGHTNING, km)
+    _fire(spi, gpio, AS3935.IRQ_DISTURBER)
+    _fire(spi, gpio, AS3935.IRQ_NOISE)
+
+    data = sensor.read()
+    assert [e["type"] for e in data["events"]] == ["Lightning"] * 3 + ["Disturber", "Noise"]
+    assert data["strike_count"] == 3
+    assert data["noise_count"] == 1
+    assert data["disturber_count"] == 1
+    assert data["lightning"] is True
+    assert data["distance_km"] == 14
+    assert data["strike_rate_per_min"] == 3.0
+    assert sensor.read() == {}
+
+
+def test_listeners_get_each_strike():
+    sensor, spi, gpio = _sensor()
+    seen = []
+    sensor.listeners.append(seen.append)
+    for km in (20, 17):
+        _fire(spi, gpio, AS3935.IRQ_LIGHTNING, km)
+    _fire(spi, gpio, AS3935.IRQ_NOISE)
+    sensor.read()
+    assert [e["distance_km"] for e in seen] == [20, 17]
+
+
+def test_ring_overflow_drops_oldest():
+    ring = EventRing(capacity=4)
+    for i in range(10):
+        ring.push({"n": i})
+    assert ring.overflows == 6
+    assert [e["n"] for e in ring.drain()] == [6, 7, 8, 9]
+    assert ring.pop() is None
+
+
+def test_concurrent_irq_thread_and_reader():
+    sensor, spi, gpio = _sensor()
+    total = 5000
+    spi.set_event(AS3935.IRQ_LIGHTNING, 10)
+
+    def irq_storm():
+        for _ in range(total):
+            gpio.trigger(IRQ_PIN)
+
+    thread = threading.Thread(target=irq_storm)
+    thread.start()
+    seen = 0
+    while thread.is_alive():
+        seen += sensor.read().get("strike_count", 0)
+    thread.join()
+    seen += sensor.read().get("strike_count", 0)
+    assert seen + sensor.as3935.events.overflows == total
@@ -0,0 +1,77 @@
+import os
+import sys
+import time
+
+import can
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from stormpod.sensors.sensor_can import CANReceiver
+
+
+@pytest.fixture
+def receiver_and_tx():
+    channel = f"stormpod-test-{time.monotonic_ns()}"
+    rx = CANReceiver(channel=channel, interface="virtual")
+    tx = can.Bus(channel=channel, interface="virtual")
+    yield rx, tx
+    tx.shutdown()
+    rx.close()
+
+
+def _atmos(t10, h10, p10):
+    return can.Message(arbitration_id=0x10, is_extended_id=False,
+                       data=[t10 >> 8, t10 & 0xFF, h10 >> 8, h10 & 0xFF, p10 >> 8, p10 & 0xFF])
+
+
+def _wind(angle10, raw):
+    return can.Message(arbitration_id=0x11, is_extended_id=False,
+                       data=[angle10 >> 8, angle10 & 0xFF, raw >> 8, raw & 0xFF])
+
+
+def _wait_for_backlog(rx, count, timeout=1.0):
+    deadline = time.time() + timeout
+    while rx.reader.buffer.qsize() < count and time.time() < deadline:
+        time.sleep(0.005)
+
+
+def test_update_drains_all_pending_frames(receiver_and_tx):
+    rx, tx = receiver_and_tx
+    for i in range(10):
+        tx.send(_atmos(200 + i, 450, 10130))
+    tx.send(_wind(900, 512))
+    _wait_for_backlog(rx, 11)
+
+    handled = rx.update(timeout=0.5)
+    assert handled == 11
+    assert rx.backlog == 11
+    assert rx.latest["temp_C"] == pytest.approx(20.9)
+    assert rx.latest["pressure_hPa"] == pytest.approx(1013.0)
+    assert rx.latest["angle_deg"] == pytest.approx(90.0)
+    assert rx.latest["speed_kph"] == pytest.approx(91.2)
+    assert rx.update(timeout=0) == 0
+
+
+def test_unrelated_ids_are_filtered(receiver_and_tx):
+    rx, tx = receiver_and_tx
+    tx.send(can.Message(arbitration_id=0x123, is_extended_id=False, data=[1, 2, 3, 4]))
+    tx.send(_wind(0, 0))
+    _wait_for_backlog(rx, 1)
+    time.sleep(0.05)
+
+    assert rx.update(timeout=0.5) == 1
+    assert rx.latest["speed_kph"] == 0.0
+    assert rx.stats()["frames_total"] == 1
+
+
+def test_listeners_see_every_frame(receiver_and_tx):
+    rx, tx = receiver_and_tx
+    frames = []
+    rx.listeners.append(frames.append)
+    for raw in (300, 400, 500):
+        tx.send(_wind(900, raw))
+    _wait_for_backlog(rx, 3)
+
+    assert rx.update(timeout=0.5) == 3
+    assert [f["wind_raw"] for f in frames] == [300, 400, 500]
+    assert rx.latest["wind_raw"] == 500
@@ -4,7 +4,7 @@ import sys
 import pytest
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
-from stormpod.sensors.sensor_gps import GPSSensor
+from stormpod.sensors.sensor_gps import UBX_NAV_PVT, GPSSensor, ubx_frame
 
 
 def _gps_sensor():
@@ -13,7 +13,7 @@ def _gps_sensor():
         "lat": None,
         "lon": None,
         "fix": False,
-        "speed_kph": 0.0,
+        "ground_speed_kph": 0.0,
         "time_utc": None,
     }
     return gps
@@ -26,16 +26,142 @@ def test_parse_line_with_fix():
     assert gps.latest["fix"] is True
     assert gps.latest["lat"] == pytest.approx(48.1173, abs=1e-4)
     assert gps.latest["lon"] == pytest.approx(11.516666, abs=1e-4)
-    assert gps.latest["speed_kph"] == pytest.approx(41.48)
+    assert gps.latest["ground_speed_kph"] == pytest.approx(41.48)
     assert gps.latest["time_utc"] == "123519"
     assert gps.latest["heading_deg"] == pytest.approx(84.4)
 
 
 def test_parse_line_without_fix():
     gps = _gps_sensor()
-    line = "$GPRMC,123519,V,,,,,,,230394,,,N*53"
-    gps._parse_line(line)
+    line = "$GPRMC,123519,V,,,,,,,230394,,,N*51"
+    assert gps._parse_line(line) is True
     assert gps.latest["fix"] is False
     assert gps.latest["lat"] is None
     assert gps.latest["lon"] is None
-    assert "heading_deg" not in gps.latest
+    assert gps.latest["heading_deg"] is None
+
+
+def test_losing_the_fix_clears_speed_and_course():
+    gps = _gps_sensor()
+    gps._parse_line("$GPRMC,123519,A,4807.038,N,01131.000,E,022.4,084.4,230394,003.1,W*6A")
+    assert gps.latest["ground_speed_kph"] == pytest.approx(41.48)
+    gps._parse_line("$GPRMC,123520,V,,,,,,,230394,,,N*5B")
+    assert gps.latest["fix"] is False
+    assert gps.latest["ground_speed_kph"] is None and gps.latest["heading_deg"] is None
+
+
+DATA = os.path.join(os.path.dirname(__file__), "data", "neo_m9n_5hz.nmea")
+
+
+class _FakeSerial:
+    def __init__(self, chunks):
+        self.chunks = list(chunks)
+
+    @property
+    def in_waiting(self):
+        return len(self.chunks[0]) if self.chunks else 0
+
+    def read(self, n):
+        return self.chunks.pop(0)[:n]
+
+
+def test_bad_checksum_is_rejected():
+    gps = _gps_sensor()
+    line = "$GPRMC,123519,A,4807.038,N,01131.000,E,022.4,084.4,230394,003.1,W*6B"
+    assert gps._parse_line(line) is False
+    assert gps.latest["fix"] is False
+
+
+def test_sentence_without_checksum_is_rejected():
+    gps = GPSSensor(ser=object())
+    gps.feed(b"$GPRMC,123519,A,4807.038,N,01131.000,E,022.4,084.4,230394,003.1,W\r\n")
+    assert gps.latest["fix"] is False
+    assert gps.counters["checksum_errors"] == 1
+
+
+def test_gga_vtg_gsa():
+    gps = _gps_sensor()
+    assert gps._parse_line("$GNGGA,153000.00,4339.1920,N,07922.9902,W,1,12,0.78,176.5,M,-35.2,M,,*7C")
+    assert gps.latest["gps_alt_m"] == pytest.approx(176.5)
+    assert gps.latest["sats"] == 12
+    assert gps.latest["hdop"] == pytest.approx(0.78)
+    assert gps.latest["lat"] == pytest.approx(43.65320, abs=1e-5)
+    assert gps.latest["lon"] == pytest.approx(-79.38317, abs=1e-5)
+
+    assert gps._parse_line("$GNVTG,90.00,T,,M,26.242,N,48.600,K,A*10")
+    assert gps.latest["heading_deg"] == pytest.approx(90.0)
+    assert gps.latest["ground_speed_kph"] == pytest.approx(48.6)
+
+    assert gps._parse_line("$GNGSA,A,3,05,07,13,14,15,17,19,24,30,,,,1.32,0.78,1.06,1*03")
+    assert gps.latest["fix_mode"] == 3
+    assert gps.latest["vdop"] == pytest.approx(1.06)
+
+
+def test_stream_split_across_reads():
+    with open(DATA, "rb") as f:
+        raw = f.read()
+    # Odd-sized chunks so sentences straddle reads, plus some line noise
+    chunks = [raw[i:i + 37] for i in range(0, len(raw), 37)]
+    chunks.insert(5, b"\x00\xff garbage\r\n$GPRMC,1*00\r\n")
+    gps = GPSSensor(ser=_FakeSerial(chunks))
+    while gps.ser.chunks:
+        gps.read()
+
+    stats = gps.stats()
+    # The noise lands inside a GGA, cutting off its *hh: that one and the
+    # bogus RMC are both rejected
+    assert stats["sentences"] == 399
+    assert stats["checksum_errors"] == 2
+    assert stats["bytes"] == len(raw) + len(b"\x00\xff garbage\r\n$GPRMC,1*00\r\n")
+    assert gps.latest["fix"] is True
+    assert gps.latest["time_utc"] == "153019"
+    assert gps.read() is gps.latest
+
+
+UBX_DATA = os.path.join(os.path.dirname(__file__), "data", "neo_m9n_navpvt_10hz.ubx")
+
+
+def test_ubx_nav_pvt_stream():
+    with open(UBX_DATA, "rb") as f:
+        raw = f.read()
+    # NMEA still draining when the receiver switches, then frames split mid-way
+    stream = b"$GNGSA,A,3,,,,,,,,,,,,,1.32,0.78,1.06,1*00\r\n" + raw
+    chunks = [stream[i:i + 50] for i in range(0, len(stream), 50)]
+    gps = GPSSensor(ser=_FakeSerial(chunks), protocol="ubx")
+    while gps.ser.chunks:
+        gps.read()
+
+    assert gps.stats()["sentences"] == 100
+    assert gps.stats()["checksum_errors"] == 0
+    latest = gps.latest
+    assert latest["fix"] is True
+    assert latest["time_utc"] == "153009"
+    assert latest["lat"] == pytest.approx(43.6532, abs=1e-7)
+    assert latest["lon"] == pytest.approx(-79.3832 + 100 * 0.0000135, abs=1e-6)
+    assert latest["gps_alt_m"] == pytest.approx(176.5)
+    assert 45 < latest["ground_speed_kph"] < 52
+    assert 87 < latest["heading_deg"] < 93
+    assert latest["h_acc_m"] == pytest.approx(1.2)
+    assert latest["sats"] == 14
+
+
+def test_ubx_corrupt_frame_is_skipped():
+    with open(UBX_DATA, "rb") as f:
+        raw = bytearray(f.read(200))  # two whole frames
+    raw[50] ^= 0xFF
+    gps = GPSSensor(ser=object(), protocol="ubx")
+    assert gps.feed(bytes(raw)) == 1
+    assert gps.counters["checksum_errors"] == 1
+
+
+def test_ubx_fix_loss_clears_speed_and_course():
+    with open(UBX_DATA, "rb") as f:
+        frame = f.read(100)
+    payload = bytearray(frame[6:-2])
+    payload[21] &= ~0x01  # gnssFixOK off
+    gps = GPSSensor(ser=object(), protocol="ubx")
+    gps.feed(frame)
+    assert gps.latest["fix"] is True and gps.latest["ground_speed_kph"] > 0
+    gps.feed(ubx_frame(*UBX_NAV_PVT, bytes(payload)))
+    assert gps.latest["fix"] is False
+    assert gps.latest["ground_speed_kph"] is None and gps.latest["heading_deg"] is None
@@ -0,0 +1,49 @@
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from stormpod.sensors.fakes import FakeBNO, quat_from_yaw
+from stormpod.sensors.sensor_imu import BNO_REPORT_ROTATION_VECTOR, IMUSensor
+
+
+def test_on_demand_read_uses_adafruit_quaternion_order():
+    bno = FakeBNO()
+    imu = IMUSensor(bno=bno, rate_hz=None)
+    assert imu.read() == {"heading_deg": None}
+    bno.set_quaternion(*quat_from_yaw(30.0))
+    assert imu.read()["heading_deg"] == pytest.approx(30.0)
+
+
+def test_background_sampling_feeds_listeners_at_the_report_rate():
+    bno = FakeBNO()
+    bno.set_quaternion(*quat_from_yaw(270.0))
+    imu = IMUSensor(bno=bno, rate_hz=200)
+    yaws = []
+    imu.listeners.append(lambda yaw, t: yaws.append(yaw))
+    try:
+        assert bno.enabled[BNO_REPORT_ROTATION_VECTOR] == 5000
+        time.sleep(0.3)
+        assert 30 <= len(yaws) <= 70
+        assert yaws[-1] == pytest.approx(270.0)
+        assert imu.read()["heading_deg"] == pytest.approx(270.0)
+    finally:
+        imu.close()
+
+
+def test_sampling_errors_surface_on_read():
+    class _Flaky(FakeBNO):
+        @property
+        def rotation_vector(self):
+            raise OSError("I2C NACK")
+
+    imu = IMUSensor(bno=_Flaky(), rate_hz=100)
+    try:
+        time.sleep(0.05)
+        with pytest.raises(OSError):
+            imu.read()
+        assert imu.sample_errors > 0
+    finally:
+        imu.close()
@@ -0,0 +1,212 @@
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from stormpod.sensor_manager import FAILED, INITIALIZING, READY, SensorManager
+from stormpod.sensors.sensor_gps import GPSSensor, nmea_checksum
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+class _Slow:
+    def __init__(self, delay, values):
+        time.sleep(delay)
+        self.values = values
+
+    def read(self):
+        return self.values
+
+
+def _manager(tmp_path, factories):
+    return SensorManager(store_path=None, log_path=str(tmp_path / "log.csv"), factories=factories)
+
+
+def test_sensors_start_in_parallel_without_blocking(tmp_path):
+    factories = {
+        "can": lambda: _Slow(0.3, {"temp_C": 18.5, "heading_deg": 1.0}),
+        "gps": lambda: _Slow(0.3, {"lat": 43.65, "fix": True}),
+        "lightning": lambda: _Slow(0.0, {}),
+        "imu": lambda: _Slow(0.3, {"heading_deg": 90.0}),
+    }
+    manager = _manager(tmp_path, factories)
+    assert all(s["state"] == INITIALIZING for s in manager.status.values())
+
+    start = time.perf_counter()
+    manager.start()
+    assert time.perf_counter() - start < 0.1
+    assert manager.wait_ready(timeout=2.0)
+    assert time.perf_counter() - start < 0.8  # three 0.3 s inits overlapped
+
+    report = manager.init_report()
+    assert report["imu"]["init_s"] >= 0.3 and report["imu"]["ready_after_s"] >= 0.3
+    time.sleep(0.2)
+    data = manager.get_latest()
+    # Merge order is fixed up front, not by which sensor came up first
+    assert data["heading_deg"] == 90.0 and data["temp_C"] == 18.5
+    manager.stop()
+
+
+def test_failed_sensor_does_not_take_down_the_rest(tmp_path):
+    def broken():
+        raise OSError("No such device: can0")
+
+    factories = {
+        "can": broken,
+        "gps": lambda: _Slow(0.0, {"fix": False}),
+        "lightning": lambda: _Slow(0.0, {}),
+        "imu": lambda: _Slow(0.0, {"heading_deg": 12.0}),
+    }
+    manager = _manager(tmp_path, factories)
+    manager.start()
+    assert manager.wait_ready(timeout=2.0) is False
+    assert manager.sensor_state("can") == FAILED
+    assert "No such device" in manager.status["can"]["error"]
+    assert manager.sensor_state("imu") == READY
+    assert manager.can is None
+    time.sleep(0.2)
+    assert manager.get_latest()["heading_deg"] == 12.0
+    manager.stop()
+
+
+def test_drivers_are_not_imported_up_front():
+    code = ("import sys; import stormpod.sensor_manager; "
+            "print(any(m.startswith('stormpod.sensors.sensor_') for m in sys.modules))")
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True)
+    assert out.stdout.strip() == "False"
+
+
+class _Batches:
+    """AS3935 stand-in: returns each queued event batch once, then nothing."""
+
+    def __init__(self, batches):
+        self.batches = list(batches)
+
+    def read(self):
+        return self.batches.pop(0) if self.batches else {}
+
+
+class _Uplink:
+    def __init__(self):
+        self.samples = []
+        self.starts = 0
+
+    def start(self):
+        self.starts += 1
+
+    def stop(self):
+        pass
+
+    def submit(self, sample):
+        self.samples.append(sample)
+
+
+def _strike(distance_km, t, overflows=0):
+    event = {"type": "Lightning", "distance_km": distance_km, "timestamp": t}
+    return {"events": [event], "strike_count": 1, "noise_count": 0, "disturber_count": 0,
+            "strike_rate_per_min": 1.0, "event_overflows": overflows,
+            "lightning": True, "distance_km": distance_km, "timestamp": t}
+
+
+def test_held_lightning_is_logged_and_uplinked_once(tmp_path):
+    # event_overflows is the ring's running total, not a per-batch count
+    sensor = _Batches([_strike(12, 100.0, overflows=3), _strike(9, 100.5, overflows=3)])
+    uplink = _Uplink()
+    manager = SensorManager(store_path=None, log_path=str(tmp_path / "log.csv"), uplink=uplink,
+                            sensors={"lightning": sensor})
+    manager.start()
+    deadline = time.monotonic() + 2.0
+    while sensor.batches and time.monotonic() < deadline:
+        time.sleep(0.01)
+    time.sleep(0.1)
+    for _ in range(3):
+        manager.poll_all()
+    # The GUI view still holds the newest strike
+    assert manager.get_latest()["distance_km"] == 9
+    manager.stop()
+
+    first, *rest = uplink.samples
+    # Both batches in the first poll, none repeated by later ones
+    assert first["strike_count"] == 2 and len(first["events"]) == 2
+    assert first["event_overflows"] == 3
+    assert first["lightning"] is True and first["distance_km"] == 9 and first["timestamp"] == 100.5
+    assert rest and all("lightning" not in s and "strike_count" not in s for s in rest)
+
+
+def _nmea(body):
+    return f"${body}*{nmea_checksum(body):02X}\r\n".encode()
+
+
+def test_gps_course_reaches_fusion_once_per_epoch_with_fix(tmp_path):
+    manager = SensorManager(store_path=None, log_path=str(tmp_path / "log.csv"))
+    courses = []
+    manager.fusion.update_gps = lambda course, speed, t=None: courses.append((course, speed))
+    gps = GPSSensor(ser=object())
+    manager._on_sensor_change("gps", gps)
+
+    rmc = _nmea("GNRMC,153000.00,A,4339.1920,N,07922.9902,W,26.242,90.00,171026,,,A,V")
+    gps.feed(rmc)
+    # Same epoch again (a repeated RMC, its VTG), then GGA/GSA-only chunks
+    gps.feed(rmc)
+    gps.feed(_nmea("GNVTG,90.00,T,,M,26.242,N,48.600,K,A"))
+    gps.feed(_nmea("GNGGA,153000.00,4339.1920,N,07922.9902,W,1,12,0.78,176.5,M,-35.2,M,,"))
+    gps.feed(_nmea("GNGSA,A,3,05,07,13,14,15,17,19,24,30,,,,1.32,0.78,1.06,1"))
+    assert courses == [(90.0, 48.6)]
+
+    # Fix lost: the course still in ``latest`` is stale
+    gps.feed(_nmea("GNRMC,153000.20,V,,,,,,,171026,,,N,V"))
+    gps.feed(_nmea("GNGGA,153000.20,,,,,0,00,99.99,,,,,,"))
+    assert len(courses) == 1
+
+    gps.feed(_nmea("GNRMC,153000.40,A,4339.1920,N,07922.9884,W,26.342,91.00,171026,,,A,V"))
+    assert courses[-1] == (91.0, 48.79)
+    assert len(courses) == 2
+    manager.stop()
+
+
+def test_second_start_is_a_no_op(tmp_path):
+    uplink = _Uplink()
+    manager = SensorManager(store_path=None, log_path=str(tmp_path / "log.csv"), uplink=uplink,
+                            sensors={"lightning": _Batches([])})
+    manager.start()
+    thread = manager._log_thread
+    manager.start()  # e.g. the basic GUI taking over from a failed enhanced one
+    assert uplink.starts == 1 and manager._log_thread is thread
+    manager.stop()
+
+
+def test_wind_stats_only_take_true_wind(tmp_path):
+    manager = SensorManager(store_path=None, log_path=str(tmp_path / "log.csv"))
+    updates = []
+    manager.wind_stats.update = lambda speed, direction=None: updates.append(speed)
+    gps = GPSSensor(ser=object())
+    manager._on_sensor_change("gps", gps)
+    frame = {"speed_kph": 80.0, "angle_deg": 0.0}
+
+    manager._wind_frame(frame)  # no fix: 80 km/h may be the truck itself
+    assert updates == []
+    gps.feed(_nmea("GNRMC,153000.00,A,4339.1920,N,07922.9902,W,32.397,90.00,171026,,,A,V"))
+    manager._wind_frame(frame)
+    assert updates == [pytest.approx(20.0, abs=0.1)]
+    manager.stop()
+
+
+class _Device(_Slow):
+    def __init__(self, values):
+        super().__init__(0.0, values)
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def test_stop_closes_the_devices(tmp_path):
+    devices = {name: _Device({}) for name in ("can", "gps", "lightning", "imu")}
+    manager = _manager(tmp_path, {name: (lambda d=d: d) for name, d in devices.items()})
+    manager.start()
+    assert manager.wait_ready(timeout=2.0)
+    manager.stop()
+    assert all(d.closed for d in devices.values())
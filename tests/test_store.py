@@ -0,0 +1,75 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from stormpod.store import SQLiteStore
+
+
+def _sample(i):
+    return {"temp_C": 20.0 + i, "humidity_%": 50.0, "pressure_hPa": 1000.0,
+            "angle_deg": 90.0, "speed_kph": 10.0, "lat": 43.0, "lon": -79.0, "fix": True}
+
+
+def test_batched_insert_and_time_query(tmp_path):
+    store = SQLiteStore(str(tmp_path / "s.db"), batch_size=10)
+    for i in range(25):
+        store.append(_sample(i), ts=1000.0 + i)
+    store.close()
+
+    store = SQLiteStore(str(tmp_path / "s.db"), background=False)
+    assert store._conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    rows = store.query("atmos", 1010.0, 1015.0)
+    assert [r[1] for r in rows] == [1010.0, 1011.0, 1012.0, 1013.0, 1014.0]
+    assert rows[0][2] == 30.0
+    assert store.query("lightning") == []
+    store.close()
+
+
+def test_lightning_held_in_snapshot_is_stored_once(tmp_path):
+    store = SQLiteStore(str(tmp_path / "s.db"), background=False, batch_size=100)
+    strike = {"lightning": True, "distance_km": 12, "timestamp": 5000.5}
+    for i in range(3):
+        store.append(strike, ts=5001.0 + i)
+    store.flush()
+    assert store.query("lightning") == [(1, 5000.5, 12.0)]
+    store.close()
+
+
+def test_every_strike_in_a_poll_is_stored(tmp_path):
+    store = SQLiteStore(str(tmp_path / "s.db"), background=False, batch_size=100)
+    events = [{"type": "Lightning", "distance_km": 20, "timestamp": 5000.1},
+              {"type": "Noise", "timestamp": 5000.2},
+              {"type": "Lightning", "distance_km": 17, "timestamp": 5000.3},
+              {"type": "Lightning", "distance_km": 14, "timestamp": 5000.6}]
+    sample = {"events": events, "strike_count": 3, "lightning": True, "distance_km": 14,
+              "timestamp": 5000.6}
+    store.append(sample, ts=5001.0)
+    store.append(sample, ts=5002.0)  # still held in the snapshot
+    store.flush()
+    assert store.query("lightning") == [(1, 5000.1, 20.0), (2, 5000.3, 17.0), (3, 5000.6, 14.0)]
+    store.close()
+
+
+def test_unsent_cursor_drains_in_batches(tmp_path):
+    store = SQLiteStore(str(tmp_path / "s.db"), background=False, batch_size=1000)
+    for i in range(250):
+        store.append(_sample(i), ts=float(i))
+    store.flush()
+
+    sent = []
+    while True:
+        batch = store.fetch_unsent("wind", limit=100)
+        if not batch:
+            break
+        sent.extend(batch)
+        store.mark_sent("wind", batch[-1][0])
+    assert len(sent) == 250
+    assert store.unsent_count("wind") == 0
+    # Cursors are per consumer and per table
+    assert store.unsent_count("wind", consumer="backup") == 250
+    assert store.unsent_count("atmos") == 250
+
+    store.append(_sample(0), ts=999.0)
+    store.flush()
+    assert [r[1] for r in store.fetch_unsent("wind")] == [999.0]
+    store.close()
@@ -0,0 +1,130 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from stormpod.supervisor import FAILED, READY, STALE, SensorSupervisor
+
+
+def _wait_for(cond, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not cond():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+class _Device:
+    def __init__(self):
+        self.alive = True
+        self.closed = False
+        self.last_update = time.monotonic()
+
+    def read(self):
+        if not self.alive:
+            raise OSError("device unplugged")
+        self.last_update = time.monotonic()
+        return {"temp_C": 20.0}
+
+    def close(self):
+        self.closed = True
+
+
+def test_failed_open_retries_with_backoff():
+    attempts = []
+
+    def factory():
+        attempts.append(time.monotonic())
+        if len(attempts) < 3:
+            raise OSError("No such device")
+        return _Device()
+
+    sup = SensorSupervisor("can", factory=factory, backoff_initial=0.05, backoff_max=1.0)
+    sup.start(check_interval=0.01)
+    try:
+        assert sup.wait_first_attempt(1.0)
+        _wait_for(lambda: sup.state == READY)
+        assert len(attempts) == 3
+        # 0.05 s then 0.1 s between attempts
+        assert attempts[2] - attempts[1] >= 1.5 * (attempts[1] - attempts[0])
+        assert sup.report()["error"] is None and sup.reconnects == 1
+    finally:
+        sup.stop()
+
+
+def test_read_errors_close_and_reopen_the_device():
+    devices = []
+
+    def factory():
+        devices.append(_Device())
+        return devices[-1]
+
+    changes = []
+    sup = SensorSupervisor("gps", factory=factory, error_threshold=2, backoff_initial=0.05,
+                           on_change=lambda name, sensor: changes.append(sensor))
+    sup.start(check_interval=0.01)
+    try:
+        _wait_for(lambda: sup.state == READY)
+        devices[0].alive = False
+        for _ in range(2):
+            try:
+                sup.read()
+            except OSError:
+                pass
+        assert sup.state == FAILED and sup.sensor is None
+        assert sup.report()["retry_in_s"] is not None
+        _wait_for(lambda: sup.state == READY and len(devices) == 2)
+        assert devices[0].closed
+        assert changes == [devices[0], None, devices[1]]
+        assert sup.read() == {"temp_C": 20.0}
+    finally:
+        sup.stop()
+
+
+def test_silent_device_goes_stale_then_gets_reopened():
+    devices = []
+
+    def factory():
+        devices.append(_Device())
+        return devices[-1]
+
+    sup = SensorSupervisor("imu", factory=factory, stale_after_s=0.05, reopen_after_s=0.2,
+                           backoff_initial=0.01)
+    sup.start(check_interval=0.01)
+    try:
+        _wait_for(lambda: sup.state == READY)
+        _wait_for(lambda: sup.state == STALE)  # nobody is reading
+        sup.read()
+        _wait_for(lambda: sup.state == READY)
+        _wait_for(lambda: len(devices) == 2)
+        assert devices[0].closed
+    finally:
+        sup.stop()
+
+
+def test_reads_stay_fast_while_the_device_hangs_on_open():
+    def factory():
+        time.sleep(1.0)  # e.g. a UART that blocks while the receiver reboots
+        return _Device()
+
+    sup = SensorSupervisor("gps", factory=factory)
+    sup.start()
+    try:
+        start = time.perf_counter()
+        assert sup.read() == {}
+        assert time.perf_counter() - start < 0.2
+    finally:
+        sup.stop()
+
+
+def test_injected_sensors_are_never_reopened():
+    device = _Device()
+    sup = SensorSupervisor("can", sensor=device, error_threshold=1)
+    device.alive = False
+    try:
+        sup.read()
+    except OSError:
+        pass
+    assert sup.state == FAILED and sup.sensor is device and not device.closed
+    device.alive = True
+    sup.read()
+    assert sup.state == READY
@@ -0,0 +1,70 @@
+import math
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from stormpod.timeseries import Ring, TimeSeriesStore
+
+
+def test_ring_wraps_in_order_and_filters_by_time():
+    ring = Ring(4, 1)
+    for t in range(6):
+        ring.append(float(t), [t * 10.0])
+    times, values = ring.ordered()
+    assert list(times) == [2, 3, 4, 5]
+    assert list(values[:, 0]) == [20, 30, 40, 50]
+    assert list(ring.ordered(start=4)[0]) == [4, 5]
+
+
+def test_missing_values_are_nan_not_defaults():
+    store = TimeSeriesStore(["temp_C", "pressure_hPa"])
+    store.append({"temp_C": 12.5, "pressure_hPa": None}, ts=100.0)
+    store.append({"temp_C": None}, ts=101.0)
+    times, values = store.recent("temp_C")
+    assert list(times) == [100.0, 101.0]
+    assert values[0] == 12.5 and math.isnan(values[1])
+    assert np.isnan(store.recent("pressure_hPa")[1]).all()
+
+
+def test_rollups_keep_min_mean_max_per_bucket():
+    store = TimeSeriesStore(["w"], tiers=((1, 10), (60, 10)))
+    # 2 minutes at 4 Hz: w cycles 0..3 each second, +100 in the second minute
+    for i in range(480):
+        store.append({"w": float(i % 4) + (i // 240) * 100}, ts=1200.0 + i * 0.25)
+
+    times, lo, mean, hi = store.series("w", window_s=10, now=1320.0)
+    assert len(times) == 10  # the 1 s tier only keeps 10 buckets
+    assert list(lo[:-1]) == [100.0] * 9 and list(hi[:-1]) == [103.0] * 9
+    assert mean[0] == 101.5
+
+    times, lo, mean, hi = store.series("w", window_s=600, now=1320.0)
+    assert list(times) == [1200.0, 1260.0]  # 1 min tier, second bucket still open
+    assert list(mean) == [1.5, 101.5]
+    assert list(lo) == [0.0, 100.0] and list(hi) == [3.0, 103.0]
+
+
+def test_outage_leaves_a_gap_and_tier_choice_tracks_window():
+    store = TimeSeriesStore(["p"])
+    store.append({"p": 1000.0}, ts=0.0)
+    store.append({"p": 1001.0}, ts=1.0)
+    store.append({"p": 999.0}, ts=10.0)
+    times, _, mean, _ = store.series("p", window_s=60, now=10.0)
+    assert list(times) == [0.0, 1.0, 2.0, 10.0]
+    assert math.isnan(mean[2])
+
+    assert store.pick_tier(300).bucket_s == 1
+    assert store.pick_tier(3600).bucket_s == 60
+    assert store.pick_tier(24 * 3600).bucket_s == 600
+
+
+def test_memory_is_fixed():
+    store = TimeSeriesStore(["a", "b"], raw_capacity=50, tiers=((1, 20), (60, 5)))
+    before = [store.raw.values.nbytes] + [t.ring.values.nbytes for t in store.tiers]
+    for i in range(10000):
+        store.append({"a": i, "b": -i}, ts=float(i))
+    after = [store.raw.values.nbytes] + [t.ring.values.nbytes for t in store.tiers]
+    assert before == after
+    assert store.raw.count == 50 and store.version == 10000
+    assert store.latest("b") == -9999
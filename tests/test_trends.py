@@ -0,0 +1,54 @@
+import os
+import sys
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from stormpod.trends import TrendPlot
+
+SERIES = [("temp_C", "T", "r"), ("speed_kph", "W", "b")]
+
+
+def _plot():
+    fig, axes = plt.subplots(2, 1)
+    return TrendPlot(fig, axes, SERIES, window_s=300)
+
+
+def test_steady_data_is_blitted_on_persistent_lines():
+    plot = _plot()
+    lines = list(plot.lines)
+    t = np.arange(100, dtype=float)
+    for step in range(10):
+        plot.update(t + step, {"temp_C": np.full(100, 20.0), "speed_kph": np.full(100, 5.0)},
+                    now=t[-1] + step)
+        plot.draw()
+    assert plot.lines == lines
+    assert all(len(ax.lines) == 1 for ax in plot.axes)
+    assert plot.full_redraws == 1 and plot.blits == 9
+    x, y = plot.lines[0].get_data()
+    assert x[-1] == 0 and y[-1] == 20.0
+    plt.close(plot.fig)
+
+
+def test_out_of_range_value_or_invalidate_forces_full_redraw():
+    plot = _plot()
+    t = np.arange(10, dtype=float)
+    cols = {"temp_C": np.full(10, 20.0), "speed_kph": [5.0] * 9 + [None]}
+    plot.update(t, cols, now=9)
+    plot.draw()
+    assert np.isnan(plot.lines[1].get_data()[1][-1])
+
+    cols["temp_C"] = np.append(cols["temp_C"][:-1], 45.0)
+    plot.update(t, cols, now=9)
+    plot.draw()
+    assert plot.full_redraws == 2
+    assert plot.axes[0].get_ylim()[1] > 45.0
+
+    plot.invalidate()
+    plot.draw()
+    assert plot.full_redraws == 3
+    assert plot.stats()["frames"] == 3
+    plt.close(plot.fig)
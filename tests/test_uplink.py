@@ -0,0 +1,74 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from stormpod.uplink import LocalBroker, UplinkPublisher, build_message, decode_batch
+
+SAMPLE = {"temp_C": 18.5, "humidity_%": 65.2, "pressure_hPa": 1013.2, "speed_kph": 15.3,
+          "angle_deg": 225.0, "lat": 43.6532, "lon": -79.3832, "lightning": True, "distance_km": 5}
+
+
+def test_message_layout():
+    msg = build_message(SAMPLE, ts=0, device_status={"sensors_online": 4})
+    assert msg["timestamp"] == "1970-01-01T00:00:00Z"
+    assert msg["location"]["lat"] == 43.6532
+    assert msg["environmental"]["wind_direction_deg"] == 225.0
+    assert msg["alerts"]["lightning_detected"] is True
+    assert msg["alerts"]["lightning_distance_km"] == 5
+    assert msg["alerts"]["severe_weather"] is False
+    assert msg["alerts"]["storm_eta_min"] is None
+    assert msg["device_status"] == {"sensors_online": 4}
+
+
+def test_one_publish_per_batch():
+    broker = LocalBroker()
+    received = []
+    pub = UplinkPublisher(broker, batch_size=5, compress=True)
+    broker.subscribe(pub.topic, lambda topic, payload: received.extend(decode_batch(payload)))
+
+    for i in range(12):
+        pub.submit(dict(SAMPLE, temp_C=float(i)), ts=i)
+    assert pub.flush() == 2
+    assert len(broker.published) == 2
+    assert [m["environmental"]["temperature_c"] for m in received] == [float(i) for i in range(10)]
+
+    assert pub.flush(force=True) == 1
+    assert len(received) == 12
+    assert pub.stats["samples_sent"] == 12
+
+
+def test_offline_batches_are_retried_in_order():
+    broker = LocalBroker()
+    broker.online = False
+    pub = UplinkPublisher(broker, batch_size=2, backoff_initial=0.0, max_outbox=3)
+    for i in range(9):
+        pub.submit(SAMPLE, ts=i)
+        pub.flush()
+    # Outbox is bounded: only the newest three batches survive
+    assert pub.pending == (1, 3)
+    assert pub.stats["batches_dropped"] == 1
+
+    broker.online = True
+    assert pub.flush() == 3
+    stamps = [m["timestamp"][-2:-1] for _, p in broker.published for m in decode_batch(p)]
+    assert stamps == ["2", "3", "4", "5", "6", "7"]
+
+
+def test_backoff_holds_sends():
+    broker = LocalBroker()
+    broker.online = False
+    pub = UplinkPublisher(broker, batch_size=1, backoff_initial=60.0)
+    pub.submit(SAMPLE)
+    assert pub.flush() == 0
+    broker.online = True
+    pub.submit(SAMPLE)
+    assert pub.flush() == 0
+    assert pub.pending == (0, 2)
+    assert pub.stats["send_failures"] == 1
+
+
+def test_bounded_queue_drops_oldest():
+    pub = UplinkPublisher(LocalBroker(), batch_size=100, max_queue=3)
+    results = [pub.submit(SAMPLE, ts=i) for i in range(5)]
+    assert results == [True, True, True, False, False]
+    assert pub.stats["samples_dropped"] == 2
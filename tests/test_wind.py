@@ -0,0 +1,97 @@
+import math
+import os
+import random
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from stormpod.binlog import BinaryLogger
+from stormpod.logger import BufferedLogger
+from stormpod.sensors.sensor_gps import GPSSensor
+from stormpod.wind import apply, reprocess, true_wind, true_wind_batch
+
+
+@pytest.mark.parametrize("apparent, angle, ground, heading, expected", [
+    # Driving north at 50 km/h in still air: pure head wind, no true wind
+    (50.0, 0.0, 50.0, 0.0, (0.0, None)),
+    # Parked facing south, wind from the right: true wind from the west
+    (20.0, 90.0, 0.0, 180.0, (20.0, 270.0)),
+    # Heading east at 30 into a 40 km/h northerly: 3-4-5 triangle
+    (50.0, 360.0 - math.degrees(math.atan2(4, 3)), 30.0, 90.0, (40.0, 0.0)),
+    # Tail wind matching the truck: the vane sees nothing
+    (0.0, 0.0, 20.0, 0.0, (20.0, 180.0)),
+    # Head-on at 80 while doing 60 into it: 20 km/h from ahead (north-east)
+    (80.0, 0.0, 60.0, 45.0, (20.0, 45.0)),
+])
+def test_known_geometry(apparent, angle, ground, heading, expected):
+    speed, direction = true_wind(apparent, angle, ground, heading)
+    assert speed == pytest.approx(expected[0], abs=0.1)
+    if expected[1] is None:
+        assert direction is None
+    else:
+        assert (direction - expected[1] + 180) % 360 - 180 == pytest.approx(0.0, abs=0.1)
+
+
+def test_missing_inputs():
+    assert true_wind(None, 0.0, 10.0, 0.0) == (None, None)
+    assert true_wind(20.0, 0.0, None, 0.0) == (None, None)  # no GPS: can't tell if moving
+    assert true_wind(20.0, 90.0, 0.0, None) == (20.0, None)  # speed needs no heading
+    assert true_wind(20.0, 0.0, 0.0, 0.0, vane_offset_deg=90.0) == (20.0, 90.0)
+
+    data = apply({"speed_kph": 30.0, "angle_deg": 0.0, "ground_speed_kph": 30.0, "heading_deg": 10.0,
+                  "fix": True})
+    assert data["true_wind_kph"] == 0.0 and data["true_wind_dir_deg"] is None
+
+
+def test_no_true_wind_without_a_fix():
+    # The receiver lost the fix; the last ground speed must not be used
+    gps = GPSSensor(ser=object())
+    gps.feed(b"$GPRMC,123519,A,4807.038,N,01131.000,E,054.0,090.0,230394,003.1,W*6E\r\n")
+    gps.feed(b"$GPRMC,123520,V,,,,,,,230394,,,N*5B\r\n")
+    data = apply(dict(gps.latest, speed_kph=30.0, angle_deg=0.0, heading_deg=90.0))
+    assert data["true_wind_kph"] is None and data["true_wind_dir_deg"] is None
+
+    stale = {"speed_kph": 30.0, "angle_deg": 0.0, "ground_speed_kph": 100.0, "heading_deg": 90.0,
+             "fix": False}
+    assert apply(stale)["true_wind_kph"] is None
+
+
+def test_batch_matches_scalar():
+    rng = random.Random(7)
+    rows = [(rng.uniform(0, 100), rng.uniform(0, 360), rng.uniform(0, 110), rng.uniform(0, 360))
+            for _ in range(500)]
+    rows += [(10.0, 45.0, math.nan, 0.0), (10.0, 45.0, 5.0, math.nan)]
+    speed, direction = true_wind_batch(*zip(*rows))
+    for i, row in enumerate(rows):
+        s, d = true_wind(*[None if math.isnan(v) else v for v in row])
+        assert (math.isnan(speed[i]) if s is None else speed[i] == pytest.approx(s))
+        assert (math.isnan(direction[i]) if d is None else direction[i] == pytest.approx(d, abs=0.11))
+
+
+@pytest.mark.parametrize("logger_cls, name", [(BufferedLogger, "log.csv"), (BinaryLogger, "log.bin")])
+def test_reprocess_log(tmp_path, logger_cls, name):
+    path = str(tmp_path / name)
+    log = logger_cls(path, background=False, flush_rows=100)
+    for i in range(100):
+        # Fix lost half way; the receiver's last ground speed is still logged
+        log.log({"time_utc": f"{120000 + i:06d}", "speed_kph": 50.0, "angle_deg": 0.0,
+                 "ground_speed_kph": 30.0, "fix": i < 50, "heading_deg": 90.0})
+    log.close()
+
+    out = str(tmp_path / "true.csv")
+    result = reprocess(path, out)
+    assert np.allclose(result["true_wind_kph"][:50], 20.0)
+    assert np.allclose(result["true_wind_dir_deg"][:50], 90.0)
+    assert np.isnan(result["true_wind_kph"][50:]).all()
+    with open(out) as f:
+        lines = f.read().splitlines()
+    assert lines[1] == "120000,20.0,90.0" and lines[-1] == "120099,,"
+
+
+def test_old_logs_without_ground_speed_are_refused(tmp_path):
+    path = tmp_path / "old.csv"
+    path.write_text("time_utc,speed_kph,angle_deg,heading_deg\n120000,40,0,90\n")
+    with pytest.raises(ValueError, match="ground_speed_kph"):
+        reprocess(str(path))
@@ -0,0 +1,70 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from stormpod.wind_stats import WindStats
+
+RATE = 5.0  # CAN wind frames per second
+
+
+def _feed(stats, seconds, speed, direction=None, t0=0.0):
+    n = int(seconds * RATE)
+    for i in range(n):
+        t = t0 + i / RATE
+        d = direction(i) if callable(direction) else direction
+        stats.update(speed(i) if callable(speed) else speed, d, t=t, wall=1_000_000.0 + t)
+    return t0 + n / RATE
+
+
+def test_steady_wind():
+    stats = WindStats()
+    t = _feed(stats, 660, 20.0, 270.0)
+    out = stats.read(now=t)
+    assert out["wind_2min_kph"] == 20.0 and out["wind_10min_kph"] == 20.0
+    assert out["gust_kph"] == 20.0
+    assert out["wind_dir_10min_deg"] == pytest.approx(270.0)
+    assert out["wind_dir_std_deg"] == pytest.approx(0.0, abs=0.1)
+    # Windows hold only what they cover, not the whole stream
+    assert len(stats.long) <= 600 * RATE + 1 and len(stats.short) <= 120 * RATE + 1
+
+
+def test_gust_is_the_peak_3s_mean_with_its_time():
+    stats = WindStats()
+    t = _feed(stats, 60, 20.0)
+    t = _feed(stats, 3, 50.0, t0=t)  # a real 3 s gust at t=60
+    t = _feed(stats, 60, 20.0, t0=t)
+    t = _feed(stats, 1 / RATE, 200.0, t0=t)  # one bad frame: its 3 s mean is only ~32
+    t = _feed(stats, 60, 20.0, t0=t)
+
+    out = stats.read(now=t)
+    assert out["gust_kph"] == pytest.approx(50.0, abs=0.5)
+    assert 1_000_060.0 <= out["gust_time"] <= 1_000_063.0
+    assert out["wind_2min_kph"] < 23.0
+
+    # Ten minutes later the gust has left the window
+    t = _feed(stats, 600, 20.0, t0=t)
+    assert stats.read(now=t)["gust_kph"] == 20.0
+
+
+def test_vector_mean_direction_wraps_through_north():
+    stats = WindStats()
+    t = _feed(stats, 120, 15.0, lambda i: 350.0 if i % 2 else 10.0)
+    out = stats.read(now=t)
+    assert abs((out["wind_dir_2min_deg"] + 180) % 360 - 180) < 0.5
+    assert out["wind_dir_std_deg"] == pytest.approx(10.0, abs=0.5)
+
+
+def test_calm_and_unknown_direction_only_skip_direction():
+    stats = WindStats()
+    assert stats.read() == {}
+    t = _feed(stats, 10, 0.0, 90.0)
+    t = _feed(stats, 10, 10.0, None, t0=t)
+    out = stats.read(now=t)
+    assert out["wind_2min_kph"] == 5.0
+    assert out["wind_dir_2min_deg"] is None
+
+    # After a gap everything has expired
+    out = stats.read(now=t + 700)
+    assert out["wind_10min_kph"] is None and out["gust_kph"] is None